@@ -0,0 +1,197 @@
+"""難度平衡的蒙地卡羅批次模擬
+
+以多個行程平行跑大量固定種子的無介面遊戲，每局由自動策略 (game_core.POLICIES) 操作，
+每完成一局就寫一行 JSON 到結果檔，最後輸出各 (難度, 策略) 組合的統計摘要。
+
+    python balance_runner.py --games 2000 --policies spam greedy_upgrade --out balance.jsonl
+    python balance_runner.py --difficulties Hard --set salary_per_bot=60 --set money=800
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+from game_core import DIFFICULTY_SETTINGS, POLICIES, GameState
+
+
+def play_game(difficulty, policy, seed, max_days=365, settings=None):
+    """以指定策略跑完一局，回傳結果與每日資金/聲望曲線"""
+    game = GameState(difficulty, seed=seed, settings=settings)
+    game.autosave = False
+    act = POLICIES[policy]
+    money_curve = [game.money]
+    rep_curve = [game.reputation]
+
+    while not game.game_over and game.day < max_days:
+        act(game)
+        if game.game_over:
+            break
+        game.next_day()
+        money_curve.append(game.money)
+        rep_curve.append(game.reputation)
+
+    if game.victory:
+        outcome = "victory"
+    elif game.game_over and game.bankruptcy_days >= 3:
+        outcome = "bankrupt"
+    elif game.game_over:
+        outcome = "wiped" # 沒錢也沒帳號
+    else:
+        outcome = "timeout"
+
+    return {
+        'difficulty': difficulty,
+        'policy': policy,
+        'seed': seed,
+        'outcome': outcome,
+        'days': game.day,
+        'money': game.money,
+        'reputation': game.reputation,
+        'bots': len(game.bots),
+        'money_curve': money_curve,
+        'rep_curve': rep_curve,
+    }
+
+
+def _play_task(task):
+    return play_game(*task)
+
+
+class Aggregate:
+    """單一 (難度, 策略) 組合的累計統計，記憶體只與 max_days 成正比"""
+    def __init__(self, max_days):
+        self.games = 0
+        self.outcomes = {"victory": 0, "bankrupt": 0, "wiped": 0, "timeout": 0}
+        self.victory_days = array('l', [0]) * (max_days + 1) # 勝利天數直方圖
+        self.money_sum = array('d', [0.0]) * (max_days + 1)
+        self.rep_sum = array('d', [0.0]) * (max_days + 1)
+        self.alive = array('l', [0]) * (max_days + 1) # 各天仍在進行的局數
+
+    def add(self, result):
+        self.games += 1
+        self.outcomes[result['outcome']] += 1
+        if result['outcome'] == "victory":
+            self.victory_days[min(result['days'], len(self.victory_days) - 1)] += 1
+        for day, (money, rep) in enumerate(zip(result['money_curve'], result['rep_curve'])):
+            self.money_sum[day] += money
+            self.rep_sum[day] += rep
+            self.alive[day] += 1
+
+    def _victory_percentile(self, q):
+        wins = self.outcomes["victory"]
+        target = q * wins
+        seen = 0
+        for day, count in enumerate(self.victory_days):
+            seen += count
+            if count and seen >= target:
+                return day
+        return None
+
+    def summary(self, curve_step=10):
+        wins = self.outcomes["victory"]
+        total_days = sum(day * count for day, count in enumerate(self.victory_days))
+        curve_days = [d for d in range(0, len(self.alive), curve_step) if self.alive[d]]
+        return {
+            'games': self.games,
+            'win_rate': wins / self.games if self.games else 0.0,
+            'bankruptcy_rate': self.outcomes["bankrupt"] / self.games if self.games else 0.0,
+            'wipe_rate': self.outcomes["wiped"] / self.games if self.games else 0.0,
+            'timeout_rate': self.outcomes["timeout"] / self.games if self.games else 0.0,
+            'mean_days_to_victory': total_days / wins if wins else None,
+            'median_days_to_victory': self._victory_percentile(0.5) if wins else None,
+            'p90_days_to_victory': self._victory_percentile(0.9) if wins else None,
+            # 平均曲線只計入當天仍在進行的局
+            'money_curve': {d: self.money_sum[d] / self.alive[d] for d in curve_days},
+            'rep_curve': {d: self.rep_sum[d] / self.alive[d] for d in curve_days},
+        }
+
+
+def iter_tasks(difficulties, policies, games, base_seed, max_days, settings):
+    for difficulty in difficulties:
+        for policy in policies:
+            for i in range(games):
+                yield (difficulty, policy, base_seed + i, max_days, settings)
+
+
+def run_batch(difficulties, policies, games, out_path, workers=None, base_seed=0,
+              max_days=365, settings=None, progress=True):
+    """平行跑完所有組合，結果邊完成邊寫入 out_path (JSON Lines)，回傳摘要"""
+    workers = workers or os.cpu_count() or 1
+    total = len(difficulties) * len(policies) * games
+    tasks = iter_tasks(difficulties, policies, games, base_seed, max_days, settings)
+    aggregates = {(d, p): Aggregate(max_days) for d in difficulties for p in policies}
+    chunksize = max(1, min(64, total // (workers * 8)))
+
+    start = time.perf_counter()
+    done = 0
+    with open(out_path, 'w', encoding='utf-8') as out:
+        if workers == 1:
+            results = map(_play_task, tasks)
+            pool = None
+        else:
+            pool = Pool(workers)
+            results = pool.imap_unordered(_play_task, tasks, chunksize)
+        try:
+            for result in results:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                aggregates[(result['difficulty'], result['policy'])].add(result)
+                done += 1
+                if progress and (done % 500 == 0 or done == total):
+                    rate = done / (time.perf_counter() - start)
+                    print(f"\r{done}/{total} 局 ({rate:.0f} 局/秒)", end="", file=sys.stderr)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+    if progress:
+        print(file=sys.stderr)
+
+    return {
+        'settings': settings or {},
+        'max_days': max_days,
+        'base_seed': base_seed,
+        'elapsed': time.perf_counter() - start,
+        'results': {f"{d}/{p}": agg.summary() for (d, p), agg in aggregates.items()},
+    }
+
+
+def parse_setting(text):
+    key, _, value = text.partition('=')
+    if key not in DIFFICULTY_SETTINGS["Standard"]:
+        raise argparse.ArgumentTypeError(f"未知的設定: {key}")
+    return key, float(value) if '.' in value else int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="難度平衡蒙地卡羅模擬")
+    parser.add_argument('--games', type=int, default=1000, help="每個組合的局數")
+    parser.add_argument('--difficulties', nargs='+', default=list(DIFFICULTY_SETTINGS), choices=list(DIFFICULTY_SETTINGS))
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--workers', type=int, default=None, help="行程數 (預設為 CPU 核心數)")
+    parser.add_argument('--seed', type=int, default=0, help="起始種子")
+    parser.add_argument('--max-days', type=int, default=365)
+    parser.add_argument('--set', dest='settings', action='append', type=parse_setting, default=[],
+                        metavar='KEY=VALUE', help="覆寫難度數值，例如 salary_per_bot=40")
+    parser.add_argument('--out', default='balance_results.jsonl', help="逐局結果 (JSON Lines)")
+    parser.add_argument('--summary', default=None, help="摘要輸出檔 (預設為 <out>.summary.json)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.difficulties, args.policies, args.games, args.out,
+                        workers=args.workers, base_seed=args.seed, max_days=args.max_days,
+                        settings=dict(args.settings) or None)
+    summary_path = args.summary or os.path.splitext(args.out)[0] + ".summary.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    for key, s in summary['results'].items():
+        days = s['mean_days_to_victory']
+        days_str = f"{days:.1f}" if days is not None else "-"
+        print(f"{key:28s} 勝率 {s['win_rate']:6.1%}  破產 {s['bankruptcy_rate']:6.1%}  平均勝利天數 {days_str}")
+    print(f"摘要已寫入 {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""效能基準測試
+
+以固定種子與名冊大小 (預設 100 / 1 萬 / 10 萬個帳號) 量測模擬與繪製的熱點，
+結果寫成 JSON，並可與先前存下的基準比較，超過門檻即視為效能退步 (結束碼 1)。
+
+    python benchmark.py --out bench.json --save-baseline        # 建立基準
+    python benchmark.py --out bench.json --threshold 0.25       # 與基準比較
+    python benchmark.py --sizes 100000 --cases next_day save_game
+
+繪製項目需要 pygame，使用 dummy SDL 驅動程式，沒有安裝 pygame 時會略過。
+time_to_first_frame 量測從初始化 pygame 到畫出選單第一幀的時間，與名冊大小無關，只量一次。
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import game_core
+from game_core import WINDOW_WIDTH, WINDOW_HEIGHT, GOLD, WHITE, BotRoster, GameState
+
+BENCH_SEED = 20240601
+DEFAULT_SIZES = (100, 10_000, 100_000)
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+
+def make_game(size, seed=BENCH_SEED):
+    """建立固定內容的遊戲：size 個 Lv1~10 帳號，資金充足，所有操作都不會因缺錢中止"""
+    game = GameState("Standard", seed=seed, settings={'money': 10 ** 12})
+    game.autosave = False
+    rng = random.Random(seed)
+    level = [rng.randint(1, 10) for _ in range(size)]
+    game.bots = BotRoster.from_columns(level, [100 - lv * 5 for lv in level], [0] * size, [0] * size)
+    return game
+
+
+# --- 模擬 ---
+# 每個項目為 setup(size) -> 可呼叫物件；setup 不計時，每次量測都重新建立狀態
+
+def bench_execute_mission(size):
+    game = make_game(size)
+    mission = max(game.available_missions, key=lambda m: m.reward)
+    count = game.bots.available_count()
+    return lambda: game.execute_mission(mission, "normal", count)
+
+def bench_trigger_ban_wave(size):
+    game = make_game(size)
+    return lambda: game.trigger_ban_wave(10)
+
+def bench_next_day(size):
+    game = make_game(size)
+    game.trigger_ban_wave(10) # 讓隔天有帳號需要清除
+    return game.next_day
+
+def bench_upgrade_all_bots(size):
+    game = make_game(size)
+    return game.upgrade_all_bots
+
+def bench_check_achievements(size):
+    game = make_game(size)
+    return game.check_achievements
+
+def bench_save_game(size):
+    game = make_game(size)
+    return lambda: game.save_game("bench" + game_core.SAVE_EXT)
+
+def bench_load_game(size):
+    game = make_game(size)
+    game.save_game("bench" + game_core.SAVE_EXT)
+    target = GameState("Standard", seed=BENCH_SEED)
+    return lambda: target.load_game("bench" + game_core.SAVE_EXT)
+
+
+# --- 繪製 ---
+
+_frontend = None
+
+def load_frontend():
+    """以 dummy 視訊驅動載入 pygame 前端，沒有 pygame 時回傳 None"""
+    global _frontend
+    if _frontend is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        try:
+            import pygame
+        except ImportError:
+            return None
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pygame.game.py")
+        spec = importlib.util.spec_from_file_location("pygame_frontend", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        pygame.init()
+        module.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        _frontend = module
+    return _frontend
+
+def _main_screen(size):
+    """以前端元件依主畫面的配置組出 DirtyRenderer (標題列、帳號方塊格、日誌)"""
+    fe = load_frontend()
+    pygame = fe.pygame
+    game = make_game(size)
+    for i in range(20):
+        game.log(f"基準測試日誌第 {i} 行：" + "測試文字" * (i % 4 + 1))
+    font = pygame.font.Font(None, 20)
+    title_font = pygame.font.Font(None, 36)
+    grid = fe.BotGridView(50, 580)
+    wrapper = fe.LogWrapper(font, 280)
+    renderer = fe.DirtyRenderer(fe.screen, fe.make_background())
+
+    def draw_header(surface):
+        text = f"第 {game.day} 天 | 資金: ${game.money} | 聲望: {game.reputation} | 帳號: {len(game.bots)}"
+        surface.blit(fe.TEXT.render_glyphs(title_font, text, GOLD), (50, 30))
+
+    def draw_grid(surface):
+        surface.blit(grid.render(game.bots), grid.rect)
+
+    def draw_log(surface):
+        y = 110
+        for line in wrapper.wrap_all(game.logs)[-25:]:
+            surface.blit(fe.TEXT.render(font, line, WHITE), (690, y))
+            y += 22
+
+    renderer.add((0, 0, WINDOW_WIDTH, 105), draw_header, lambda: (game.day, game.money, game.reputation, len(game.bots)))
+    renderer.add(grid.rect, draw_grid, lambda: (game.bots.version, grid.scroll_row))
+    renderer.add((680, 110, 300, 550), draw_log, lambda: len(game.logs))
+    renderer.render()
+    return game, renderer
+
+def bench_render_full(size):
+    """整頁重畫 (切換畫面或關閉局部重畫時)"""
+    game, renderer = _main_screen(size)
+    def frame():
+        renderer.invalidate()
+        renderer.render()
+    return frame
+
+def bench_render_idle(size):
+    """沒有任何變動的一幀"""
+    game, renderer = _main_screen(size)
+    return renderer.render
+
+def bench_render_update(size):
+    """資金與名冊每幀都變動 (例如連續購買)"""
+    game, renderer = _main_screen(size)
+    def frame():
+        game.money += 1
+        game.bots.touch()
+        renderer.render()
+    return frame
+
+
+SIM_CASES = {
+    'execute_mission': bench_execute_mission,
+    'trigger_ban_wave': bench_trigger_ban_wave,
+    'next_day': bench_next_day,
+    'upgrade_all_bots': bench_upgrade_all_bots,
+    'check_achievements': bench_check_achievements,
+    'save_game': bench_save_game,
+    'load_game': bench_load_game,
+}
+RENDER_CASES = {
+    'render_full': bench_render_full,
+    'render_idle': bench_render_idle,
+    'render_update': bench_render_update,
+}
+
+# --- 啟動 ---
+
+def bench_time_to_first_frame(size):
+    """重新初始化 pygame 到選單第一幀 (背景的字型搜尋與音效不計入)"""
+    fe = load_frontend()
+    fe.ASSETS.join() # 上一次啟動的背景載入完成後才關閉
+    fe.pygame.quit()
+    return fe.boot
+
+STARTUP_CASES = {
+    'time_to_first_frame': bench_time_to_first_frame,
+}
+CASES = {**SIM_CASES, **RENDER_CASES, **STARTUP_CASES}
+
+
+def measure(setup, size, repeat, min_time=0.0):
+    """每次重新 setup 後計時
+
+    模擬操作會改變狀態，只執行一次；min_time > 0 時 (繪製) 同一狀態連續執行到超過
+    min_time 秒再取平均。
+    """
+    samples = []
+    for _ in range(repeat):
+        fn = setup(size)
+        number = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            number += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or number >= 1000:
+                break
+        samples.append(elapsed / number)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'repeat': repeat,
+    }
+
+
+def run(cases, sizes, repeat, progress=True):
+    save_dir = tempfile.mkdtemp(prefix="bench_")
+    old_base_dir = game_core.BASE_DIR
+    game_core.BASE_DIR = save_dir # 存讀檔只在暫存資料夾進行
+    results = {}
+    try:
+        for name in cases:
+            if name not in SIM_CASES and load_frontend() is None:
+                print(f"略過 {name}: 沒有安裝 pygame", file=sys.stderr)
+                continue
+            for size in (0,) if name in STARTUP_CASES else sizes:
+                stats = measure(CASES[name], size, repeat, 0.05 if name in RENDER_CASES else 0.0)
+                results[f"{name}/{size}"] = stats
+                if progress:
+                    print(f"{name:20s} {size:>7d}  中位數 {stats['median'] * 1000:9.3f} ms  "
+                          f"最小 {stats['min'] * 1000:9.3f} ms", file=sys.stderr)
+    finally:
+        game_core.BASE_DIR = old_base_dir
+        if _frontend is not None:
+            _frontend.ASSETS.join()
+        shutil.rmtree(save_dir, ignore_errors=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': BENCH_SEED,
+            'sizes': list(sizes),
+            'repeat': repeat,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """回傳 [(項目, 基準中位數, 目前中位數, 比值)]，只列出慢超過 threshold 的項目"""
+    regressions = []
+    for key, stats in current['results'].items():
+        base = baseline['results'].get(key)
+        if not base or base['median'] <= 0:
+            continue
+        ratio = stats['median'] / base['median']
+        if ratio > 1 + threshold:
+            regressions.append((key, base['median'], stats['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="效能基準測試")
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES), help="帳號數")
+    parser.add_argument('--repeat', type=int, default=5, help="每個項目量測次數 (取中位數)")
+    parser.add_argument('--out', default='bench_results.json', help="本次結果 (JSON)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="比較用的基準檔")
+    parser.add_argument('--threshold', type=float, default=0.2, help="中位數變慢超過此比例即視為退步")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次結果存成新的基準")
+    args = parser.parse_args(argv)
+
+    current = run(args.cases, args.sizes, args.repeat)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"結果已寫入 {args.out}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.out, args.baseline)
+        print(f"已更新基準 {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"找不到基準檔 {args.baseline}，略過比較 (可用 --save-baseline 建立)")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    for key, base, cur, ratio in regressions:
+        print(f"效能退步 {key}: {base * 1000:.3f} ms -> {cur * 1000:.3f} ms ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"沒有超過 {args.threshold:.0%} 的退步")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1534 @@
+"""網路水軍模擬器的核心邏輯 (不依賴 pygame，可在無顯示/音效裝置的伺服器上執行)
+
+GameState 不直接播放音效或產生畫面特效，而是透過 EventBus 發出事件：
+    sound(name)                  播放音效
+    float_text(x, y, text, color) 浮動文字 (x, y 為 None 時代表滑鼠位置)
+    log(message)                 新增日誌
+任何具有對應 on_<事件> 方法的物件都可以訂閱，例如 pygame 前端或 ConsoleSink。
+
+每個 GameState 有自己的種子，任務、封鎖、隨機事件各用一條獨立的亂數流 (每天依種子與天數重設)，
+不使用全域 random。玩家操作會記錄在 Replay 中，可在無介面下重跑出完全相同的結果。
+"""
+import hashlib
+import json
+import random
+import os
+import time
+import math
+import operator
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from array import array
+from itertools import compress, repeat
+
+import save_format
+from save_format import SAVE_EXT, LEGACY_EXT
+from profiler import PROFILER
+
+# --- 遊戲設定與常數 ---
+WINDOW_WIDTH = 1024
+WINDOW_HEIGHT = 768
+
+# 顏色定義 (R, G, B)
+WHITE = (200, 255, 200) # 駭客風：帶綠色的白
+BLACK = (0, 0, 0)
+BG_COLOR = (0, 10, 0)         # 駭客風：深黑綠背景
+PANEL_COLOR = (0, 30, 0)      # 駭客風：深綠區塊
+BUTTON_COLOR = (0, 60, 0)     # 駭客風：暗綠按鈕
+BUTTON_HOVER = (0, 180, 0)    # 駭客風：亮綠懸停
+TEXT_COLOR = (0, 255, 0)      # 駭客風：終端機綠
+GREEN = (0, 255, 0)
+RED = (255, 50, 50)
+GOLD = (255, 215, 0)
+
+# 各難度的初始數值
+DIFFICULTY_SETTINGS = {
+    "Easy": {'money': 2000, 'base_risk_modifier': 0.7, 'target_reputation': 3000, 'salary_per_bot': 20},
+    "Standard": {'money': 1000, 'base_risk_modifier': 1.0, 'target_reputation': 5000, 'salary_per_bot': 50},
+    "Hard": {'money': 500, 'base_risk_modifier': 1.3, 'target_reputation': 10000, 'salary_per_bot': 80},
+}
+
+# 操控策略：(影響力倍率, 風險倍率, 名稱)
+STRATEGIES = {
+    "spam": (1.5, 2.0, "暴力洗版"),
+    "normal": (1.0, 1.0, "一般操作"),
+    "troll": (0.8, 0.5, "反串釣魚"),
+}
+
+# --- 路徑設定 ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- 事件系統 ---
+
+class EventBus:
+    """將遊戲事件分派給所有已訂閱的接收端 (muted 期間直接丟棄，快轉時使用)"""
+    def __init__(self):
+        self.sinks = []
+        self.muted = False
+
+    def subscribe(self, sink):
+        if sink not in self.sinks:
+            self.sinks.append(sink)
+        return sink
+
+    def unsubscribe(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def emit(self, kind, *args):
+        if self.muted:
+            return
+        for sink in self.sinks:
+            handler = getattr(sink, 'on_' + kind, None)
+            if handler:
+                handler(*args)
+
+class ConsoleSink:
+    """把日誌輸出到標準輸出 (無介面執行時使用)"""
+    def on_log(self, message):
+        print(message)
+
+# --- 核心邏輯類別 (與文字版類似) ---
+
+class Bot:
+    """單一帳號的輕量檢視物件 (實際數值存放於 BotRoster 的平行陣列中)"""
+    __slots__ = ('_roster', '_idx')
+
+    def __init__(self, level=1):
+        # 獨立建立的 Bot 自帶一個只有一筆資料的名冊
+        self._roster = BotRoster(1, level)
+        self._idx = 0
+
+    @classmethod
+    def view(cls, roster, idx):
+        bot = cls.__new__(cls)
+        bot._roster = roster
+        bot._idx = idx
+        return bot
+
+    level = property(lambda self: self._roster.level[self._idx],
+                     lambda self, v: self._roster._set('level', self._idx, v))
+    influence = property(lambda self: self._roster.influence[self._idx],
+                         lambda self, v: self._roster._set('influence', self._idx, v))
+    stealth = property(lambda self: self._roster.stealth[self._idx],
+                       lambda self, v: self._roster._set('stealth', self._idx, v))
+    max_uses = property(lambda self: self._roster.max_uses[self._idx],
+                        lambda self, v: self._roster._set('max_uses', self._idx, v))
+    used_today = property(lambda self: self._roster.used_today[self._idx],
+                          lambda self, v: self._roster._set('used_today', self._idx, v))
+    is_banned = property(lambda self: bool(self._roster.is_banned[self._idx]),
+                         lambda self, v: self._roster._set('is_banned', self._idx, int(bool(v))))
+
+    def get_upgrade_cost(self):
+        return self.level * 150
+
+    def is_available(self):
+        return self._roster.is_available(self._idx)
+
+    def reset_daily(self):
+        self.used_today = 0
+
+    def upgrade(self):
+        self._roster.upgrade(self._idx)
+
+_NOT_TABLE = bytes([1]) + bytes(255) # bytes.translate 用：0 -> 1，其餘 -> 0
+
+class BotRoster:
+    """以平行型別陣列儲存所有帳號 (每個帳號約 21 bytes，而非一個完整物件)
+
+    直接修改陣列的程式碼必須呼叫 touch()，讓畫面快取等依賴 version 的地方知道名冊變了；
+    修改等級則要透過 upgrade()/_set()，以維持各等級人數 (level_counts) 與最高等級的快取。
+
+    可出勤帳號另以等級分桶索引 (等級 -> 由小到大的帳號索引)，出勤、封鎖、升級時逐筆更新，
+    「派出前 N 名」「前 N 名總影響力」「湊滿需求影響力所需人數」都只需走訪等級數。
+    直接改動 used_today / max_uses / is_banned 的程式碼需呼叫 invalidate_available()
+    (或改用 use_top()、ban())。索引假設同等級帳號的影響力相同。
+    """
+    version = 0 # 每次內容變動就遞增
+
+    def __init__(self, count=0, level=1):
+        self.level_counts = {} # 等級 -> 帳號數 (含已封鎖、尚未移除者)
+        self._max_level = 0
+        self._avail = None # 可出勤帳號分桶 (None 代表需要重建)
+        self._avail_count = 0
+        self._stealth_hist = None # (version, 隱蔽值 -> 未封鎖人數)
+        self._active_stats = None # (version, (總影響力, 剩餘次數))
+        self._orders = {} # (欄位, 是否遞減) -> (version, 排序後的索引)
+        self.level = array('i')
+        self.influence = array('i')
+        self.stealth = array('i')
+        self.max_uses = array('i')
+        self.used_today = array('i')
+        self.is_banned = array('B')
+        if count > 0:
+            self.add(count, level)
+
+    def __len__(self):
+        return len(self.level)
+
+    def touch(self):
+        self.version += 1
+
+    def _count_level(self, level, delta):
+        count = self.level_counts.get(level, 0) + delta
+        if count > 0:
+            self.level_counts[level] = count
+            if level > self._max_level:
+                self._max_level = level
+        else:
+            self.level_counts.pop(level, None)
+            if level == self._max_level: # 最高等級的帳號沒了，從剩下的等級中找 (等級種類很少)
+                self._max_level = max(self.level_counts, default=0)
+
+    def _set(self, column, idx, value):
+        if column == 'level':
+            self._count_level(self.level[idx], -1)
+            self._count_level(value, 1)
+        getattr(self, column)[idx] = value
+        if column in ('level', 'max_uses', 'used_today', 'is_banned'):
+            self._avail = None
+        self.touch()
+
+    def __iter__(self):
+        for i in range(len(self.level)):
+            yield Bot.view(self, i)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [Bot.view(self, i) for i in range(*idx.indices(len(self.level)))]
+        if idx < 0:
+            idx += len(self.level)
+        if not 0 <= idx < len(self.level):
+            raise IndexError("bot index out of range")
+        return Bot.view(self, idx)
+
+    def add(self, count=1, level=1):
+        """一次新增 count 個同等級帳號"""
+        self.level.extend(array('i', [level]) * count)
+        self.influence.extend(array('i', [level * 25]) * count) # 平衡調整：提升基礎影響力
+        self.stealth.extend(array('i', [100 - (level * 5)]) * count)
+        self.max_uses.extend(array('i', [1 + (level // 2)]) * count) # 每日使用次數限制 (Lv1-2: 1次, Lv3-4: 2次...)
+        self.used_today.extend(array('i', [0]) * count)
+        self.is_banned.extend(array('B', [0]) * count)
+        if count > 0:
+            self._count_level(level, count)
+            if self._avail is not None: # 新索引都比現有的大，直接接在桶尾
+                start = len(self.level) - count
+                self._avail.setdefault(level, array('i')).extend(range(start, start + count))
+                self._avail_count += count
+        self.touch()
+
+    @classmethod
+    def from_columns(cls, level, stealth, used_today, is_banned):
+        """由存檔欄位建立名冊 (影響力與次數上限由等級推算)"""
+        roster = cls()
+        roster.level = array('i', level)
+        roster.influence = array('i', map((25).__mul__, level))
+        roster.stealth = array('i', stealth)
+        roster.max_uses = array('i', [1 + (lv // 2) for lv in level])
+        roster.used_today = array('i', used_today)
+        roster.is_banned = array('B', is_banned)
+        roster._recount_levels()
+        return roster
+
+    def _recount_levels(self):
+        counts = {}
+        for level in self.level:
+            counts[level] = counts.get(level, 0) + 1
+        self.level_counts = counts
+        self._max_level = max(counts, default=0)
+
+    def append(self, bot):
+        """加入一個 Bot (複製其數值)"""
+        self.level.append(bot.level)
+        self.influence.append(bot.influence)
+        self.stealth.append(bot.stealth)
+        self.max_uses.append(bot.max_uses)
+        self.used_today.append(bot.used_today)
+        self.is_banned.append(1 if bot.is_banned else 0)
+        self._count_level(bot.level, 1)
+        self._avail = None
+        self.touch()
+
+    def is_available(self, idx):
+        return not self.is_banned[idx] and self.used_today[idx] < self.max_uses[idx]
+
+    def _assign_level(self, idx, level):
+        """寫入升級後的等級與衍生數值 (不更新計數與索引，由呼叫端處理)"""
+        self.level[idx] = level
+        self.influence[idx] = level * 25
+        self.stealth[idx] = min(95, 100 - (level * 5) + (level * 2))
+        self.max_uses[idx] = 1 + (level // 2)
+
+    def upgrade(self, idx):
+        was_available = self.is_available(idx)
+        level = self.level[idx] + 1
+        self._count_level(level - 1, -1)
+        self._count_level(level, 1)
+        self._assign_level(idx, level)
+        if self._avail is not None:
+            if was_available:
+                self._discard_available(idx, level - 1)
+            if self.is_available(idx): # 次數上限提高，今日用完的帳號可能恢復可用
+                insort(self._avail.setdefault(level, array('i')), idx)
+                self._avail_count += 1
+        self.touch()
+
+    def active_level_histogram(self):
+        """未封鎖帳號的 等級 -> 人數"""
+        hist = dict(self.level_counts)
+        if self.banned_count():
+            for level in compress(self.level, self.is_banned):
+                hist[level] -= 1
+        return {lv: c for lv, c in hist.items() if c > 0}
+
+    def stealth_histogram(self):
+        """未封鎖帳號的 隱蔽值 -> 人數 (依 version 快取，名冊沒變動時不重算)"""
+        cached = self._stealth_hist
+        if cached is None or cached[0] != self.version:
+            stealth = self.stealth
+            if self.banned_count():
+                stealth = compress(stealth, map(operator.not_, self.is_banned))
+            cached = self._stealth_hist = (self.version, dict(Counter(stealth)))
+        return cached[1]
+
+    def _finish_bulk_upgrade(self, moves):
+        """moves: (原等級, 新等級) -> 人數"""
+        for (old, new), count in moves.items():
+            self._count_level(old, -count)
+            self._count_level(new, count)
+        if moves:
+            self._avail = None
+            self.touch()
+
+    def upgrade_first(self, quota):
+        """每個等級依索引順序升級前 quota[等級] 個未封鎖帳號各一級 (一次走訪)"""
+        quota = {lv: k for lv, k in quota.items() if k > 0}
+        moves = {}
+        level, banned = self.level, self.is_banned
+        for i in range(len(level)):
+            if not quota:
+                break
+            lv = level[i]
+            if lv in quota and not banned[i]:
+                self._assign_level(i, lv + 1)
+                moves[(lv, lv + 1)] = moves.get((lv, lv + 1), 0) + 1
+                quota[lv] -= 1
+                if not quota[lv]:
+                    del quota[lv]
+        self._finish_bulk_upgrade(moves)
+
+    def apply_upgrade_plan(self, plan):
+        """套用 UpgradePlan：低於 fill_level 的未封鎖帳號升到 fill_level，
+        再依索引順序讓 extra 個 fill_level 的帳號多升一級 (一次走訪)"""
+        fill, extra = plan.fill_level, plan.extra
+        moves = {}
+        level, banned = self.level, self.is_banned
+        for i in range(len(level)):
+            lv = level[i]
+            if banned[i] or lv > fill:
+                continue
+            new = fill
+            if extra:
+                new = fill + 1
+                extra -= 1
+            if new != lv:
+                self._assign_level(i, new)
+                moves[(lv, new)] = moves.get((lv, new), 0) + 1
+        self._finish_bulk_upgrade(moves)
+
+    def refresh_influence(self):
+        """依目前等級重新計算影響力 (數值平衡調整後的存檔遷移用)"""
+        self.influence = array('i', map((25).__mul__, self.level))
+        self.touch()
+
+    def reset_daily(self):
+        self.used_today = array('i', bytes(self.used_today.itemsize * len(self.used_today)))
+        self._avail = None
+        self.touch()
+
+    def remove_banned(self):
+        """移除所有已封鎖帳號，回傳移除數量"""
+        removed = self.banned_count()
+        if removed:
+            level = self.level
+            banned = self.is_banned.tobytes()
+            columns = ('level', 'influence', 'stealth', 'max_uses', 'used_today')
+            if removed * 8 < len(level):
+                gone = []
+                i = banned.find(1)
+                while i >= 0: # 只走訪被封鎖的帳號
+                    gone.append(i)
+                    i = banned.find(1, i + 1)
+                lost = Counter(map(level.__getitem__, gone))
+                # 以被移除的位置切出要保留的區段，整段複製 (不逐一搬移每個帳號)
+                bounds = list(zip([0] + [i + 1 for i in gone], gone + [len(level)]))
+                for name in columns:
+                    col = getattr(self, name)
+                    kept = array(col.typecode)
+                    for start, end in bounds:
+                        kept.extend(col[start:end])
+                    setattr(self, name, kept)
+            else: # 大量封鎖時區段太碎，改以保留遮罩篩選
+                lost = Counter(compress(level, banned))
+                keep = banned.translate(_NOT_TABLE)
+                for name in columns:
+                    col = getattr(self, name)
+                    setattr(self, name, array(col.typecode, compress(col, keep)))
+            for lv, count in lost.items():
+                self._count_level(lv, -count)
+            self.is_banned = array('B', bytes(len(self.level)))
+            self._avail = None # 索引位移，重建
+            self.touch()
+        return removed
+
+    def active_count(self):
+        return len(self.is_banned) - self.banned_count()
+
+    def banned_count(self):
+        return self.is_banned.tobytes().count(1) # bytes.count 比 array.count 快得多
+
+    def max_level(self):
+        return self._max_level
+
+    def active_indices(self):
+        return [i for i, banned in enumerate(self.is_banned) if not banned]
+
+    # --- 可出勤帳號索引 ---
+
+    def invalidate_available(self):
+        self._avail = None
+
+    def _available(self):
+        """等級 -> 可出勤帳號索引 (由小到大)，需要時以線性掃描重建 (不需排序)"""
+        if self._avail is None:
+            # 以 map/compress 在 C 層篩選，Python 迴圈只走訪等級
+            mask = map(operator.lt, self.used_today, self.max_uses)
+            if self.banned_count():
+                mask = map(operator.gt, mask, self.is_banned) # 可用且未封鎖
+            indices = list(compress(range(len(self.level)), mask))
+            levels = list(map(self.level.__getitem__, indices))
+            buckets = {lv: array('i') for lv in set(levels)}
+            for lv, i in zip(levels, indices):
+                buckets[lv].append(i)
+            self._avail = buckets
+            self._avail_count = len(indices)
+        return self._avail
+
+    def _discard_available(self, idx, level):
+        bucket = self._avail.get(level)
+        if bucket:
+            pos = bisect_left(bucket, idx)
+            if pos < len(bucket) and bucket[pos] == idx:
+                del bucket[pos]
+                self._avail_count -= 1
+
+    def _buckets_desc(self):
+        """[(等級, 桶)]，等級由高到低 (只含非空的桶)"""
+        avail = self._available()
+        return [(lv, avail[lv]) for lv in sorted(avail, reverse=True) if avail[lv]]
+
+    def available_count(self):
+        self._available()
+        return self._avail_count
+
+    def available_indices(self):
+        """可出勤帳號索引，依等級由高到低排序 (同等級保持原順序)"""
+        return [i for _, bucket in self._buckets_desc() for i in bucket]
+
+    def top_available(self, n):
+        """等級最高的前 n 個可出勤帳號索引"""
+        result = []
+        for _, bucket in self._buckets_desc():
+            if len(result) >= n:
+                break
+            result.extend(bucket[:n - len(result)])
+        return result
+
+    def top_influence(self, n):
+        """前 n 個可出勤帳號的總影響力 (只走訪等級)"""
+        influence = self.influence
+        total = 0
+        for _, bucket in self._buckets_desc():
+            if n <= 0:
+                break
+            take = min(n, len(bucket))
+            total += take * influence[bucket[0]]
+            n -= take
+        return total
+
+    def count_for_influence(self, required):
+        """由高等級起湊滿 required 影響力所需的最少人數 (全派也不夠時回傳全部可用數)"""
+        influence = self.influence
+        count = 0
+        for _, bucket in self._buckets_desc():
+            if required <= 0:
+                break
+            inf = influence[bucket[0]]
+            need = -(-required // inf)
+            if need <= len(bucket):
+                return count + need
+            count += len(bucket)
+            required -= len(bucket) * inf
+        return count
+
+    def use_top(self, n):
+        """派出前 n 個可出勤帳號 (各用掉一次)，回傳 (索引列表, 總影響力)"""
+        used, max_uses, influence = self.used_today, self.max_uses, self.influence
+        chosen = []
+        total = 0
+        for _, bucket in self._buckets_desc():
+            if len(chosen) >= n:
+                break
+            take = bucket[:n - len(chosen)]
+            for i in take:
+                used[i] += 1
+                total += influence[i]
+            chosen.extend(take)
+            # 用完今日次數的帳號移出桶 (都在桶的最前面 len(take) 個裡)
+            still = array('i', [i for i in take if used[i] < max_uses[i]])
+            self._avail_count -= len(take) - len(still)
+            bucket[:len(take)] = still
+        if chosen:
+            self.touch()
+        return chosen, total
+
+    def ban(self, idx):
+        """封鎖帳號 (維持可出勤索引)"""
+        if not self.is_banned[idx]:
+            if self._avail is not None and self.used_today[idx] < self.max_uses[idx]:
+                self._discard_available(idx, self.level[idx])
+            self.is_banned[idx] = 1
+            self.touch()
+
+    def active_stats(self):
+        """回傳 (未封鎖帳號總影響力, 今日剩餘可用次數)，依 version 快取"""
+        cached = self._active_stats
+        if cached is None or cached[0] != self.version:
+            # 全體總和減去已封鎖者 (sum/compress 都在 C 層執行)
+            total_inf = sum(self.influence)
+            uses_left = sum(self.max_uses) - sum(self.used_today)
+            if self.banned_count():
+                banned = self.is_banned
+                total_inf -= sum(compress(self.influence, banned))
+                uses_left -= sum(compress(self.max_uses, banned)) - sum(compress(self.used_today, banned))
+            cached = self._active_stats = (self.version, (total_inf, uses_left))
+        return cached[1]
+
+    # --- 排序與篩選 (帳號管理表格) ---
+
+    def sorted_indices(self, column, descending=False, where=None):
+        """依 column 排序的帳號索引 (同值時維持索引順序)
+
+        各欄都只有少數幾種整數值，以分桶 (計數排序) 建立，不需要比較或排序個別帳號。
+        where 為 filter_mask() 的遮罩時只排序符合的帳號；不篩選的結果依 version 快取。
+        """
+        key = (column, descending)
+        cached = self._orders.get(key) if where is None else None
+        if cached is None or cached[0] != self.version:
+            col = getattr(self, column)
+            if where is None:
+                indices, values = range(len(col)), col
+            else:
+                indices = array('i', compress(range(len(col)), where))
+                values = map(col.__getitem__, indices)
+            buckets = {v: array('i') for v in set(col)}
+            for v, i in zip(values, indices):
+                buckets[v].append(i)
+            order = array('i')
+            for v in sorted(buckets, reverse=descending):
+                order.extend(buckets[v])
+            if where is not None:
+                return order
+            cached = self._orders[key] = (self.version, order)
+        return cached[1]
+
+    def filter_mask(self, name, money=0):
+        """篩選條件的逐帳號遮罩 (bytes，1 為符合)
+
+        banned: 已封鎖；exhausted: 未封鎖但今日次數已用完；upgradeable: 未封鎖且 money 付得起升級
+        """
+        if name == 'banned':
+            return self.is_banned.tobytes()
+        if name == 'exhausted':
+            mask = map(operator.ge, self.used_today, self.max_uses)
+        elif name == 'upgradeable':
+            mask = map(operator.le, self.level, repeat(money // UPGRADE_COST_PER_LEVEL))
+        else:
+            raise ValueError(f"unknown filter: {name}")
+        if self.banned_count():
+            mask = map(operator.gt, mask, self.is_banned) # 符合且未封鎖
+        return bytes(mask)
+
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in
+                   (self.level, self.influence, self.stealth, self.max_uses, self.used_today, self.is_banned))
+
+UPGRADE_COST_PER_LEVEL = 150 # 與 Bot.get_upgrade_cost 相同：Lv L -> L+1 花費 L * 150
+INFLUENCE_PER_LEVEL = 25
+
+class UpgradePlan:
+    """批量升級計畫：未封鎖帳號中低於 fill_level 的全部升到 fill_level，
+    另有 extra 個 fill_level 的帳號再升一級"""
+    def __init__(self, fill_level, extra, upgrades, cost):
+        self.fill_level = fill_level
+        self.extra = extra
+        self.upgrades = upgrades # 總共升了幾級 (每級 +25 影響力)
+        self.cost = cost
+
+    @property
+    def influence_gain(self):
+        return self.upgrades * INFLUENCE_PER_LEVEL
+
+    def __repr__(self):
+        return (f"UpgradePlan(fill_level={self.fill_level}, extra={self.extra}, "
+                f"upgrades={self.upgrades}, cost={self.cost})")
+
+def _tri(level):
+    """從 Lv1 升到 Lv level 的單位花費總和 (1 + 2 + ... + level-1)"""
+    return level * (level - 1) // 2
+
+def plan_upgrades(histogram, budget=None, target=None):
+    """由等級直方圖 (等級 -> 人數) 算出升級計畫，只做與等級種類數相關的運算
+
+    target：把所有帳號升到至少 target 級 (不檢查預算)。
+    budget：在預算內升最多級。每次升級都 +25 影響力、而低等級較便宜，
+    所以最佳做法是由最低等級往上「填平」，最後剩的錢再讓部分帳號多升一級。
+    """
+    unit = UPGRADE_COST_PER_LEVEL
+    levels = sorted(histogram)
+    if target is not None:
+        below = [(lv, histogram[lv]) for lv in levels if lv < target]
+        upgrades = sum((target - lv) * c for lv, c in below)
+        cost = unit * sum((_tri(target) - _tri(lv)) * c for lv, c in below)
+        return UpgradePlan(target, 0, upgrades, cost)
+
+    if not levels or budget is None or budget < levels[0] * unit:
+        return UpgradePlan(levels[0] if levels else 0, 0, 0, 0)
+    units = budget // unit
+    n = 0      # 目前低於水位的帳號數
+    tri_sum = 0 # 這些帳號的 _tri(等級) 總和
+    lv_sum = 0  # 這些帳號的等級總和
+    fill = levels[0]
+    for k, lv in enumerate(levels):
+        n += histogram[lv]
+        tri_sum += _tri(lv) * histogram[lv]
+        lv_sum += lv * histogram[lv]
+        upper = levels[k + 1] if k + 1 < len(levels) else None
+        # 在 [lv, upper] 內找最大的水位 W，使 n * _tri(W) - tri_sum <= units
+        limit = (units + tri_sum) // n # _tri(W) 的上限
+        w = (1 + math.isqrt(1 + 8 * limit)) // 2
+        while _tri(w) > limit:
+            w -= 1
+        while _tri(w + 1) <= limit:
+            w += 1
+        if upper is not None and w >= upper:
+            fill = upper
+            continue # 水位已淹過下一個等級，把它也納入
+        fill = max(w, lv)
+        break
+    cost_units = n * _tri(fill) - tri_sum
+    upgrades = n * fill - lv_sum
+    # 剩下的錢讓 fill 級的 n 個帳號中的一部分多升一級 (fill 低於下一個等級，不會有其他帳號在 fill 級)
+    extra = min(n, (units - cost_units) // fill)
+    cost_units += extra * fill
+    upgrades += extra
+    return UpgradePlan(fill, extra, upgrades, cost_units * unit)
+
+# 32 位元無號整數陣列型別 (封鎖判定骰值用)
+U32 = 'I' if array('I').itemsize == 4 else 'L'
+
+class BanEngine:
+    """批次封鎖判定：一次抽出整波所有帳號的偵測骰值，再以門檻遮罩套用封鎖"""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.waves = 0
+        self.total_banned = 0
+        self.last_checked = 0   # 上一波檢查的未封鎖帳號數
+        self.last_banned = 0    # 上一波封鎖數
+        self.last_elapsed = 0.0 # 上一波耗時 (秒)
+
+    @staticmethod
+    def ban_probability(risk_level, risk_modifier, stealth):
+        """單一帳號被封鎖的機率，等同原本的 randint(0, 100) < detection_chance"""
+        detection_chance = (risk_level * 5 * risk_modifier) - (stealth * 0.1)
+        return min(101, max(0, math.ceil(detection_chance))) / 101
+
+    @staticmethod
+    def _cutoff(risk_level, risk_modifier, stealth):
+        # 將 0~100 的 101 種骰值換算成 32 位元門檻：roll < cutoff 即封鎖 (誤差 < 2^-32)
+        detection_chance = (risk_level * 5 * risk_modifier) - (stealth * 0.1)
+        hits = min(101, max(0, math.ceil(detection_chance)))
+        return (hits << 32) // 101
+
+    @classmethod
+    def wave_estimate(cls, stealth_histogram, risk_level, risk_modifier):
+        """一波封鎖的 (期望封鎖數, 變異數)：各帳號獨立判定，依隱蔽值分組加總
+        n*p 與 n*p*(1-p)，只與隱蔽值種類數相關"""
+        mean = variance = 0.0
+        for stealth, count in stealth_histogram.items():
+            p = cls.ban_probability(risk_level, risk_modifier, stealth)
+            mean += count * p
+            variance += count * p * (1 - p)
+        return mean, variance
+
+    def run_wave(self, roster, risk_level, risk_modifier):
+        """對名冊執行一波封鎖，回傳本波封鎖數"""
+        start = time.perf_counter()
+        is_banned = roster.is_banned
+        n = len(is_banned)
+        checked = n - roster.banned_count()
+        banned = 0
+        # 隱蔽值只有少數幾種，先算好各自的門檻；所有門檻為 0 時整波直接略過
+        cutoffs = {s: self._cutoff(risk_level, risk_modifier, s) for s in set(roster.stealth)} if checked else {}
+        if any(cutoffs.values()):
+            rolls = array(U32, self.rng.randbytes(4 * n)) # 一次抽出所有骰值
+            # 以 map/compress 在 C 層產生命中遮罩，Python 迴圈只處理命中者
+            mask = map(operator.lt, rolls, map(cutoffs.__getitem__, roster.stealth))
+            for i in compress(range(n), mask):
+                if not is_banned[i]:
+                    roster.ban(i)
+                    banned += 1
+        self.waves += 1
+        self.total_banned += banned
+        self.last_checked = checked
+        self.last_banned = banned
+        self.last_elapsed = time.perf_counter() - start
+        return banned
+
+class MissionEstimate:
+    """以某策略派出指定人數執行任務的預估結果 (與 execute_mission 的判定完全相同，
+    封鎖數為任務後那一波的期望值與變異數)"""
+    def __init__(self, strategy, influence, success, risk_level, expected_bans, ban_variance):
+        self.strategy = strategy
+        self.influence = influence # 策略加成後的影響力
+        self.success = success
+        self.risk_level = risk_level
+        self.expected_bans = expected_bans
+        self.ban_variance = ban_variance
+
+    @property
+    def ban_std(self):
+        return math.sqrt(self.ban_variance)
+
+    def __repr__(self):
+        return (f"MissionEstimate(strategy={self.strategy!r}, influence={self.influence}, "
+                f"success={self.success}, expected_bans={self.expected_bans:.2f}, "
+                f"ban_std={self.ban_std:.2f})")
+
+class AutoSaver:
+    """背景自動存檔
+
+    主執行緒只負責擷取快照並交給 submit()；編碼、fsync 與原子改名都在背景執行緒完成。
+    寫入期間若又送來新的快照，只保留最新的一份 (較舊、尚未開始寫的會被丟棄)。
+    結果由 poll() 在主執行緒取回。
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = None # (路徑, 檔名, meta, columns)
+        self._writing = False
+        self._thread = None
+        self._results = deque() # (檔名, 錯誤或 None)
+        self.writes = 0
+        self.dropped = 0 # 被較新快照取代的次數
+        self.last_elapsed = 0.0
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._pending is not None or self._writing
+
+    def submit(self, path, filename, meta, columns):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (path, filename, meta, columns)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                path, filename, meta, columns = self._pending
+                self._pending = None
+                self._writing = True
+            start = time.perf_counter()
+            error = None
+            try:
+                with PROFILER.section("autosave_write"):
+                    save_format.write_atomic(path, save_format.encode(meta, columns))
+                    save_format.slot_index(os.path.dirname(path)).record(filename, meta)
+            except Exception as e:
+                error = e
+            with self._cond:
+                self._writing = False
+                self.writes += 1
+                self.last_elapsed = time.perf_counter() - start
+                self._results.append((filename, error))
+                self._cond.notify_all()
+
+    def poll(self):
+        """取回已完成的寫入結果"""
+        results = []
+        while self._results:
+            results.append(self._results.popleft())
+        return results
+
+    def flush(self, timeout=None):
+        """等待所有排隊中的寫入完成，回傳是否已完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+class Replay:
+    """玩家操作紀錄：由 (難度, 種子, 設定) 開局，依序重放即可得到相同的遊戲狀態
+
+    每個操作是一個 tuple：
+        ('buy', 數量)  ('upgrade', 帳號索引)  ('upgrade_all',)  ('bulk_upgrade', 預算, 目標等級)
+        ('mission', 任務索引, 策略, 派出數量)  ('next_day',)  ('fast_forward', 天數, 策略或 None)
+    """
+    VERSION = 1
+
+    def __init__(self, difficulty, seed, settings=None, actions=None):
+        self.difficulty = difficulty
+        self.seed = seed
+        self.settings = dict(settings) if settings else None
+        self.actions = list(actions) if actions else []
+
+    def __len__(self):
+        return len(self.actions)
+
+    def record(self, *action):
+        self.actions.append(action)
+
+    def to_dict(self):
+        return {'version': self.VERSION, 'difficulty': self.difficulty, 'seed': self.seed,
+                'settings': self.settings, 'actions': [list(a) for a in self.actions]}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != cls.VERSION:
+            raise ValueError(f"不支援的重播版本: {data.get('version')}")
+        return cls(data['difficulty'], data['seed'], data.get('settings'),
+                   [tuple(a) for a in data['actions']])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def run(self, game=None):
+        """在無介面下重放所有操作，回傳最後的 GameState"""
+        if game is None:
+            game = GameState(self.difficulty, seed=self.seed, settings=self.settings)
+            game.autosave = False
+        for action in self.actions:
+            kind, args = action[0], action[1:]
+            if kind == 'buy':
+                game.buy_bot(*args)
+            elif kind == 'upgrade':
+                game.upgrade_bot(game.bots[args[0]])
+            elif kind == 'upgrade_all':
+                game.upgrade_all_bots()
+            elif kind == 'bulk_upgrade':
+                game.bulk_upgrade(*args)
+            elif kind == 'mission':
+                index, strategy, count = args
+                game.execute_mission(game.available_missions[index], strategy, count)
+            elif kind == 'next_day':
+                game.next_day()
+            elif kind == 'fast_forward':
+                game.fast_forward(*args)
+            else:
+                raise ValueError(f"未知的重播操作: {kind}")
+        return game
+
+class Mission:
+    def __init__(self, name, difficulty, reward, required_influence):
+        self.name = name
+        self.difficulty = difficulty
+        self.reward = reward
+        self.required_influence = required_influence
+
+# 成就依賴的統計值，都是 O(1) 取得
+ACHIEVEMENT_STATS = {
+    'bots': lambda g: len(g.bots),
+    'max_level': lambda g: g.bots.max_level(),
+    'money': lambda g: g.money,
+    'reputation': lambda g: g.reputation,
+}
+
+class Achievement:
+    """統計值 stat 達到 threshold 時解鎖"""
+    def __init__(self, key, title, desc, stat, threshold):
+        self.key = key
+        self.title = title
+        self.desc = desc
+        self.stat = stat
+        self.threshold = threshold
+        self.unlocked = False
+
+    def condition(self, game):
+        return ACHIEVEMENT_STATS[self.stat](game) >= self.threshold
+
+class GameState:
+    """管理遊戲數據與邏輯"""
+    def __init__(self, difficulty="Standard", seed=None, settings=None):
+        self.difficulty = difficulty
+        # settings 可覆寫難度預設值 (平衡測試用)
+        params = dict(DIFFICULTY_SETTINGS.get(difficulty, DIFFICULTY_SETTINGS["Standard"]))
+        if settings:
+            params.update(settings)
+        self.money = params['money']
+        self.base_risk_modifier = params['base_risk_modifier']
+        self.target_reputation = params['target_reputation']
+        self.salary_per_bot = params['salary_per_bot']
+
+        self.risk_modifier = self.base_risk_modifier
+        self.bots = BotRoster(5)
+
+        # 亂數：未指定種子時隨機選一個並記下，之後仍可重現
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(1 << 63)
+        self.mission_rng = random.Random()
+        self.event_rng = random.Random()
+        self.ban_engine = BanEngine()
+        self.replay = Replay(difficulty, self.seed, settings) # 讀檔後為 None (狀態已無法由種子重建)
+        self.autosave = True # 每日自動存檔 (批次模擬時關閉)
+        self.autosaver = AutoSaver()
+        self.available_missions = []
+        self.day = 1
+        self.reputation = 0
+        self.pending_money = 0 # 待結算資金 (隔日入帳)
+        self.selected_mission = None # 當前選中的任務（等待選擇策略）
+        self.deploy_count = 0 # 準備派出的帳號數量
+        self.game_over = False
+        self.victory = False
+        self.bankruptcy_days = 0 # 破產倒數計數器
+        self.current_filename = None # 追蹤當前存檔檔名
+        self.missions_run = 0  # 本次執行中出過的任務數 (不存檔)
+        self.random_events = 0 # 本次執行中觸發的隨機事件數 (不存檔)
+        self._skip_missions = False # 快轉中間的日子不必產生任務
+        self.last_income = 0 # 最近一次結算的入帳與工資 (遙測用)
+        self.last_salary = 0
+        self.telemetry = None # telemetry.TelemetryWriter，由前端或批次工具設定
+        self.logs = [f"歡迎來到《網路水軍模擬器》！難度: {difficulty}", "請購買帳號或選擇任務開始。"]
+        
+        # --- 成就系統 ---
+        self.achievements = [
+            Achievement("bots_10", "初出茅廬", "擁有 10 個帳號", 'bots', 10),
+            Achievement("bots_50", "水軍指揮官", "擁有 50 個帳號", 'bots', 50),
+            Achievement("bots_100", "百萬大軍", "擁有 100 個帳號", 'bots', 100),
+            Achievement("level_3", "技術升級", "擁有 Lv3 以上帳號", 'max_level', 3),
+            Achievement("level_5", "頂尖駭客", "擁有 Lv5 以上帳號", 'max_level', 5),
+            Achievement("level_10", "網軍教父", "擁有 Lv10 以上帳號", 'max_level', 10),
+            Achievement("money_10k", "資本巨鱷", "持有資金超過 $10000", 'money', 10000),
+            Achievement("money_100k", "富可敵國", "持有資金超過 $100000", 'money', 100000),
+            Achievement("rep_2k", "意見領袖", "聲望達到 2000", 'reputation', 2000),
+            Achievement("rep_10k", "輿論之神", "聲望達到 10000", 'reputation', 10000),
+        ]
+        self._index_achievements()
+        self.achievement_queue = [] # 等待顯示的成就
+        self.achievement_timer = 0  # 通知顯示計時器
+        self.current_achievement_msg = None
+
+        self.events = EventBus() # 音效、浮動文字、日誌等事件的分派中心
+
+        self.reseed()
+        self.generate_missions()
+
+    def reseed(self):
+        """依種子與天數重設各亂數流 (讀檔後也能從當天開始重現)"""
+        self.mission_rng.seed(f"{self.seed}/{self.day}/missions")
+        self.event_rng.seed(f"{self.seed}/{self.day}/events")
+        self.ban_engine.rng.seed(f"{self.seed}/{self.day}/bans")
+
+    def record(self, *action):
+        if self.replay is not None:
+            self.replay.record(*action)
+
+    def sample_telemetry(self, kind='day'):
+        if self.telemetry is not None:
+            self.telemetry.sample(self, kind)
+
+    def state_hash(self):
+        """目前狀態的雜湊值 (比對重播結果用；不含日誌與檔名等只影響顯示的欄位)"""
+        meta, columns = self.to_save_data()
+        meta = {k: v for k, v in meta.items() if k not in ('logs', 'current_filename')}
+        return hashlib.sha1(save_format.encode(meta, columns, compress=False)).hexdigest()
+
+    def log(self, message):
+        """新增訊息到日誌視窗"""
+        self.logs.append(message)
+        if len(self.logs) > 20: # 只保留最近 20 條訊息
+            self.logs.pop(0)
+        self.events.emit('log', message)
+
+    def add_float_text(self, x, y, text, color):
+        """新增浮動文字 (x, y 為 None 時由前端放在滑鼠位置)"""
+        self.events.emit('float_text', x, y, text, color)
+
+    def play_sound(self, name):
+        """播放音效"""
+        self.events.emit('sound', name)
+
+    def generate_missions(self):
+        mission_types = [
+            ("引導論壇議題風向", 2, 600, 100),
+            ("製造假民意支持特定政策", 4, 1200, 250),
+            ("煽動社群群體對立", 6, 2500, 500),
+            ("抹黑競爭對手公眾形象", 8, 4000, 800),
+            ("洗白企業重大醜聞", 10, 8000, 1200),
+            ("操縱選舉輿論走向", 15, 20000, 2500),
+            ("散佈恐慌性假消息", 12, 12000, 1500)
+        ]
+        self.available_missions = []
+        
+        # 根據聲望篩選可接的任務類型
+        valid_types = [m for m in mission_types if self.reputation >= (m[1] * 5) - 20]
+        if not valid_types:
+            valid_types = [mission_types[0], mission_types[1]]
+
+        # 隨機生成 3 到 5 個任務
+        rng = self.mission_rng
+        num_missions = rng.randint(3, 5)
+        for _ in range(num_missions):
+            m_data = rng.choice(valid_types)
+            # 數值微調 (波動 +/- 10%)
+            variance = rng.uniform(0.9, 1.1)
+            self.available_missions.append(Mission(
+                m_data[0],
+                m_data[1],
+                int(m_data[2] * variance),
+                int(m_data[3] * variance)
+            ))
+
+    def check_status(self):
+        """檢查遊戲是否結束"""
+        if self.game_over: return
+
+        # 勝利條件：聲望達標
+        if self.reputation >= self.target_reputation:
+            self.game_over = True
+            self.victory = True
+            self.play_sound('win')
+        
+        # 失敗條件：沒錢買帳號 且 沒有活著的帳號
+        if (self.money + self.pending_money) < 100 and self.bots.active_count() == 0:
+            self.game_over = True
+            self.victory = False
+            self.play_sound('lose')
+        
+        # 失敗條件：連續 3 天資金為負 (破產)
+        if self.bankruptcy_days >= 3:
+            self.game_over = True
+            self.victory = False
+            self.play_sound('lose')
+            
+            # 破產刪檔機制
+            if self.current_filename:
+                self.autosaver.flush() # 避免背景寫入在刪除後又把檔案寫回來
+                try:
+                    target_file = os.path.join(BASE_DIR, self.current_filename)
+                    if os.path.exists(target_file):
+                        os.remove(target_file)
+                        self.log(f"公司破產！已刪除紀錄: {self.current_filename}")
+                except Exception as e:
+                    print(f"刪除失敗: {e}")
+
+    def _index_achievements(self):
+        """依統計值分組尚未解鎖的成就 (門檻由低到高)，並清除上次檢查的數值"""
+        self._pending_achievements = {}
+        for ach in self.achievements:
+            if not ach.unlocked:
+                self._pending_achievements.setdefault(ach.stat, []).append(ach)
+        for pending in self._pending_achievements.values():
+            pending.sort(key=lambda a: a.threshold)
+        self._achievement_stats = {}
+
+    def check_achievements(self):
+        """檢查是否有新成就解鎖：只看數值有變動的統計，且只比對該統計門檻最低的未解鎖成就"""
+        unlocked = []
+        for stat, pending in self._pending_achievements.items():
+            if not pending:
+                continue
+            value = ACHIEVEMENT_STATS[stat](self)
+            if self._achievement_stats.get(stat) == value:
+                continue
+            self._achievement_stats[stat] = value
+            while pending and value >= pending[0].threshold:
+                unlocked.append(pending.pop(0))
+        unlocked.sort(key=self.achievements.index) # 維持原本的通知順序
+        for ach in unlocked:
+            ach.unlocked = True
+            msg = f"成就解鎖：{ach.title} ({ach.desc})"
+            self.achievement_queue.append(msg)
+            self.log(f"★ {msg}")
+            self.play_sound('success')
+
+    def buy_bot(self, count=1):
+        self.record('buy', count)
+        cost = 100 * count
+        if self.money >= cost:
+            self.money -= cost
+            self.bots.add(count)
+            self.log(f"購買成功！新增 {count} 個帳號。")
+            self.add_float_text(100, 650, f"-${cost}", RED)
+            self.play_sound('cash')
+        else:
+            self.log(f"資金不足！需要 ${cost}。")
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry('buy')
+
+    def upgrade_bot(self, bot):
+        if bot.is_banned:
+            self.log("無法升級已封鎖帳號。")
+            return
+        self.record('upgrade', bot._idx)
+        cost = bot.get_upgrade_cost()
+        if self.money >= cost:
+            self.money -= cost
+            bot.upgrade()
+            self.log(f"升級成功！Lv{bot.level} (花費 ${cost})")
+            self.add_float_text(None, None, f"-${cost}", RED)
+            self.play_sound('cash')
+        else:
+            self.log(f"資金不足！升級需 ${cost}")
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry('upgrade')
+
+    def upgrade_all_bots(self):
+        """批量升級所有可用帳號"""
+        self.record('upgrade_all')
+        roster = self.bots
+        # 優先升級低等級的 (便宜)：每個等級算出付得起幾個，同等級依索引順序
+        quota = {}
+        count = 0
+        total_cost = 0
+        hist = roster.active_level_histogram()
+        for level in sorted(hist):
+            cost = level * UPGRADE_COST_PER_LEVEL
+            k = min(hist[level], self.money // cost)
+            if k:
+                quota[level] = k
+                self.money -= k * cost
+                total_cost += k * cost
+                count += k
+            if k < hist[level]:
+                break # 沒錢了
+        roster.upgrade_first(quota)
+        
+        if count > 0:
+            self.log(f"批量升級: {count} 個帳號 (花費 ${total_cost})")
+            self.add_float_text(300, 650, f"-${total_cost}", RED)
+            self.play_sound('cash')
+        else:
+            self.log("資金不足以升級任何帳號")
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry('upgrade')
+
+    def plan_upgrades(self, budget=None, target=None):
+        """預覽批量升級 (不花錢)：預設為花光目前資金的最佳方案，或指定全員目標等級"""
+        if budget is None and target is None:
+            budget = self.money
+        return plan_upgrades(self.bots.active_level_histogram(), budget, target)
+
+    def bulk_upgrade(self, budget=None, target=None):
+        """依 plan_upgrades 的結果一次升級"""
+        self.record('bulk_upgrade', budget, target)
+        plan = self.plan_upgrades(budget, target)
+        if plan.upgrades == 0:
+            self.log("沒有可升級的帳號" if target is not None else "資金不足以升級任何帳號")
+        elif plan.cost > self.money:
+            self.log(f"資金不足！全員升到 Lv{plan.fill_level} 需 ${plan.cost}")
+        else:
+            self.money -= plan.cost
+            self.bots.apply_upgrade_plan(plan)
+            self.log(f"批量升級: 共 {plan.upgrades} 級 (花費 ${plan.cost}，影響力 +{plan.influence_gain})")
+            self.add_float_text(300, 650, f"-${plan.cost}", RED)
+            self.play_sound('cash')
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry('upgrade')
+
+    def suggest_deploy_count(self, required_influence):
+        """剛好滿足需求影響力所需的帳號數 (高等級優先；全派也不夠時回傳全部可用數)"""
+        return self.bots.count_for_influence(required_influence)
+
+    def estimate_mission(self, mission, strategy="normal", bot_count=0):
+        """不實際執行，預估任務結果 (MissionEstimate)；只走訪等級與隱蔽值種類，可每幀呼叫"""
+        inf_factor, risk_factor, _ = STRATEGIES.get(strategy, STRATEGIES["normal"])
+        influence = int(self.bots.top_influence(bot_count) * inf_factor)
+        success = influence >= mission.required_influence
+        risk_level = (mission.difficulty if success else mission.difficulty // 2) * risk_factor
+        mean, variance = BanEngine.wave_estimate(self.bots.stealth_histogram(), risk_level, self.risk_modifier)
+        return MissionEstimate(strategy, influence, success, risk_level, mean, variance)
+
+    def estimate_strategies(self, mission, bot_count):
+        """{策略: MissionEstimate}，依 STRATEGIES 的順序"""
+        return {strategy: self.estimate_mission(mission, strategy, bot_count) for strategy in STRATEGIES}
+
+    def execute_mission(self, mission, strategy="normal", bot_count=0):
+        if mission in self.available_missions:
+            self.record('mission', self.available_missions.index(mission), strategy, bot_count)
+        else: # 不在任務列表中的任務無法重放
+            self.replay = None
+        # 由可出勤索引依等級由高到低派出
+        self.missions_run += 1
+        _, total_influence = self.bots.use_top(bot_count)
+        
+        # 策略加成計算
+        inf_factor, risk_factor, strat_name = STRATEGIES.get(strategy, STRATEGIES["normal"])
+        
+        final_influence = int(total_influence * inf_factor)
+        
+        self.log(f"[{strat_name}] 執行: {mission.name}")
+        self.log(f"影響力: {final_influence} (原:{total_influence}) / 需求: {mission.required_influence}")
+
+        if final_influence >= mission.required_influence:
+            self.pending_money += mission.reward
+            self.reputation += mission.difficulty
+            self.log(f"任務成功！報酬 ${mission.reward} 將於明日入帳")
+            self.add_float_text(400, 300, f"+${mission.reward} (待入帳)", GOLD)
+            self.add_float_text(400, 330, f"+{mission.difficulty} 聲望", GREEN)
+            self.play_sound('success')
+            self.trigger_ban_wave(mission.difficulty * risk_factor)
+        else:
+            self.reputation = max(0, self.reputation - 2)
+            self.log("任務失敗！影響力不足。")
+            self.add_float_text(400, 300, "任務失敗", RED)
+            self.play_sound('fail')
+            self.trigger_ban_wave((mission.difficulty // 2) * risk_factor)
+
+        # 任務執行後移除
+        if mission in self.available_missions:
+            self.available_missions.remove(mission)
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry('mission')
+
+    def trigger_ban_wave(self, risk_level):
+        # 機率：(risk_level * 5 * risk_modifier - stealth * 0.1) / 101，由 BanEngine 批次判定
+        banned_count = self.ban_engine.run_wave(self.bots, risk_level, self.risk_modifier)
+        
+        if banned_count > 0:
+            self.log(f"警告！平台反制，損失了 {banned_count} 個帳號！")
+            self.add_float_text(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"損失 {banned_count} 帳號!", RED)
+            self.play_sound('alert')
+        self.check_status()
+        self.check_achievements()
+
+    def next_day(self):
+        self.record('next_day')
+        self.day += 1
+        self.reseed()
+        
+        # 結算昨日收益
+        self.last_income = self.pending_money
+        if self.pending_money > 0:
+            self.money += self.pending_money
+            self.log(f"昨日收益 ${self.pending_money} 已入帳")
+            self.add_float_text(150, 50, f"+${self.pending_money}", GOLD)
+            self.play_sound('cash')
+            self.pending_money = 0
+
+        # 清理被封鎖的帳號
+        self.bots.reset_daily()
+        removed = self.bots.remove_banned()
+        
+        # 支付每日工資
+        salary_cost = len(self.bots) * self.salary_per_bot
+        self.last_salary = salary_cost
+        if salary_cost > 0:
+            self.money -= salary_cost
+            self.log(f"支付工資: ${salary_cost} (${self.salary_per_bot}/人)")
+            self.add_float_text(150, 80, f"-${salary_cost} (工資)", RED)
+
+        # 檢查是否破產 (資金為負)
+        if self.money < 0:
+            self.bankruptcy_days += 1
+            self.log(f"⚠ 資金赤字！破產倒數: {self.bankruptcy_days}/3")
+            self.play_sound('alert')
+        else:
+            self.bankruptcy_days = 0
+
+        # 重置風險值並觸發隨機事件
+        self.risk_modifier = self.base_risk_modifier
+        self.trigger_random_event()
+
+        if not self._skip_missions:
+            self.generate_missions()
+        self.log(f"=== 第 {self.day} 天 ===")
+        if removed > 0:
+            self.log(f"昨日共有 {removed} 個帳號被永久封鎖。")
+        self.check_status()
+        self.check_achievements()
+        self.sample_telemetry()
+        
+        # 自動存檔
+        if self.autosave and not self.game_over:
+            self.autosave_async("autosave" + SAVE_EXT)
+
+    def fast_forward(self, days, policy=None):
+        """連續推進 days 天，可選擇每天先以 POLICIES 中的策略自動出任務
+
+        期間不發出音效/浮動文字、不逐日自動存檔，日誌最後合併成一段摘要；
+        沒有自動任務時中間的日子也不產生任務 (任務亂數每天依種子重設，不影響結果)。
+        遊戲結束時提早停止，回傳實際推進的天數。
+        """
+        act = POLICIES[policy] if isinstance(policy, str) else policy
+        if isinstance(policy, str):
+            self.record('fast_forward', days, policy)
+        elif policy is not None: # 自訂函式無法重放
+            self.replay = None
+        else:
+            self.record('fast_forward', days, None)
+        replay, self.replay = self.replay, None # 快轉內的操作不逐筆記錄
+        autosave, self.autosave = self.autosave, False
+        self.events.muted = True
+
+        logs = list(self.logs)
+        start_day, start_money, start_rep, start_bots = self.day, self.money, self.reputation, len(self.bots)
+        start_banned, start_missions, start_events = self.ban_engine.total_banned, self.missions_run, self.random_events
+        unlocked_before = {a.key for a in self.achievements if a.unlocked}
+        advanced = 0
+        try:
+            while advanced < days and not self.game_over:
+                if act:
+                    act(self)
+                    if self.game_over:
+                        break
+                self._skip_missions = act is None
+                self.next_day()
+                advanced += 1
+        finally:
+            if self._skip_missions and advanced:
+                self.generate_missions() # 補上最後一天的任務 (任務亂數已在 next_day 依當天重設)
+            self._skip_missions = False
+            self.events.muted = False
+            self.autosave = autosave
+            self.replay = replay
+
+        self.logs = logs
+        self.log(f"⏩ 快轉 {advanced} 天 (第 {start_day} → {self.day} 天)"
+                 + (f"，自動任務策略: {policy}" if isinstance(policy, str) else ""))
+        self.log(f"資金 ${start_money} → ${self.money}，聲望 {start_rep} → {self.reputation}，帳號 {start_bots} → {len(self.bots)}")
+        self.log(f"出任務 {self.missions_run - start_missions} 次，封鎖 {self.ban_engine.total_banned - start_banned} 個帳號，"
+                 f"隨機事件 {self.random_events - start_events} 次")
+        for ach in self.achievements:
+            if ach.unlocked and ach.key not in unlocked_before:
+                self.log(f"★ 成就解鎖：{ach.title}")
+        if self.game_over:
+            self.log("遊戲已結束。")
+        elif self.autosave:
+            self.autosave_async("autosave" + SAVE_EXT)
+        self.play_sound('success')
+        return advanced
+
+    def trigger_random_event(self):
+        """觸發每日隨機事件"""
+        rng = self.event_rng
+        if rng.random() < 0.3: # 30% 機率觸發
+            events = [
+                ("平台演算法更新", "今日風險係數加倍！", lambda: setattr(self, 'risk_modifier', self.risk_modifier * 2.0)),
+                ("加密貨幣暴漲", "獲得額外資金 $300", lambda: setattr(self, 'money', self.money + 300)),
+                ("網軍醜聞曝光", "聲望下降 50 點", lambda: setattr(self, 'reputation', max(0, self.reputation - 50))),
+                ("黑客工具流出", "今日風險係數減半", lambda: setattr(self, 'risk_modifier', self.risk_modifier * 0.5)),
+            ]
+            name, desc, effect = rng.choice(events)
+            effect()
+            self.random_events += 1
+            self.log(f"【隨機事件】{name}: {desc}")
+            self.add_float_text(WINDOW_WIDTH//2, 200, f"事件: {name}", (255, 100, 255))
+            self.play_sound('alert')
+
+    def to_save_data(self):
+        """轉成存檔用的 (meta, 帳號欄位)"""
+        meta = {
+            'money': self.money,
+            'pending_money': self.pending_money,
+            'available_missions': [[m.name, m.difficulty, m.reward, m.required_influence] for m in self.available_missions],
+            'day': self.day,
+            'reputation': self.reputation,
+            'difficulty': self.difficulty,
+            'base_risk_modifier': self.base_risk_modifier,
+            'target_reputation': self.target_reputation,
+            'salary_per_bot': self.salary_per_bot,
+            'logs': self.logs,
+            'unlocked_achievements': [a.key for a in self.achievements if a.unlocked],
+            'bankruptcy_days': self.bankruptcy_days,
+            'current_filename': self.current_filename,
+            'seed': self.seed,
+        }
+        roster = self.bots
+        columns = {'level': roster.level, 'stealth': roster.stealth,
+                   'used_today': roster.used_today, 'is_banned': roster.is_banned}
+        return meta, columns
+
+    def snapshot(self):
+        """可交給其他執行緒的存檔快照 (會被主執行緒修改的容器都複製一份)"""
+        meta, columns = self.to_save_data()
+        meta['logs'] = list(meta['logs'])
+        columns = {name: col[:] for name, col in columns.items()}
+        return meta, columns
+
+    def apply_save_data(self, meta, columns):
+        """以存檔資料覆蓋目前狀態"""
+        self.money = meta['money']
+        self.pending_money = meta['pending_money']
+        self.available_missions = [Mission(*m) for m in meta['available_missions']]
+        self.day = meta['day']
+        self.reputation = meta['reputation']
+        self.difficulty = meta['difficulty']
+        defaults = DIFFICULTY_SETTINGS.get(self.difficulty, DIFFICULTY_SETTINGS["Standard"])
+        self.base_risk_modifier = meta.get('base_risk_modifier', defaults['base_risk_modifier'])
+        self.risk_modifier = self.base_risk_modifier
+        self.target_reputation = meta.get('target_reputation', defaults['target_reputation'])
+        self.salary_per_bot = meta.get('salary_per_bot', defaults['salary_per_bot'])
+        self.logs = list(meta['logs'])
+        self.bankruptcy_days = meta['bankruptcy_days']
+        self.bots = BotRoster.from_columns(columns['level'], columns['stealth'],
+                                           columns['used_today'], columns['is_banned'])
+        # 舊存檔沒有種子：另取一個，不與目前這局共用 (遙測檔以種子辨識是哪一局)
+        self.seed = meta['seed'] if 'seed' in meta else random.SystemRandom().randrange(1 << 63)
+        self.reseed()
+        self.replay = None
+
+        # 恢復成就狀態
+        unlocked = set(meta['unlocked_achievements'])
+        for ach in self.achievements:
+            ach.unlocked = ach.key in unlocked
+        self._index_achievements()
+
+    def save_game(self, filename='savegame' + SAVE_EXT):
+        """儲存遊戲狀態"""
+        base, ext = os.path.splitext(filename)
+        legacy_file = None
+        if ext == LEGACY_EXT:
+            legacy_file = filename # 覆蓋舊版存檔時改存成新格式
+            filename = base + SAVE_EXT
+        elif ext != SAVE_EXT:
+            filename += SAVE_EXT
+        self.current_filename = filename # 更新當前檔名
+        filepath = os.path.join(BASE_DIR, filename)
+        try:
+            meta, columns = self.to_save_data()
+            save_format.write_atomic(filepath, save_format.encode(meta, columns))
+            save_format.slot_index(BASE_DIR).record(filename, meta)
+            if legacy_file and os.path.exists(os.path.join(BASE_DIR, legacy_file)):
+                os.remove(os.path.join(BASE_DIR, legacy_file))
+            self.log(f"遊戲進度已儲存至 {filename}")
+        except Exception as e:
+            self.log(f"儲存失敗: {e}")
+
+    def autosave_async(self, filename):
+        """擷取快照後交給背景執行緒寫入，不阻塞呼叫端"""
+        self.current_filename = filename
+        meta, columns = self.snapshot()
+        self.autosaver.submit(os.path.join(BASE_DIR, filename), filename, meta, columns)
+
+    def poll_autosave(self):
+        """回報背景自動存檔的結果 (需在主執行緒定期呼叫)"""
+        for filename, error in self.autosaver.poll():
+            if error:
+                self.log(f"自動存檔失敗: {error}")
+            else:
+                self.log(f"遊戲進度已儲存至 {filename}")
+
+    def load_game(self, filename):
+        """讀取遊戲狀態"""
+        filepath = os.path.join(BASE_DIR, filename)
+        if not os.path.exists(filepath):
+            self.log("檔案不存在。")
+            return
+
+        self.autosaver.flush() # 讓排隊中的自動存檔先寫完，避免之後的結果混進新讀入的進度
+        try:
+            with open(filepath, 'rb') as f:
+                meta, columns = save_format.decode(f)
+            self.apply_save_data(meta, columns)
+            self.current_filename = filename # 確保讀取後更新當前檔名
+            if self.telemetry is not None: # 回到存檔當天，之後的紀錄作廢
+                self.telemetry.rewind(self.day, self.seed)
+                self.last_income = self.last_salary = 0
+                self.sample_telemetry()
+
+            # 重置暫時狀態 (避免讀檔後介面卡住)
+            self.selected_mission = None
+            self.game_over = False
+            self.victory = False
+            
+            self.log(f"已讀取: {filename}")
+        except Exception as e:
+            self.log(f"讀取失敗: {e}")
+
+# --- 自動策略 (批次模擬用) ---
+
+def run_missions(game, strategy):
+    """依報酬高低執行所有派得出足夠影響力的任務"""
+    inf_factor = STRATEGIES[strategy][0]
+    for mission in sorted(game.available_missions, key=lambda m: m.reward, reverse=True):
+        if game.game_over:
+            return
+        required = math.ceil(mission.required_influence / inf_factor)
+        count = game.suggest_deploy_count(required)
+        if count and game.bots.top_influence(count) >= required:
+            game.execute_mission(mission, strategy, count)
+
+def policy_spam(game):
+    """每天都用暴力洗版"""
+    run_missions(game, "spam")
+
+def policy_normal(game):
+    """每天都用一般帶風向"""
+    run_missions(game, "normal")
+
+def policy_troll(game):
+    """每天都用反串釣魚"""
+    run_missions(game, "troll")
+
+def policy_greedy_upgrade(game):
+    """先把錢全花在升級上，再用一般策略出任務"""
+    game.upgrade_all_bots()
+    run_missions(game, "normal")
+
+def policy_cautious(game):
+    """每個任務各策略都以剛好足夠的人數預估，選會成功且期望封鎖數最少的"""
+    for mission in sorted(game.available_missions, key=lambda m: m.reward, reverse=True):
+        if game.game_over:
+            return
+        best = None
+        for strategy, (inf_factor, _, _) in STRATEGIES.items():
+            count = game.suggest_deploy_count(math.ceil(mission.required_influence / inf_factor))
+            estimate = game.estimate_mission(mission, strategy, count)
+            if count and estimate.success and (best is None or estimate.expected_bans < best[0].expected_bans):
+                best = (estimate, count)
+        if best:
+            game.execute_mission(mission, best[0].strategy, best[1])
+
+def policy_expand(game):
+    """保留 3 天工資後，把錢全部拿去買帳號，再用一般策略出任務"""
+    reserve = 3 * game.salary_per_bot * (len(game.bots) + 1)
+    count = (game.money - reserve) // 100
+    if count > 0:
+        game.buy_bot(count)
+    run_missions(game, "normal")
+
+POLICIES = {
+    "spam": policy_spam,
+    "normal": policy_normal,
+    "troll": policy_troll,
+    "greedy_upgrade": policy_greedy_upgrade,
+    "expand": policy_expand,
+    "cautious": policy_cautious,
+}
@@ -0,0 +1,171 @@
+"""逐幀效能分析 (可隨時開關，不依賴 pygame)
+
+PROFILER.section(name) / PROFILER.lap(name) 量測主迴圈中具名區段的耗時，
+保留最近幾百筆數值以計算百分位數，並可匯出 Chrome 追蹤格式 (chrome://tracing、Perfetto)。
+關閉時 section() 回傳共用的空 context、lap() 直接返回；GameState 的方法只在開啟時
+才以 instrument() 包裝，關閉後移除，不留下任何額外開銷。
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# 開啟分析時包裝的 GameState 方法
+GAME_METHODS = (
+    'next_day', 'execute_mission', 'trigger_ban_wave', 'upgrade_all_bots', 'bulk_upgrade', 'buy_bot',
+    'check_status', 'check_achievements', 'generate_missions', 'save_game', 'load_game',
+    'autosave_async', 'fast_forward',
+)
+
+_NULL = nullcontext()
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """具名區段計時器
+
+    samples: 區段名稱 -> 最近 window 筆耗時 (秒)
+    frames:  最近 window 幀的總耗時 (秒)，畫面上的折線圖即由此而來
+    trace:   Chrome 追蹤事件，最多保留 trace_limit 筆
+    """
+    def __init__(self, window=240, trace_limit=200_000):
+        self.enabled = False
+        self.window = window
+        self.samples = {}
+        self.frames = deque(maxlen=window)
+        self.trace = deque(maxlen=trace_limit)
+        self._origin = time.perf_counter_ns()
+        self._frame_start = None
+        self._lap_start = None
+        self._instrumented = [] # (物件, 方法名稱)
+
+    def enable(self):
+        self.enabled = True
+        self._frame_start = None
+
+    def disable(self):
+        self.enabled = False
+        self.uninstrument()
+
+    def reset(self):
+        self.samples.clear()
+        self.frames.clear()
+        self.trace.clear()
+
+    # --- 計時 ---
+
+    def record(self, name, start_ns, end_ns):
+        """記錄一段已完成的區段 (時間為 perf_counter_ns)"""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append((end_ns - start_ns) / 1e9)
+        self.trace.append((name, start_ns, end_ns, threading.get_ident()))
+
+    def section(self, name):
+        """with PROFILER.section("名稱"): ..."""
+        if not self.enabled:
+            return _NULL
+        return _Section(self, name)
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._frame_start is not None:
+            self.frames.append((now - self._frame_start) / 1e9)
+            self.trace.append(("frame", self._frame_start, now, threading.get_ident()))
+        self._frame_start = self._lap_start = now
+
+    def lap(self, name):
+        """記錄從上一個 lap (或 begin_frame) 到現在的耗時，適合依序排列的主迴圈階段"""
+        if not self.enabled or self._lap_start is None:
+            return
+        now = time.perf_counter_ns()
+        self.record(name, self._lap_start, now)
+        self._lap_start = now
+
+    # --- GameState 方法包裝 ---
+
+    def instrument(self, obj, names=GAME_METHODS):
+        """以實例屬性包裝 obj 的方法 (只在開啟時呼叫；uninstrument() 還原)"""
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is None or name in vars(obj):
+                continue
+            setattr(obj, name, self._wrap(f"{type(obj).__name__}.{name}", method))
+            self._instrumented.append((obj, name))
+
+    def uninstrument(self):
+        for obj, name in self._instrumented:
+            vars(obj).pop(name, None)
+        self._instrumented.clear()
+
+    def _wrap(self, label, method):
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return method(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(label, start, time.perf_counter_ns())
+        wrapper.__wrapped__ = method
+        return wrapper
+
+    # --- 統計與匯出 ---
+
+    @staticmethod
+    def _percentile(ordered, q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self):
+        """[(名稱, 次數, p50, p95, p99, 最大值)]，依 p95 由大到小排序 (單位：秒)"""
+        rows = []
+        for name, samples in list(self.samples.items()):
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            rows.append((name, len(ordered), self._percentile(ordered, 0.5),
+                         self._percentile(ordered, 0.95), self._percentile(ordered, 0.99), ordered[-1]))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def frame_stats(self):
+        """(平均, p95, p99) 幀耗時 (秒)，沒有資料時回傳 None"""
+        if not self.frames:
+            return None
+        ordered = sorted(self.frames)
+        return (sum(ordered) / len(ordered), self._percentile(ordered, 0.95), self._percentile(ordered, 0.99))
+
+    def export_chrome_trace(self, path):
+        """以 Chrome 追蹤格式 (完整事件 "X"，微秒) 寫出目前保留的所有區段"""
+        pid = os.getpid()
+        origin = self._origin
+        events = [{
+            'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+            'ts': (start - origin) / 1000, 'dur': (end - start) / 1000,
+        } for name, start, end, tid in list(self.trace)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+
+PROFILER = Profiler()
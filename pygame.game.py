@@ -1,552 +1,510 @@
 import pygame
-import random
 import sys
-import pickle
 import os
+import json
+import threading
 import time
+from array import array
+from collections import OrderedDict, deque
+from itertools import compress
+from contextlib import contextmanager
+
+from game_core import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, BLACK, BG_COLOR, PANEL_COLOR, BUTTON_COLOR,
+    BUTTON_HOVER, TEXT_COLOR, GREEN, RED, GOLD, BASE_DIR, POLICIES, UPGRADE_COST_PER_LEVEL, GameState,
+)
+import save_format
+from save_format import SAVE_EXT
+from profiler import PROFILER
+from telemetry import TelemetryError, TelemetryReader, TelemetryWriter
 
 # --- 遊戲設定與常數 ---
-WINDOW_WIDTH = 1024
-WINDOW_HEIGHT = 768
 FPS = 60
-
-# 顏色定義 (R, G, B)
-WHITE = (200, 255, 200) # 駭客風：帶綠色的白
-BLACK = (0, 0, 0)
-BG_COLOR = (0, 10, 0)         # 駭客風：深黑綠背景
-PANEL_COLOR = (0, 30, 0)      # 駭客風：深綠區塊
-BUTTON_COLOR = (0, 60, 0)     # 駭客風：暗綠按鈕
-BUTTON_HOVER = (0, 180, 0)    # 駭客風：亮綠懸停
-TEXT_COLOR = (0, 255, 0)      # 駭客風：終端機綠
-GREEN = (0, 255, 0)
-RED = (255, 50, 50)
-GOLD = (255, 215, 0)
-
-# --- 路徑設定 ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IDLE_TIMEOUT = 250 # 沒有動畫時每次最多阻塞等待事件的毫秒數
 
 # --- 全域設定 ---
 class GameSettings:
     def __init__(self):
         self.volume = 0.5
+        self.dirty_rendering = True # 主畫面只重畫有變動的區域
+        self.fast_forward_days = 7
+        self.fast_forward_policy = None # None = 只推進天數，不自動出任務
+        self.telemetry_per_action = False # 遙測除了每日結算，也記錄每次任務/購買/升級
+
+FAST_FORWARD_DAYS = (7, 30, 100, 365)
+FAST_FORWARD_POLICIES = (None,) + tuple(POLICIES)
+TELEMETRY_NAME = "telemetry.tlm"
 
 SETTINGS = GameSettings()
 screen = None # 全域螢幕變數
 
 def update_volume(vol):
     SETTINGS.volume = max(0.0, min(1.0, vol))
-    try:
-        pygame.mixer.music.set_volume(SETTINGS.volume)
-        for s in SOUNDS.values():
-            s.set_volume(SETTINGS.volume)
-    except:
-        pass
+    MIXER.set_gain(SETTINGS.volume)
 
-# --- 音效系統 ---
-SOUNDS = {}
+# --- 啟動計時 ---
+class StartupTimer:
+    """記錄啟動各階段的耗時，以及距離啟動開始的時間點 (毫秒)"""
+    def __init__(self):
+        self.reset()
 
-def play_sound(name):
-    """播放音效的安全函式"""
-    if name in SOUNDS:
-        SOUNDS[name].play()
-
-def init_audio():
-    """初始化音效與背景音樂"""
-    pygame.mixer.init()
-    
-    # 載入背景音樂 (BGM)
-    try:
-        pygame.mixer.music.load('bgm.mp3')
-        pygame.mixer.music.set_volume(SETTINGS.volume)
-        pygame.mixer.music.play(-1) # -1 代表無限循環
-    except Exception:
-        print("提示：未找到背景音樂 (bgm.mp3)")
-
-    # 載入音效 (SFX)
-    sfx_files = {
-        'click': 'click.wav',
-        'cash': 'cash.wav',
-        'success': 'success.wav',
-        'fail': 'fail.wav',
-        'alert': 'alert.wav',
-        'win': 'win.wav',
-        'lose': 'lose.wav',
-        'hover': 'hover.mp3' # 新增懸停音效
-    }
-    for name, filename in sfx_files.items():
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.phases = OrderedDict() # 名稱 -> 耗時
+        self.marks = OrderedDict()  # 名稱 -> 距啟動開始
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
         try:
-            SOUNDS[name] = pygame.mixer.Sound(filename)
-            SOUNDS[name].set_volume(SETTINGS.volume)
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - start) * 1000
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.origin) * 1000
+
+    def report(self):
+        parts = [f"{name} {ms:.0f}ms" for name, ms in list(self.phases.items())]
+        parts += [f"{name} @{ms:.0f}ms" for name, ms in list(self.marks.items())]
+        return "啟動: " + " | ".join(parts)
+
+STARTUP = StartupTimer()
+
+# --- 資源 (字型與音效) ---
+FONT_CACHE_NAME = ".font_cache.json"
+BODY_FONTS = ["microsoftjhenghei", "pingfangtc", "heiti", "simhei", "arialunicode"] # Windows, Mac, Linux 常見中文字型
+TITLE_FONTS = ["microsoftjhenghei", "simhei"]
+SFX_FILES = {
+    'click': 'click.wav',
+    'cash': 'cash.wav',
+    'success': 'success.wav',
+    'fail': 'fail.wav',
+    'alert': 'alert.wav',
+    'win': 'win.wav',
+    'lose': 'lose.wav',
+    'hover': 'hover.mp3', # 懸停音效
+}
+# 聲道不夠時，高優先的音效可以搶走低優先的聲道
+SFX_PRIORITY = {'win': 3, 'lose': 3, 'alert': 2, 'success': 2, 'fail': 2, 'cash': 1, 'click': 1, 'hover': 0}
+
+class AudioMixer:
+    """固定聲道池的音效播放
+
+    - 同一音效在 dedupe_window 秒內重複觸發只播一次 (例如一次買 5 個、整排按鈕的懸停)
+    - 聲道用完時搶走優先度較低、最早開始的聲道，沒有可搶的就丟棄這次播放
+    - 主音量在播放時套用到聲道上，set_gain() 不必逐一調整每個音效
+    - 音效由 preload() 在背景執行緒解碼進快取，播放時不會等待讀檔；背景還沒載入到、
+      或背景載入失敗的音效，第一次播放時在當下同步載入 (每個音效只嘗試一次)
+    """
+    def __init__(self, channels=8, dedupe_window=0.06):
+        self.num_channels = channels
+        self.dedupe_window = dedupe_window
+        self.gain = SETTINGS.volume
+        self.sounds = {} # 名稱 -> Sound (載入失敗為 None)
+        self._channels = []
+        self._voices = [] # 各聲道目前的 (優先度, 開始時間)
+        self._last_played = {}
+        self._requested = set() # 已在播放時嘗試同步載入過的音效
+        self.played = 0
+        self.deduped = 0
+        self.dropped = 0
+
+    def setup(self):
+        """混音器初始化後建立聲道池"""
+        self.sounds.clear() # 舊的 Sound 屬於已關閉的混音器
+        self._requested.clear()
+        pygame.mixer.set_num_channels(self.num_channels)
+        self._channels = [pygame.mixer.Channel(i) for i in range(self.num_channels)]
+        self._voices = [(0, 0.0)] * self.num_channels
+
+    def preload(self, files):
+        """解碼並快取音效 (在背景執行緒呼叫)"""
+        for name, filename in files.items():
+            if name not in self.sounds:
+                self._load(name, filename)
+
+    def _load(self, name, filename):
+        try:
+            sound = pygame.mixer.Sound(filename)
         except Exception:
-            pass # 找不到檔案就忽略，不影響遊戲
-
-# --- 核心邏輯類別 (與文字版類似) ---
-
-class Bot:
-    def __init__(self, level=1):
-        self.level = level
-        self.influence = level * 25 # 平衡調整：提升基礎影響力
-        self.stealth = 100 - (level * 5)
-        self.is_banned = False
-        self.max_uses = 1 + (level // 2) # 每日使用次數限制 (Lv1-2: 1次, Lv3-4: 2次...)
-        self.used_today = 0
-
-    def get_upgrade_cost(self):
-        return self.level * 150
-
-    def is_available(self):
-        return not self.is_banned and self.used_today < self.max_uses
-
-    def reset_daily(self):
-        self.used_today = 0
-
-    def upgrade(self):
-        self.level += 1
-        self.influence = self.level * 25
-        self.stealth = min(95, 100 - (self.level * 5) + (self.level * 2))
-        self.max_uses = 1 + (self.level // 2)
-
-class Mission:
-    def __init__(self, name, difficulty, reward, required_influence):
-        self.name = name
-        self.difficulty = difficulty
-        self.reward = reward
-        self.required_influence = required_influence
-
-class Achievement:
-    def __init__(self, key, title, desc, condition):
-        self.key = key
-        self.title = title
-        self.desc = desc
-        self.condition = condition
-        self.unlocked = False
-
-class FloatingText:
-    """浮動文字特效"""
-    def __init__(self, x, y, text, color):
-        self.x = x
-        self.y = y
-        self.text = text
-        self.color = color
-        self.timer = 60  # 持續 60 frames (約 1 秒)
+            sound = None # 找不到檔案就忽略，不影響遊戲
+        self.sounds[name] = sound
+        return sound
+
+    def _pick_channel(self, priority):
+        victim = None
+        for i, channel in enumerate(self._channels):
+            if not channel.get_busy():
+                return i
+            voice = self._voices[i]
+            if voice[0] < priority and (victim is None or voice < self._voices[victim]):
+                victim = i
+        return victim
+
+    def play(self, name):
+        if not self._channels: # 混音器尚未就緒
+            return
+        sound = self.sounds.get(name)
+        if sound is None and name not in self._requested and name in SFX_FILES:
+            self._requested.add(name)
+            sound = self._load(name, SFX_FILES[name])
+        if sound is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_played.get(name, -1.0) < self.dedupe_window:
+            self.deduped += 1
+            return
+        priority = SFX_PRIORITY.get(name, 1)
+        i = self._pick_channel(priority)
+        if i is None:
+            self.dropped += 1
+            return
+        self._last_played[name] = now
+        channel = self._channels[i]
+        channel.play(sound)
+        channel.set_volume(self.gain)
+        self._voices[i] = (priority, now)
+        self.played += 1
+
+    def set_gain(self, gain):
+        """主音量 (背景音樂與所有音效)"""
+        self.gain = gain
+        if not self._channels:
+            return
+        pygame.mixer.music.set_volume(gain)
+        for channel in self._channels: # 聲道數固定，只調整正在播放的聲音
+            channel.set_volume(gain)
 
-    def update(self):
-        self.y -= 1  # 向上飄移
-        self.timer -= 1
+    def stats_text(self):
+        return f"音效 播放 {self.played} | 合併 {self.deduped} | 丟棄 {self.dropped}"
 
-    def draw(self, surface, font):
-        if self.timer > 0:
-            # 隨著時間稍微變透明的效果在 Pygame 比較複雜，這裡簡單處理位置移動
-            surf = font.render(self.text, True, self.color)
-            surface.blit(surf, (self.x, self.y))
-
-class GameState:
-    """管理遊戲數據與邏輯"""
-    def __init__(self, difficulty="Standard"):
-        self.difficulty = difficulty
-        if difficulty == "Easy":
-            self.money = 2000
-            self.base_risk_modifier = 0.7
-            self.target_reputation = 3000
-            self.salary_per_bot = 20 # 簡單模式工資
-        elif difficulty == "Hard":
-            self.money = 500
-            self.base_risk_modifier = 1.3
-            self.target_reputation = 10000
-            self.salary_per_bot = 80 # 困難模式工資
-        else:
-            self.money = 1000
-            self.base_risk_modifier = 1.0
-            self.target_reputation = 5000
-            self.salary_per_bot = 50 # 普通模式工資
-
-        self.risk_modifier = self.base_risk_modifier
-        self.bots = [Bot() for _ in range(5)]
-        self.available_missions = []
-        self.day = 1
-        self.reputation = 0
-        self.pending_money = 0 # 待結算資金 (隔日入帳)
-        self.selected_mission = None # 當前選中的任務（等待選擇策略）
-        self.deploy_count = 0 # 準備派出的帳號數量
-        self.game_over = False
-        self.victory = False
-        self.bankruptcy_days = 0 # 破產倒數計數器
-        self.current_filename = None # 追蹤當前存檔檔名
-        self.logs = [f"歡迎來到《網路水軍模擬器》！難度: {difficulty}", "請購買帳號或選擇任務開始。"]
-        
-        # --- 成就系統 ---
-        self.achievements = [
-            Achievement("bots_10", "初出茅廬", "擁有 10 個帳號", lambda g: len(g.bots) >= 10),
-            Achievement("bots_50", "水軍指揮官", "擁有 50 個帳號", lambda g: len(g.bots) >= 50),
-            Achievement("bots_100", "百萬大軍", "擁有 100 個帳號", lambda g: len(g.bots) >= 100),
-            Achievement("level_3", "技術升級", "擁有 Lv3 以上帳號", lambda g: any(b.level >= 3 for b in g.bots)),
-            Achievement("level_5", "頂尖駭客", "擁有 Lv5 以上帳號", lambda g: any(b.level >= 5 for b in g.bots)),
-            Achievement("level_10", "網軍教父", "擁有 Lv10 以上帳號", lambda g: any(b.level >= 10 for b in g.bots)),
-            Achievement("money_10k", "資本巨鱷", "持有資金超過 $10000", lambda g: g.money >= 10000),
-            Achievement("money_100k", "富可敵國", "持有資金超過 $100000", lambda g: g.money >= 100000),
-            Achievement("rep_2k", "意見領袖", "聲望達到 2000", lambda g: g.reputation >= 2000),
-            Achievement("rep_10k", "輿論之神", "聲望達到 10000", lambda g: g.reputation >= 10000),
-        ]
-        self.achievement_queue = [] # 等待顯示的成就
-        self.achievement_timer = 0  # 通知顯示計時器
-        self.current_achievement_msg = None
-
-        self.floating_texts = [] # 視覺特效列表
-
-        self.generate_missions()
-
-    def log(self, message):
-        """新增訊息到日誌視窗"""
-        self.logs.append(message)
-        if len(self.logs) > 20: # 只保留最近 20 條訊息
-            self.logs.pop(0)
-
-    def add_float_text(self, x, y, text, color):
-        """新增浮動文字"""
-        self.floating_texts.append(FloatingText(x, y, text, color))
-
-    def generate_missions(self):
-        mission_types = [
-            ("引導論壇議題風向", 2, 600, 100),
-            ("製造假民意支持特定政策", 4, 1200, 250),
-            ("煽動社群群體對立", 6, 2500, 500),
-            ("抹黑競爭對手公眾形象", 8, 4000, 800),
-            ("洗白企業重大醜聞", 10, 8000, 1200),
-            ("操縱選舉輿論走向", 15, 20000, 2500),
-            ("散佈恐慌性假消息", 12, 12000, 1500)
-        ]
-        self.available_missions = []
-        
-        # 根據聲望篩選可接的任務類型
-        valid_types = [m for m in mission_types if self.reputation >= (m[1] * 5) - 20]
-        if not valid_types:
-            valid_types = [mission_types[0], mission_types[1]]
-
-        # 隨機生成 3 到 5 個任務
-        num_missions = random.randint(3, 5)
-        for _ in range(num_missions):
-            m_data = random.choice(valid_types)
-            # 數值微調 (波動 +/- 10%)
-            variance = random.uniform(0.9, 1.1)
-            self.available_missions.append(Mission(
-                m_data[0],
-                m_data[1],
-                int(m_data[2] * variance),
-                int(m_data[3] * variance)
-            ))
-
-    def check_status(self):
-        """檢查遊戲是否結束"""
-        if self.game_over: return
-
-        # 勝利條件：聲望達標
-        if self.reputation >= self.target_reputation:
-            self.game_over = True
-            self.victory = True
-            play_sound('win')
-        
-        # 失敗條件：沒錢買帳號 且 沒有活著的帳號
-        active_bots = [b for b in self.bots if not b.is_banned]
-        if (self.money + self.pending_money) < 100 and len(active_bots) == 0:
-            self.game_over = True
-            self.victory = False
-            play_sound('lose')
-        
-        # 失敗條件：連續 3 天資金為負 (破產)
-        if self.bankruptcy_days >= 3:
-            self.game_over = True
-            self.victory = False
-            play_sound('lose')
-            
-            # 破產刪檔機制
-            if self.current_filename:
-                try:
-                    target_file = os.path.join(BASE_DIR, self.current_filename)
-                    if os.path.exists(target_file):
-                        os.remove(target_file)
-                        self.log(f"公司破產！已刪除紀錄: {self.current_filename}")
-                except Exception as e:
-                    print(f"刪除失敗: {e}")
+MIXER = AudioMixer()
 
-    def check_achievements(self):
-        """檢查是否有新成就解鎖"""
-        for ach in self.achievements:
-            if not ach.unlocked and ach.condition(self):
-                ach.unlocked = True
-                msg = f"成就解鎖：{ach.title} ({ach.desc})"
-                self.achievement_queue.append(msg)
-                self.log(f"★ {msg}")
-                play_sound('success')
+class AssetManager:
+    """不阻擋第一幀的資源載入
 
-    def buy_bot(self, count=1):
-        cost = 100 * count
-        if self.money >= cost:
-            self.money -= cost
-            for _ in range(count):
-                self.bots.append(Bot())
-            self.log(f"購買成功！新增 {count} 個帳號。")
-            self.add_float_text(100, 650, f"-${cost}", RED)
-            play_sound('cash')
-        else:
-            self.log(f"資金不足！需要 ${cost}。")
-        self.check_status()
-        self.check_achievements()
+    系統字型搜尋 (match_font) 很慢，結果存在 FONT_CACHE_NAME，之後啟動直接使用；
+    沒有快取時先以預設字型顯示選單，搜尋在背景執行緒完成後再換上。
+    混音器初始化、背景音樂與音效解碼 (MIXER.preload) 也都在背景執行緒進行。
+    """
+    def __init__(self):
+        self.fonts_ready = threading.Event()
+        self.audio_ready = threading.Event()
+        self._font_paths = {}
+        self._fonts = {} # (路徑, 大小) -> Font
+        self._thread = None
+        self._warned = False
 
-    def upgrade_bot(self, bot):
-        if bot.is_banned:
-            self.log("無法升級已封鎖帳號。")
-            return
-        cost = bot.get_upgrade_cost()
-        if self.money >= cost:
-            self.money -= cost
-            bot.upgrade()
-            self.log(f"升級成功！Lv{bot.level} (花費 ${cost})")
-            self.add_float_text(pygame.mouse.get_pos()[0], pygame.mouse.get_pos()[1], f"-${cost}", RED)
-            play_sound('cash')
-        else:
-            self.log(f"資金不足！升級需 ${cost}")
-        self.check_status()
-        self.check_achievements()
-
-    def upgrade_all_bots(self):
-        """批量升級所有可用帳號"""
-        active_bots = [b for b in self.bots if not b.is_banned]
-        # 優先升級低等級的 (便宜)
-        active_bots.sort(key=lambda b: b.level)
-        
-        count = 0
-        total_cost = 0
-        for bot in active_bots:
-            cost = bot.get_upgrade_cost()
-            if self.money >= cost:
-                self.money -= cost
-                bot.upgrade()
-                total_cost += cost
-                count += 1
-            else:
-                break # 沒錢了
-        
-        if count > 0:
-            self.log(f"批量升級: {count} 個帳號 (花費 ${total_cost})")
-            self.add_float_text(300, 650, f"-${total_cost}", RED)
-            play_sound('cash')
-        else:
-            self.log("資金不足以升級任何帳號")
-        self.check_status()
-        self.check_achievements()
-
-    def execute_mission(self, mission, strategy="normal", bot_count=0):
-        # 篩選可用帳號並優先使用等級高的 (或是隨意，這裡用預設順序)
-        available_bots = [b for b in self.bots if b.is_available()]
-        # 根據等級排序，優先派出高等級帳號
-        available_bots.sort(key=lambda b: b.level, reverse=True)
-        
-        bots_to_use = available_bots[:bot_count]
-        for b in bots_to_use:
-            b.used_today += 1
-            
-        total_influence = sum(b.influence for b in bots_to_use)
-        
-        # 策略加成計算
-        risk_factor = 1.0
-        inf_factor = 1.0
-        strat_name = "一般操作"
-
-        if strategy == "spam":
-            inf_factor = 1.5
-            risk_factor = 2.0
-            strat_name = "暴力洗版"
-        elif strategy == "troll":
-            inf_factor = 0.8
-            risk_factor = 0.5
-            strat_name = "反串釣魚"
-        
-        final_influence = int(total_influence * inf_factor)
-        
-        self.log(f"[{strat_name}] 執行: {mission.name}")
-        self.log(f"影響力: {final_influence} (原:{total_influence}) / 需求: {mission.required_influence}")
-
-        if final_influence >= mission.required_influence:
-            self.pending_money += mission.reward
-            self.reputation += mission.difficulty
-            self.log(f"任務成功！報酬 ${mission.reward} 將於明日入帳")
-            self.add_float_text(400, 300, f"+${mission.reward} (待入帳)", GOLD)
-            self.add_float_text(400, 330, f"+{mission.difficulty} 聲望", GREEN)
-            play_sound('success')
-            self.trigger_ban_wave(mission.difficulty * risk_factor)
-        else:
-            self.reputation = max(0, self.reputation - 2)
-            self.log("任務失敗！影響力不足。")
-            self.add_float_text(400, 300, "任務失敗", RED)
-            play_sound('fail')
-            self.trigger_ban_wave((mission.difficulty // 2) * risk_factor)
-
-        # 任務執行後移除
-        if mission in self.available_missions:
-            self.available_missions.remove(mission)
-        self.check_status()
-        self.check_achievements()
-
-    def trigger_ban_wave(self, risk_level):
-        banned_count = 0
-        for bot in self.bots:
-            if bot.is_banned: continue
-            # 簡單的機率計算
-            detection_chance = (risk_level * 5 * self.risk_modifier) - (bot.stealth * 0.1)
-            if random.randint(0, 100) < detection_chance:
-                bot.is_banned = True
-                banned_count += 1
-        
-        if banned_count > 0:
-            self.log(f"警告！平台反制，損失了 {banned_count} 個帳號！")
-            self.add_float_text(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"損失 {banned_count} 帳號!", RED)
-            play_sound('alert')
-        self.check_status()
-        self.check_achievements()
-
-    def next_day(self):
-        self.day += 1
-        
-        # 結算昨日收益
-        if self.pending_money > 0:
-            self.money += self.pending_money
-            self.log(f"昨日收益 ${self.pending_money} 已入帳")
-            self.add_float_text(150, 50, f"+${self.pending_money}", GOLD)
-            play_sound('cash')
-            self.pending_money = 0
-
-        # 清理被封鎖的帳號
-        for b in self.bots:
-            b.reset_daily()
-        original_count = len(self.bots)
-        self.bots = [b for b in self.bots if not b.is_banned]
-        removed = original_count - len(self.bots)
-        
-        # 支付每日工資
-        salary_cost = len(self.bots) * self.salary_per_bot
-        if salary_cost > 0:
-            self.money -= salary_cost
-            self.log(f"支付工資: ${salary_cost} (${self.salary_per_bot}/人)")
-            self.add_float_text(150, 80, f"-${salary_cost} (工資)", RED)
-
-        # 檢查是否破產 (資金為負)
-        if self.money < 0:
-            self.bankruptcy_days += 1
-            self.log(f"⚠ 資金赤字！破產倒數: {self.bankruptcy_days}/3")
-            play_sound('alert')
-        else:
-            self.bankruptcy_days = 0
-
-        # 重置風險值並觸發隨機事件
-        self.risk_modifier = self.base_risk_modifier
-        self.trigger_random_event()
-
-        self.generate_missions()
-        self.log(f"=== 第 {self.day} 天 ===")
-        if removed > 0:
-            self.log(f"昨日共有 {removed} 個帳號被永久封鎖。")
-        self.check_status()
-        self.check_achievements()
-        
-        # 自動存檔
-        if not self.game_over:
-            self.save_game("autosave.pkl")
-
-    def trigger_random_event(self):
-        """觸發每日隨機事件"""
-        if random.random() < 0.3: # 30% 機率觸發
-            events = [
-                ("平台演算法更新", "今日風險係數加倍！", lambda: setattr(self, 'risk_modifier', self.risk_modifier * 2.0)),
-                ("加密貨幣暴漲", "獲得額外資金 $300", lambda: setattr(self, 'money', self.money + 300)),
-                ("網軍醜聞曝光", "聲望下降 50 點", lambda: setattr(self, 'reputation', max(0, self.reputation - 50))),
-                ("黑客工具流出", "今日風險係數減半", lambda: setattr(self, 'risk_modifier', self.risk_modifier * 0.5)),
-            ]
-            name, desc, effect = random.choice(events)
-            effect()
-            self.log(f"【隨機事件】{name}: {desc}")
-            self.add_float_text(WINDOW_WIDTH//2, 200, f"事件: {name}", (255, 100, 255))
-            play_sound('alert')
-
-    def save_game(self, filename='savegame.pkl'):
-        """儲存遊戲狀態"""
-        if not filename.endswith('.pkl'):
-            filename += '.pkl'
-        self.current_filename = filename # 更新當前檔名
-        filepath = os.path.join(BASE_DIR, filename)
-        data = {
-            'money': self.money,
-            'pending_money': self.pending_money,
-            'bots': self.bots,
-            'available_missions': self.available_missions,
-            'day': self.day,
-            'reputation': self.reputation,
-            'difficulty': self.difficulty,
-            'base_risk_modifier': self.base_risk_modifier,
-            'target_reputation': self.target_reputation,
-            'logs': self.logs,
-            'unlocked_achievements': [a.key for a in self.achievements if a.unlocked],
-            'bankruptcy_days': self.bankruptcy_days,
-            'current_filename': self.current_filename
-        }
+    def _cache_path(self):
+        return os.path.join(BASE_DIR, FONT_CACHE_NAME)
+
+    def _load_font_cache(self):
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(data, f)
-            self.log(f"遊戲進度已儲存至 {filename}")
-        except Exception as e:
-            self.log(f"儲存失敗: {e}")
+            with open(self._cache_path(), 'r', encoding='utf-8') as f:
+                paths = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 字型被移除，或上次沒找到 (之後可能安裝了) 時重新搜尋
+        if not isinstance(paths, dict) or not all(p and os.path.exists(p) for p in paths.values()):
+            return None
+        return paths
+
+    def start(self):
+        self.join()
+        self.fonts_ready.clear()
+        self.audio_ready.clear()
+        paths = self._load_font_cache()
+        if paths is not None:
+            self._font_paths = paths
+            self.fonts_ready.set()
+        self._thread = threading.Thread(target=self._load_background, args=(paths is None,),
+                                        name="assets", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _load_background(self, scan_fonts):
+        if scan_fonts:
+            with STARTUP.phase("字型搜尋"):
+                paths = {'body': pygame.font.match_font(BODY_FONTS), 'title': pygame.font.match_font(TITLE_FONTS)}
+            self._font_paths = paths
+            self.fonts_ready.set()
+            if all(paths.values()): # 沒找到字型時不存快取，下次啟動再搜尋
+                try:
+                    with open(self._cache_path(), 'w', encoding='utf-8') as f:
+                        json.dump(paths, f, ensure_ascii=False)
+                except OSError:
+                    pass
+        with STARTUP.phase("音效"):
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"提示：無法初始化音效 ({e})")
+                return
+            MIXER.setup()
+            self.audio_ready.set()
+            try:
+                pygame.mixer.music.load('bgm.mp3')
+                pygame.mixer.music.set_volume(MIXER.gain)
+                pygame.mixer.music.play(-1) # -1 代表無限循環
+            except Exception:
+                print("提示：未找到背景音樂 (bgm.mp3)")
+            MIXER.preload(SFX_FILES)
+
+    def _font(self, path, size):
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(path, size)
+        return font
+
+    def fonts(self, wait=False):
+        """(內文字型, 標題字型)；字型搜尋尚未完成時回傳預設字型 (wait=True 則等待)"""
+        if wait:
+            self.fonts_ready.wait()
+        paths = self._font_paths if self.fonts_ready.is_set() else {}
+        if self.fonts_ready.is_set() and not paths.get('body') and not self._warned:
+            self._warned = True
+            print("警告：找不到中文字型，文字可能無法顯示。")
+        return self._font(paths.get('body'), 24), self._font(paths.get('title'), 36)
+
+ASSETS = AssetManager()
 
-    def load_game(self, filename):
-        """讀取遊戲狀態"""
-        filepath = os.path.join(BASE_DIR, filename)
-        if not os.path.exists(filepath):
-            self.log("檔案不存在。")
-            return
+def play_sound(name):
+    """播放音效的安全函式 (混音器尚未就緒或沒有此音效時不做任何事)"""
+    MIXER.play(name)
+
+class FloatingTextPool:
+    """浮動文字特效 (固定容量的物件池)
+
+    文字只在產生時渲染一次，之後每幀只改變位置與透明度；起點與產生時間存在陣列中，
+    用完的欄位放回 free 清單重複使用。所有文字壽命相同，先產生的必定先結束，
+    因此 update() 只需從 live 佇列前端移除到期的欄位。池滿時直接回收最舊的文字。
+    """
+    def __init__(self, font, capacity=64, lifetime=60, fade=20):
+        self.font = font
+        self.capacity = capacity
+        self.lifetime = lifetime # 持續幀數 (約 1 秒)
+        self.fade = fade         # 最後幾幀逐漸透明
+        self.frame = 0
+        self._x = array('i', [0]) * capacity
+        self._y = array('i', [0]) * capacity
+        self._born = array('q', [0]) * capacity
+        self._alpha = array('h', [255]) * capacity
+        self._surfs = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+        self._live = deque() # 依產生順序排列的欄位
+        self.spawned = 0
+        self.recycled = 0
+
+    def __len__(self):
+        return len(self._live)
+
+    def spawn(self, x, y, text, color):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._live.popleft()
+            self.recycled += 1
+        # 複製快取中的 Surface，淡出時才能各自設定透明度
+        surf = TEXT.render(self.font, text, color).copy()
+        self._surfs[slot] = surf
+        self._x[slot] = x
+        self._y[slot] = y
+        self._born[slot] = self.frame
+        self._alpha[slot] = 255
+        self._live.append(slot)
+        self.spawned += 1
 
-        try:
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-            
-            # 更新當前物件屬性
-            self.__dict__.update(data)
-            self.current_filename = filename # 確保讀取後更新當前檔名
-            
-            # 資料遷移：確保舊存檔的機器人有新屬性
-            for b in self.bots:
-                if not hasattr(b, 'max_uses'):
-                    b.max_uses = 1 + (b.level // 2)
-                if not hasattr(b, 'used_today'):
-                    b.used_today = 0
-                b.influence = b.level * 25 # 更新數值平衡
-            if not hasattr(self, 'pending_money'):
-                self.pending_money = 0
-            if not hasattr(self, 'base_risk_modifier'):
-                self.base_risk_modifier = self.risk_modifier
-            if not hasattr(self, 'floating_texts'):
-                self.floating_texts = []
-            if not hasattr(self, 'salary_per_bot'):
-                if self.difficulty == "Easy": self.salary_per_bot = 20
-                elif self.difficulty == "Hard": self.salary_per_bot = 80
-                else: self.salary_per_bot = 50
-            if not hasattr(self, 'bankruptcy_days'):
-                self.bankruptcy_days = 0
-
-            # 恢復成就狀態
-            if hasattr(self, 'unlocked_achievements'):
-                for ach in self.achievements:
-                    if ach.key in self.unlocked_achievements:
-                        ach.unlocked = True
-
-            # 重置暫時狀態 (避免讀檔後介面卡住)
-            self.selected_mission = None
-            self.game_over = False
-            self.victory = False
-            
-            self.log(f"已讀取: {filename}")
-        except Exception as e:
-            self.log(f"讀取失敗: {e}")
+    def update(self):
+        self.frame += 1
+        live, born, expire = self._live, self._born, self.frame - self.lifetime
+        while live and born[live[0]] <= expire:
+            slot = live.popleft()
+            self._surfs[slot] = None
+            self._free.append(slot)
+
+    def sprites(self):
+        """回傳 [(Surface, 位置)]，供繪製器當作前景圖層"""
+        frame, lifetime, fade = self.frame, self.lifetime, self.fade
+        x, y, born, alpha, surfs = self._x, self._y, self._born, self._alpha, self._surfs
+        sprites = []
+        for slot in self._live:
+            age = frame - born[slot]
+            left = lifetime - age
+            if left < fade:
+                value = 255 * left // fade
+                if alpha[slot] != value: # 只調整 Surface 的透明度，不重新渲染
+                    alpha[slot] = value
+                    surfs[slot].set_alpha(value)
+            sprites.append((surfs[slot], (x[slot], y[slot] - age))) # 向上飄移
+        return sprites
+
+    def clear(self):
+        while self._live:
+            slot = self._live.pop()
+            self._surfs[slot] = None
+            self._free.append(slot)
+
+    def stats_text(self):
+        return f"浮動文字 {len(self._live)}/{self.capacity} | 產生 {self.spawned} | 回收 {self.recycled}"
+
+class PygameFrontend:
+    """pygame 前端：訂閱 GameState 的事件，負責播放音效、產生浮動文字與預先斷行日誌"""
+    def __init__(self, log_wrapper=None, floating_texts=None):
+        self.floating_texts = floating_texts # 視覺特效 (FloatingTextPool)
+        self.log_wrapper = log_wrapper
+
+    def attach(self, game):
+        game.events.subscribe(self)
+        return game
+
+    def on_sound(self, name):
+        play_sound(name)
+
+    def on_float_text(self, x, y, text, color):
+        if x is None or y is None:
+            x, y = pygame.mouse.get_pos()
+        if self.floating_texts is not None:
+            self.floating_texts.spawn(x, y, text, color)
+
+    def on_log(self, message):
+        # 訊息加入時就先斷好行，繪製時只需切片
+        if self.log_wrapper:
+            self.log_wrapper.wrap(message)
 
 # --- UI 輔助類別 ---
 
+class TextRenderer:
+    """文字渲染快取
+
+    render(): 以 (字型, 字串, 顏色) 為鍵快取整段文字的 Surface，超過容量時淘汰最久未用的。
+    render_glyphs(): 給金額、計數這類每幀可能變動的字串用；逐字從字形快取拼出整段，
+    只有沒見過的字才會真正光柵化，拼好的結果同樣放進 LRU。
+    blit_glyphs(): 逐字直接貼到目標 Surface，不把整段放進 LRU；給呼叫端自己會快取結果的地方
+    (例如帳號表格的列)，避免大量一次性的字串擠掉每幀都要用的文字。
+    """
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.glyphs = {} # (字型, 字元, 顏色) -> Surface
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.glyph_misses = 0
+
+    def _lookup(self, key):
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+        return surf
+
+    def _store(self, key, surf):
+        self.misses += 1
+        self.cache[key] = surf
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self._lookup(key)
+        if surf is None:
+            surf = self._store(key, font.render(text, True, color))
+        return surf
+
+    def glyph(self, font, char, color):
+        key = (font, char, color)
+        surf = self.glyphs.get(key)
+        if surf is None:
+            surf = self.glyphs[key] = font.render(char, True, color)
+            self.glyph_misses += 1
+        return surf
+
+    def render_glyphs(self, font, text, color):
+        key = (font, text, color)
+        surf = self._lookup(key)
+        if surf is None:
+            parts = [self.glyph(font, ch, color) for ch in text]
+            width = sum(p.get_width() for p in parts)
+            surf = pygame.Surface((max(1, width), font.get_height()), pygame.SRCALPHA)
+            x = 0
+            for p in parts:
+                surf.blit(p, (x, 0))
+                x += p.get_width()
+            self._store(key, surf)
+        return surf
+
+    def blit_glyphs(self, surface, font, text, color, pos):
+        x, y = pos
+        for ch in text:
+            glyph = self.glyph(font, ch, color)
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+
+    def stats_text(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"文字快取 {len(self.cache)}/{self.capacity} 命中率 {rate:.1%} "
+                f"(命中 {self.hits} / 未命中 {self.misses} / 淘汰 {self.evictions}) 字形 {len(self.glyphs)}")
+
+TEXT = TextRenderer()
+
+class LogWrapper:
+    """日誌自動換行快取：每則訊息只斷行一次，斷點以二分搜尋字串寬度求得"""
+    def __init__(self, font, max_width, capacity=256):
+        self.font = font
+        self.max_width = max_width
+        self.capacity = capacity
+        self.cache = {} # 訊息 -> 斷好的行
+        self._last_logs = None
+        self._last_lines = []
+
+    def _fits(self, text):
+        return self.font.size(text)[0] <= self.max_width
+
+    def _wrap(self, text):
+        lines = []
+        start = 0
+        while start < len(text):
+            rest = text[start:]
+            if self._fits(rest):
+                lines.append(rest)
+                break
+            # 找出最長且放得下的前綴 (至少一個字，避免單字過寬時卡住)
+            lo, hi = 1, len(rest) - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._fits(rest[:mid]):
+                    lo = mid
+                else:
+                    hi = mid - 1
+            lines.append(rest[:lo])
+            start += lo
+        return lines
+
+    def wrap(self, message):
+        lines = self.cache.get(message)
+        if lines is None:
+            lines = self.cache[message] = self._wrap(message)
+            if len(self.cache) > self.capacity:
+                del self.cache[next(iter(self.cache))] # 淘汰最早加入的
+        return lines
+
+    def wrap_all(self, logs):
+        """整個日誌列表斷行後的所有行 (日誌沒變時直接回傳上次結果)"""
+        key = tuple(logs)
+        if key != self._last_logs:
+            self._last_logs = key
+            self._last_lines = [line for message in logs for line in self.wrap(message)]
+        return self._last_lines
+
 class Button:
     def __init__(self, x, y, w, h, text, callback):
         self.rect = pygame.Rect(x, y, w, h)
@@ -555,14 +513,18 @@ class Button:
         self.color = BUTTON_COLOR
         self.hovered = False
 
-    def draw(self, surface, font):
-        mouse_pos = pygame.mouse.get_pos()
-        is_hovering = self.rect.collidepoint(mouse_pos)
+    def poll_hover(self):
+        """更新懸停狀態並回傳是否懸停"""
+        is_hovering = self.rect.collidepoint(pygame.mouse.get_pos())
         
         # 懸停音效邏輯
         if is_hovering and not self.hovered:
             play_sound('hover')
         self.hovered = is_hovering
+        return is_hovering
+
+    def draw(self, surface, font):
+        is_hovering = self.poll_hover()
 
         # 滑鼠懸停變色效果
         current_color = BUTTON_HOVER if is_hovering else self.color
@@ -573,7 +535,7 @@ class Button:
         if is_hovering:
              pygame.draw.rect(surface, current_color, self.rect) # 懸停時填充
         
-        text_surf = font.render(self.text, True, text_color)
+        text_surf = TEXT.render(font, self.text, text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -583,332 +545,878 @@ class Button:
                 play_sound('click')
                 self.callback()
 
-# --- 主程式 ---
+class BotGridView:
+    """帳號方塊格
 
-def get_chinese_font():
-    """嘗試獲取系統中的中文字型"""
-    # 常見的中文字型名稱列表 (Windows, Mac, Linux)
-    font_names = ["microsoftjhenghei", "pingfangtc", "heiti", "simhei", "arialunicode"]
-    font_path = pygame.font.match_font(font_names)
-    
-    if font_path:
-        return pygame.font.Font(font_path, 24)
+    只畫出可見的幾列，並快取成一張 Surface，名冊內容 (version) 或捲動位置改變時才重建；
+    滑鼠座標直接換算成帳號索引，不需逐一檢查每個方塊。
+    """
+    def __init__(self, x, y, cols=30, rows=5, box_size=15, gap=5):
+        self.x = x
+        self.y = y
+        self.cols = cols
+        self.rows = rows
+        self.box_size = box_size
+        self.step = box_size + gap
+        self.scroll_row = 0
+        self.rect = pygame.Rect(x, y, cols * self.step - gap, rows * self.step - gap)
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self._key = None
+        self.rebuilds = 0
+
+    def capacity(self):
+        return self.cols * self.rows
+
+    def first_index(self):
+        return self.scroll_row * self.cols
+
+    def scroll(self, delta, count):
+        max_row = max(0, (count - 1) // self.cols - self.rows + 1)
+        self.scroll_row = max(0, min(self.scroll_row + delta, max_row))
+
+    def index_at(self, pos, count):
+        """滑鼠座標對應的帳號索引 (沒有則回傳 None)"""
+        col, dx = divmod(pos[0] - self.x, self.step)
+        row, dy = divmod(pos[1] - self.y, self.step)
+        if 0 <= col < self.cols and 0 <= row < self.rows and dx < self.box_size and dy < self.box_size:
+            idx = (self.scroll_row + row) * self.cols + col
+            if idx < count:
+                return idx
+        return None
+
+    def box_rect(self, idx):
+        row, col = divmod(idx - self.first_index(), self.cols)
+        return pygame.Rect(self.x + col * self.step, self.y + row * self.step, self.box_size, self.box_size)
+
+    def render(self, roster):
+        """回傳方塊格的 Surface (必要時才重建)"""
+        self.scroll(0, len(roster)) # 名冊變小時修正捲動位置
+        key = (id(roster), roster.version, self.scroll_row)
+        if key != self._key:
+            self._key = key
+            self.rebuilds += 1
+            self.surface.fill((0, 0, 0, 0))
+            level, used, max_uses, banned = roster.level, roster.used_today, roster.max_uses, roster.is_banned
+            first = self.first_index()
+            for idx in range(first, min(len(roster), first + self.capacity())):
+                color = GREEN
+                if banned[idx]: color = RED
+                elif level[idx] > 1: color = (0, 255, 255)
+                # 如果今日次數用完，變暗
+                if not banned[idx] and used[idx] >= max_uses[idx]:
+                    color = (50, 100, 50)
+                row, col = divmod(idx - first, self.cols)
+                self.surface.fill(color, (col * self.step, row * self.step, self.box_size, self.box_size))
+        return self.surface
+
+class BotTable:
+    """帳號管理表格 (虛擬化)
+
+    只畫出捲動視窗內看得到的幾列；每列的 Surface 以該列內容為鍵放在 LRU 快取中，捲動時直接貼上。
+    顯示順序 (帳號索引陣列) 由 BotRoster.sorted_indices / filter_mask 產生，
+    依名冊 version、排序與篩選條件快取。捲動以像素為單位，每幀往目標位置逼近 (平滑捲動)。
+    """
+    # (標題, 欄位 x 偏移, 排序欄位)
+    columns = (
+        ("ID", 10, None), ("等級", 80, 'level'), ("影響力", 160, 'influence'),
+        ("隱蔽值", 280, 'stealth'), ("今日用量", 400, 'used_today'), ("狀態", 540, None), ("升級費用", 660, None),
+    )
+    upgrade_offset = 810 # 列內升級按鈕的 x 偏移
+
+    def __init__(self, x, y, width, height, row_height=40, cache_rows=256):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.row_height = row_height
+        self.cache_rows = cache_rows
+        self.scrollbar = pygame.Rect(self.rect.right + 5, y, 10, height)
+        self.sort_column = None # None 為原始順序
+        self.descending = True
+        self.filter = None
+        self.scroll_y = 0.0
+        self.target_y = 0
+        self._rows = OrderedDict() # 列內容 -> Surface
+        self._order_key = None
+        self._order = range(0)
+        self.row_renders = 0
+
+    # --- 顯示順序 ---
+
+    def order(self, roster, money):
+        """目前排序與篩選下的帳號索引序列"""
+        limit = money // UPGRADE_COST_PER_LEVEL if self.filter == 'upgradeable' else None
+        key = (id(roster), roster.version, len(roster), self.sort_column, self.descending, self.filter, limit)
+        if key != self._order_key:
+            self._order_key = key
+            mask = roster.filter_mask(self.filter, money) if self.filter else None
+            if self.sort_column:
+                self._order = roster.sorted_indices(self.sort_column, self.descending, mask)
+            elif mask is not None:
+                self._order = array('i', compress(range(len(roster)), mask))
+            else:
+                self._order = range(len(roster))
+        return self._order
+
+    def set_sort(self, column):
+        """點同一欄切換遞增/遞減，換欄時先由大到小"""
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = True
+        self.scroll_y = self.target_y = 0
+
+    def set_filter(self, name):
+        self.filter = name
+        self.scroll_y = self.target_y = 0
+
+    # --- 捲動 ---
+
+    def max_scroll(self, count):
+        return max(0, count * self.row_height - self.rect.height)
+
+    def scroll(self, rows, count):
+        self.scroll_to(self.target_y + rows * self.row_height, count)
+
+    def scroll_to(self, y, count):
+        self.target_y = max(0, min(int(y), self.max_scroll(count)))
+
+    def jump_to(self, y, count):
+        """立即捲到 y (拖曳捲軸時不做緩動)"""
+        self.scroll_to(y, count)
+        self.scroll_y = self.target_y
+
+    def animating(self):
+        return self.scroll_y != self.target_y
+
+    def update(self, count):
+        """往目標位置逼近一幀，回傳畫面是否需要更新"""
+        self.scroll_to(self.target_y, count) # 篩選結果變少時修正
+        if self.scroll_y > self.max_scroll(count):
+            self.scroll_y = self.target_y
+            return True
+        diff = self.target_y - self.scroll_y
+        if not diff:
+            return False
+        self.scroll_y = self.target_y if abs(diff) < 1 else self.scroll_y + diff * 0.35
+        return True
+
+    def _visible(self, order):
+        """[(列號, 帳號索引)]，只含捲動視窗內看得到的列"""
+        top = int(self.scroll_y)
+        first = top // self.row_height
+        last = min(len(order), (top + self.rect.height) // self.row_height + 1)
+        return [(row, order[row]) for row in range(first, last)]
+
+    # --- 繪製 ---
+
+    def _row_surface(self, font, roster, idx):
+        level, banned = roster.level[idx], roster.is_banned[idx]
+        key = (font, idx, level, roster.influence[idx], roster.stealth[idx],
+               roster.used_today[idx], roster.max_uses[idx], banned)
+        surf = self._rows.get(key)
+        if surf is not None:
+            self._rows.move_to_end(key)
+            return surf
+        self.row_renders += 1
+        surf = pygame.Surface((self.rect.width, self.row_height), pygame.SRCALPHA)
+        color = RED if banned else WHITE
+        cells = (f"#{idx + 1}", f"Lv.{level}", f"{key[3]}", f"{key[4]}", f"{key[5]}/{key[6]}",
+                 "已封鎖" if banned else "正常", "-" if banned else f"${level * UPGRADE_COST_PER_LEVEL}")
+        text_y = (self.row_height - font.get_height()) // 2
+        for (_, x, _), text in zip(self.columns, cells):
+            TEXT.blit_glyphs(surf, font, text, color, (x, text_y)) # 列已快取，不佔用共用的文字 LRU
+        if not banned: # 單個升級按鈕
+            btn_rect = pygame.Rect(self.upgrade_offset, 5, 80, self.row_height - 10)
+            pygame.draw.rect(surf, BUTTON_COLOR, btn_rect)
+            pygame.draw.rect(surf, TEXT_COLOR, btn_rect, 1)
+            label = TEXT.render(font, "升級", WHITE)
+            surf.blit(label, label.get_rect(center=btn_rect.center))
+        self._rows[key] = surf
+        if len(self._rows) > self.cache_rows:
+            self._rows.popitem(last=False)
+        return surf
+
+    def draw_header(self, surface, font, y):
+        for title, x, column in self.columns:
+            color = GOLD
+            if column and column == self.sort_column:
+                title += " ▼" if self.descending else " ▲"
+                color = WHITE
+            surface.blit(TEXT.render(font, title, color), (self.rect.x + x, y))
+
+    def draw(self, surface, font, roster, order):
+        surface.set_clip(self.rect)
+        top = self.rect.y - int(self.scroll_y)
+        for row, idx in self._visible(order):
+            surface.blit(self._row_surface(font, roster, idx), (self.rect.x, top + row * self.row_height))
+        surface.set_clip(None)
+
+        # 捲軸
+        total = len(order) * self.row_height
+        if total > self.rect.height:
+            bar = self.scrollbar
+            pygame.draw.rect(surface, BLACK, bar)
+            pygame.draw.rect(surface, TEXT_COLOR, bar, 1)
+            thumb_h = max(20, bar.height * self.rect.height // total)
+            thumb_y = bar.y + int((bar.height - thumb_h) * self.scroll_y / self.max_scroll(len(order)))
+            pygame.draw.rect(surface, GREEN, (bar.x + 2, thumb_y, bar.width - 4, thumb_h))
+
+    # --- 滑鼠 ---
+
+    def column_at(self, pos, header_y):
+        """標題列上可排序的欄位 (沒有則回傳 None)"""
+        if not header_y <= pos[1] < header_y + 30:
+            return None
+        for i, (_, x, column) in enumerate(self.columns):
+            right = self.columns[i + 1][1] if i + 1 < len(self.columns) else self.upgrade_offset
+            if column and self.rect.x + x <= pos[0] < self.rect.x + right:
+                return column
+        return None
+
+    def hit(self, pos, order):
+        """(帳號索引, 是否點在升級按鈕上)，沒點到任何列時回傳 None"""
+        if not self.rect.collidepoint(pos):
+            return None
+        row = (pos[1] - self.rect.y + int(self.scroll_y)) // self.row_height
+        if not 0 <= row < len(order):
+            return None
+        dx = pos[0] - self.rect.x
+        return order[row], self.upgrade_offset <= dx < self.upgrade_offset + 80
+
+    def drag_scrollbar(self, pos, count):
+        """以捲軸上的點擊/拖曳位置決定捲動位置，回傳是否在捲軸上"""
+        if not self.scrollbar.inflate(10, 0).collidepoint(pos):
+            return False
+        ratio = (pos[1] - self.scrollbar.y) / self.scrollbar.height
+        self.jump_to(ratio * self.max_scroll(count), count)
+        return True
+
+class Region:
+    """主畫面上的一個區域：signature() 回傳目前狀態 (None 代表隱藏)，狀態改變時才重畫"""
+    _UNSET = object()
+
+    def __init__(self, rect, draw, signature):
+        self.rect = pygame.Rect(rect)
+        self.name = getattr(draw, '__name__', 'region') # 效能分析顯示用
+        self.draw = draw
+        self.signature = signature
+        self.last_sig = Region._UNSET
+        self.visible = False
+
+def merge_rects(rects):
+    """把互相重疊的矩形合併，避免同一塊區域重畫兩次"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+class DirtyRenderer:
+    """保留模式繪製器
+
+    背景網格預先烘焙成一張 Surface；各 Region 畫在離屏的 scene 上，只有狀態改變的區域
+    (連同與它重疊的其他區域，依加入順序疊放) 會重畫。浮動文字等每幀移動的前景
+    直接畫在螢幕上，最後只把變動的矩形用 pygame.display.update(rects) 推送出去。
+    mark_sprite_layer() 之後加入的區域 (對話框、結算畫面等) 蓋在前景之上：前景與其中可見的
+    區域重疊時，改為合成進 scene 並畫在這些區域之下。
+    """
+    def __init__(self, screen, background, enabled=True):
+        self.screen = screen
+        self.background = background
+        self.scene = background.copy()
+        self.regions = []
+        self.enabled = enabled
+        self.full = True # 下一幀整個重畫
+        self.prev_sprite_rects = []
+        self.prev_baked_rects = [] # 上一幀合成進 scene 的前景
+        self.sprite_layer = None # 前景插入的位置 (區域索引)，None 代表畫在所有區域之上
+        self.last_regions = 0 # 上一幀重畫的區域數
+        self.last_pixels = 0  # 上一幀推送的像素數
+
+    def add(self, rect, draw, signature):
+        region = Region(rect, draw, signature)
+        self.regions.append(region)
+        return region
+
+    def mark_sprite_layer(self):
+        """之後加入的區域都蓋在前景之上"""
+        self.sprite_layer = len(self.regions)
+
+    def invalidate(self):
+        self.full = True
+
+    def render(self, sprites=(), overlays=()):
+        """sprites 為 (Surface, 位置) 列表，畫在前景圖層；overlays 格式相同，一律畫在最上層"""
+        screen_rect = self.screen.get_rect()
+        areas = []
+        redrawn = 0
+        for region in self.regions:
+            sig = region.signature()
+            if self.full or sig != region.last_sig:
+                region.last_sig = sig
+                areas.append(region.rect)
+                redrawn += 1
+            region.visible = sig is not None
+
+        # 被可見的上層區域蓋到的前景合成進 scene，其餘直接畫在螢幕上
+        upper = [] if self.sprite_layer is None else [
+            region.rect for region in self.regions[self.sprite_layer:] if region.visible]
+        baked, top = [], []
+        for surf, pos in sprites:
+            rect = surf.get_rect(topleft=pos).clip(screen_rect)
+            (baked if rect.collidelist(upper) >= 0 else top).append((surf, pos, rect))
+        baked_rects = [rect for _, _, rect in baked]
+        top.extend((surf, pos, surf.get_rect(topleft=pos).clip(screen_rect)) for surf, pos in overlays)
+
+        if self.full:
+            areas = [screen_rect]
+        areas = merge_rects(areas + baked_rects + self.prev_baked_rects)
+
+        for area in areas:
+            self.scene.set_clip(area)
+            self.scene.blit(self.background, area, area)
+            for i, region in enumerate(self.regions):
+                if i == self.sprite_layer:
+                    for surf, pos, rect in baked:
+                        if rect.colliderect(area):
+                            self.scene.blit(surf, pos)
+                if region.visible and region.rect.colliderect(area):
+                    with PROFILER.section(region.name):
+                        region.draw(self.scene)
+        self.scene.set_clip(None)
+
+        sprite_rects = [rect for _, _, rect in top]
+        updates = areas + self.prev_sprite_rects + sprite_rects
+        for rect in updates:
+            self.screen.blit(self.scene, rect, rect)
+        for surf, pos, _ in top:
+            self.screen.blit(surf, pos)
+        self.prev_sprite_rects = sprite_rects
+        self.prev_baked_rects = baked_rects
+
+        with PROFILER.section("flip"):
+            if self.full or not self.enabled:
+                pygame.display.flip()
+            elif updates:
+                pygame.display.update(updates)
+        self.last_regions = redrawn
+        self.last_pixels = sum(r.width * r.height for r in merge_rects(updates))
+        self.full = not self.enabled
+
+    def stats_text(self):
+        mode = "局部重畫" if self.enabled else "整頁重畫"
+        return f"{mode}: 重畫 {self.last_regions} 區 / 推送 {self.last_pixels} 像素"
+
+def profiler_overlay(font, width=420):
+    """效能分析面板：各區段的 p50/p95/p99 與最近幾百幀的幀耗時折線圖"""
+    rows = PROFILER.stats()[:12]
+    line_h = font.get_linesize()
+    graph_h = 80
+    height = 10 + line_h * (len(rows) + 2) + graph_h + 10
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 200))
+
+    # 直接 render，不經過文字快取 (數值每幀都在變)
+    frame = PROFILER.frame_stats()
+    if frame:
+        avg, p95, p99 = frame
+        title = f"幀耗時 平均 {avg * 1000:.1f} / p95 {p95 * 1000:.1f} / p99 {p99 * 1000:.1f} ms  (F5 匯出)"
     else:
-        print("警告：找不到中文字型，文字可能無法顯示。")
-        return pygame.font.Font(None, 24)
-
-def account_management_screen(screen, game, font, title_font):
-    """帳號管理頁面"""
-    clock = pygame.time.Clock()
-    running = True
-    page = 0
-    items_per_page = 10
-    
-    # 內部按鈕
-    btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
-    btn_upgrade_all = Button(170, 700, 250, 50, "一鍵升級 (低等優先)", game.upgrade_all_bots)
-
-    while running:
+        title = "效能分析中… (F5 匯出)"
+    panel.blit(font.render(title, True, GOLD), (8, 6))
+    y = 6 + line_h
+    panel.blit(font.render(f"{'區段':<24}{'p50':>8}{'p95':>8}{'p99':>8}", True, (150, 150, 150)), (8, y))
+    for name, _, p50, p95, p99, _ in rows:
+        y += line_h
+        text = f"{name[:24]:<24}{p50 * 1000:8.2f}{p95 * 1000:8.2f}{p99 * 1000:8.2f}"
+        panel.blit(font.render(text, True, WHITE), (8, y))
+
+    # 折線圖：縱軸 0~33ms，另畫 16.7ms (60 FPS) 參考線
+    graph = pygame.Rect(8, height - graph_h - 8, width - 16, graph_h)
+    pygame.draw.rect(panel, (0, 40, 0), graph)
+    budget_y = graph.bottom - int(graph.height * (1 / FPS) / (2 / FPS))
+    pygame.draw.line(panel, (120, 120, 0), (graph.left, budget_y), (graph.right, budget_y))
+    frames = list(PROFILER.frames)
+    if len(frames) > 1:
+        step = graph.width / (PROFILER.window - 1)
+        scale = graph.height / (2 / FPS)
+        points = [(graph.left + i * step, graph.bottom - min(graph.height, dt * scale))
+                  for i, dt in enumerate(frames)]
+        pygame.draw.lines(panel, GREEN, False, points)
+    return panel
+
+def make_background():
+    """預先烘焙背景網格 (駭客風)"""
+    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    background.fill(BG_COLOR)
+    for x in range(0, WINDOW_WIDTH, 40):
+        pygame.draw.line(background, (0, 30, 0), (x, 0), (x, WINDOW_HEIGHT), 1)
+    for y in range(0, WINDOW_HEIGHT, 40):
+        pygame.draw.line(background, (0, 30, 0), (0, y), (WINDOW_WIDTH, y), 1)
+    return background
+
+# --- 場景 ---
+
+class Scene:
+    """由 SceneManager 的共用事件迴圈驅動的畫面
+
+    handle_event() 處理單一事件，update() 每輪呼叫一次，render() 把畫面推到螢幕。
+    預設的 render() 只在 dirty 時呼叫 draw() 整頁重畫；收到任何事件都會設定 dirty。
+    animating() 回傳 True 時迴圈以 FPS 全速執行，否則阻塞等待下一個事件。
+    """
+    def __init__(self):
+        self.manager = None
+        self.dirty = True
+        self.on_close = None # 關閉時以結果呼叫
+
+    def on_enter(self):
+        """推入或上層場景關閉、回到此場景時"""
+        self.dirty = True
+
+    def on_exit(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def animating(self):
+        return False
+
+    def draw(self, surface):
+        pass
+
+    def render(self):
+        if self.dirty:
+            self.draw(screen)
+            pygame.display.flip()
+            self.dirty = False
+
+    def close(self, result=None):
+        self.manager.pop(self, result)
+
+class SceneManager:
+    """場景堆疊與唯一的主迴圈
+
+    有動畫時以 FPS 更新；沒有時以 pygame.event.wait 阻塞，最多 idle_timeout 毫秒醒來一次
+    (讓背景存檔、資源載入等結果得以反映)，玩家只是在看畫面時幾乎不佔用 CPU。
+    """
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.stack = []
+        self.clock = pygame.time.Clock()
+        self.idle_timeout = idle_timeout
+        self.running = False
+        self._pending = [] # 阻塞等待時收到的事件，留到下一輪處理
+        self.frames = 0
+        self.idle_frames = 0
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene, on_close=None):
+        scene.manager = self
+        scene.on_close = on_close
+        self.stack.append(scene)
+        scene.on_enter()
+        return scene
+
+    def pop(self, scene=None, result=None):
+        if scene is not None and scene is not self.top:
+            return
+        scene = self.stack.pop()
+        scene.on_exit()
+        if scene.on_close:
+            scene.on_close(result)
+        if self.top is not None and self.top is not scene:
+            self.top.on_enter()
+
+    def switch(self, scene):
+        """關閉所有場景後推入 scene (例如從標題或讀檔畫面進入遊戲)"""
+        while self.stack:
+            self.stack.pop().on_exit()
+        self.push(scene)
+
+    def quit(self):
+        self.running = False
+
+    def run(self):
+        self.running = True
+        while self.running and self.stack:
+            PROFILER.begin_frame()
+            events, self._pending = self._pending + pygame.event.get(), []
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    break
+                scene = self.top
+                if scene is None:
+                    break
+                scene.handle_event(event)
+                scene.dirty = True # 輸入驅動重畫
+            PROFILER.lap("events")
+            scene = self.top
+            if not self.running or scene is None:
+                break
+
+            scene.update()
+            PROFILER.lap("update")
+            scene.render()
+            PROFILER.lap("render")
+
+            self.frames += 1
+            if self.top is not None and not self.top.animating() and not self._pending:
+                self.idle_frames += 1
+                event = pygame.event.wait(self.idle_timeout)
+                if event.type != pygame.NOEVENT:
+                    self._pending.append(event)
+            self.clock.tick(FPS) # 連續輸入時也不超過 FPS
+            PROFILER.lap("idle")
+
+    def stats_text(self):
+        return f"場景 {type(self.top).__name__} | 閒置幀 {self.idle_frames}/{self.frames}"
+
+# --- 主程式 ---
+
+class AccountScene(Scene):
+    """帳號管理頁面：可排序、篩選、平滑捲動的帳號表格"""
+    header_y = 130
+    # (篩選條件, 按鈕文字)
+    filters = ((None, "全部"), ('banned', "已封鎖"), ('exhausted', "已用完"), ('upgradeable', "可升級"))
+
+    def __init__(self, game, font, title_font):
+        super().__init__()
+        self.game = game
+        self.font = font
+        self.title_font = title_font
+        self.table = BotTable(40, 170, 940, 480)
+        self.dragging = False
+
+        # 內部按鈕
+        self.btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
+        self.btn_upgrade_all = Button(170, 700, 250, 50, "一鍵升級 (低等優先)", lambda: game.upgrade_all_bots())
+
+        # 批量升級：花光資金的最佳方案，或全員升到指定等級
+        self.target_level = max(2, game.bots.max_level())
+        btn_spend_all = Button(440, 700, 180, 50, "最佳化升級", lambda: game.bulk_upgrade())
+        btn_target_dec = Button(640, 700, 40, 50, "-", lambda: self.adjust_target(-1))
+        self.btn_target = Button(685, 700, 200, 50, "", lambda: game.bulk_upgrade(target=self.target_level))
+        btn_target_inc = Button(890, 700, 40, 50, "+", lambda: self.adjust_target(1))
+        self.upgrade_buttons = [btn_spend_all, btn_target_dec, self.btn_target, btn_target_inc]
+        self.plan_key = None
+
+        self.filter_buttons = [Button(560 + i * 105, 75, 100, 35, label, lambda f=f: self.table.set_filter(f))
+                               for i, (f, label) in enumerate(self.filters)]
+
+    def adjust_target(self, delta):
+        self.target_level = max(2, self.target_level + delta)
+
+    def order(self):
+        return self.table.order(self.game.bots, self.game.money)
+
+    def animating(self):
+        return self.table.animating() or self.dragging
+
+    def update(self):
+        if self.table.update(len(self.order())):
+            self.dirty = True
+
+    def draw(self, screen):
+        game, font, table = self.game, self.font, self.table
+        order = self.order()
         screen.fill(BG_COLOR)
-        
+
         # 標題
-        screen.blit(title_font.render("帳號管理中心", True, GOLD), (50, 30))
-        screen.blit(font.render(f"資金: ${game.money} | 帳號總數: {len(game.bots)}", True, WHITE), (50, 80))
+        screen.blit(TEXT.render(self.title_font, "帳號管理中心", GOLD), (50, 30))
+        screen.blit(TEXT.render_glyphs(font, f"資金: ${game.money} | 帳號總數: {len(game.bots)}", WHITE), (50, 80))
+        for (f, _), btn in zip(self.filters, self.filter_buttons):
+            btn.color = GOLD if f == table.filter else BUTTON_COLOR
+            btn.draw(screen, font)
 
-        # 列表標頭
-        headers = ["ID", "等級", "影響力", "隱蔽值", "今日用量", "狀態", "升級費用"]
-        x_pos = [50, 120, 200, 320, 440, 580, 700]
+        # 列表標頭 (點擊可排序的欄位切換排序)
         pygame.draw.line(screen, WHITE, (40, 120), (980, 120), 2)
-        for i, h in enumerate(headers):
-            screen.blit(font.render(h, True, GOLD), (x_pos[i], 130))
+        table.draw_header(screen, font, self.header_y)
+        screen.blit(TEXT.render_glyphs(font, f"符合 {len(order)}", (150, 150, 150)), (850, self.header_y))
         pygame.draw.line(screen, WHITE, (40, 160), (980, 160), 2)
 
-        # 列表內容
-        total_pages = (len(game.bots) - 1) // items_per_page + 1
-        if page >= total_pages: page = max(0, total_pages - 1)
-        
-        start = page * items_per_page
-        end = min(start + items_per_page, len(game.bots))
-        
-        y = 180
-        for i in range(start, end):
-            bot = game.bots[i]
-            color = WHITE
-            status = "正常"
-            cost_str = f"${bot.get_upgrade_cost()}"
-            
-            if bot.is_banned:
-                color = RED
-                status = "已封鎖"
-                cost_str = "-"
-            
-            row = [
-                f"#{i+1}", f"Lv.{bot.level}", f"{bot.influence}", 
-                f"{bot.stealth}", f"{bot.used_today}/{bot.max_uses}", 
-                status, cost_str
-            ]
-            
-            for j, txt in enumerate(row):
-                screen.blit(font.render(txt, True, color), (x_pos[j], y))
-            
-            # 單個升級按鈕
-            if not bot.is_banned:
-                btn_rect = pygame.Rect(850, y, 80, 30)
-                pygame.draw.rect(screen, BUTTON_COLOR, btn_rect)
-                pygame.draw.rect(screen, TEXT_COLOR, btn_rect, 1)
-                screen.blit(font.render("升級", True, WHITE), (865, y+2))
-            
-            y += 50
+        # 列表內容 (只畫看得到的列)
+        table.draw(screen, font, game.bots, order)
+
+        # 批量升級預覽 (資金、名冊或目標等級變動時才重算)
+        key = (game.money, game.bots.version, self.target_level)
+        if key != self.plan_key:
+            self.plan_key = key
+            self.best_plan = game.plan_upgrades()
+            self.target_plan = game.plan_upgrades(target=self.target_level)
+            self.btn_target.text = f"全員升到 Lv{self.target_level}"
+        best_plan, target_plan = self.best_plan, self.target_plan
+        preview = (f"最佳化: 升 {best_plan.upgrades} 級 花費 ${best_plan.cost} 影響力 +{best_plan.influence_gain}"
+                   f"  |  全員 Lv{self.target_level}: 需 ${target_plan.cost} 影響力 +{target_plan.influence_gain}")
+        preview_color = WHITE if target_plan.cost <= game.money else RED
+        screen.blit(TEXT.render_glyphs(font, preview, preview_color), (50, 665))
+
+        self.btn_back.draw(screen, font)
+        self.btn_upgrade_all.draw(screen, font)
+        for btn in self.upgrade_buttons:
+            btn.draw(screen, font)
+
+    def handle_event(self, event):
+        table = self.table
+        for btn in self.upgrade_buttons + self.filter_buttons:
+            btn.check_click(event)
+
+        if event.type == pygame.MOUSEWHEEL:
+            table.scroll(-event.y * 3, len(self.order()))
+        elif event.type == pygame.KEYDOWN:
+            count = len(self.order())
+            page = table.rect.height // table.row_height
+            if event.key == pygame.K_PAGEDOWN: table.scroll(page, count)
+            elif event.key == pygame.K_PAGEUP: table.scroll(-page, count)
+            elif event.key == pygame.K_DOWN: table.scroll(1, count)
+            elif event.key == pygame.K_UP: table.scroll(-1, count)
+            elif event.key == pygame.K_HOME: table.scroll_to(0, count)
+            elif event.key == pygame.K_END: table.scroll_to(table.max_scroll(count), count)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            table.drag_scrollbar((table.scrollbar.x, event.pos[1]), len(self.order()))
 
-        # 頁碼與翻頁箭頭
-        page_str = f"頁數: {page+1}/{max(1, total_pages)}"
-        screen.blit(font.render(page_str, True, WHITE), (850, 80))
-        
-        # 繪製翻頁按鈕區域 (簡單圖示)
-        prev_rect = pygame.Rect(810, 80, 30, 30)
-        next_rect = pygame.Rect(980, 80, 30, 30)
-        pygame.draw.polygon(screen, WHITE, [(830, 85), (830, 105), (810, 95)])
-        pygame.draw.polygon(screen, WHITE, [(980, 85), (980, 105), (1000, 95)])
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.btn_back.rect.collidepoint(event.pos):
+                play_sound('click')
+                self.close()
+                return
+            if self.btn_upgrade_all.rect.collidepoint(event.pos):
+                self.btn_upgrade_all.callback()
 
-        btn_back.draw(screen, font)
-        btn_upgrade_all.draw(screen, font)
+            column = table.column_at(event.pos, self.header_y)
+            if column:
+                play_sound('click')
+                table.set_sort(column)
+                return
+            if table.drag_scrollbar(event.pos, len(self.order())):
+                self.dragging = True
+                return
+
+            # 單個升級點擊偵測
+            hit = table.hit(event.pos, self.order())
+            if hit:
+                idx, on_button = hit
+                if on_button and not self.game.bots.is_banned[idx]:
+                    self.game.upgrade_bot(self.game.bots[idx])
+
+class SaveLoadScene(Scene):
+    """存檔/讀檔選擇介面 (支援翻頁)；主選單讀檔時 (game 為 None) 以讀入的 GameState 關閉"""
+    items_per_page = 8
 
-        pygame.display.flip()
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if btn_back.rect.collidepoint(event.pos):
-                    running = False
-                    play_sound('click')
-                if btn_upgrade_all.rect.collidepoint(event.pos):
-                    btn_upgrade_all.callback()
-                
-                # 翻頁
-                if prev_rect.collidepoint(event.pos) and page > 0:
-                    page -= 1
-                    play_sound('click')
-                if next_rect.collidepoint(event.pos) and page < total_pages - 1:
-                    page += 1
-                    play_sound('click')
-                
-                # 單個升級點擊偵測
-                y_check = 180
-                for i in range(start, end):
-                    bot = game.bots[i]
-                    if not bot.is_banned:
-                        btn_rect = pygame.Rect(850, y_check, 80, 30)
-                        if btn_rect.collidepoint(event.pos):
-                            game.upgrade_bot(bot)
-                    y_check += 50
-        
-        clock.tick(FPS)
+    def __init__(self, game, font, title_font, is_save_mode=False):
+        super().__init__()
+        self.game = game
+        self.font = font
+        self.title_font = title_font
+        self.is_save_mode = is_save_mode
+        self.page = 0
 
-def save_load_screen(screen, game, font, title_font, is_save_mode=False):
-    """存檔/讀檔選擇介面 (支援翻頁)"""
-    clock = pygame.time.Clock()
-    running = True
-    page = 0
-    items_per_page = 8
-    loaded_game_obj = None
-    
-    btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
-    
-    def open_save_folder():
-        try:
-            os.startfile(BASE_DIR)
-        except Exception:
-            pass
-    btn_open_folder = Button(380, 700, 200, 50, "開啟存檔資料夾", open_save_folder)
+        self.btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
+
+        def open_save_folder():
+            try:
+                os.startfile(BASE_DIR)
+            except Exception:
+                pass
+        self.btn_open_folder = Button(380, 700, 200, 50, "開啟存檔資料夾", open_save_folder)
+
+        # 如果是存檔模式，增加一個新建存檔按鈕
+        self.btn_new_save = None
+        if is_save_mode:
+            self.btn_new_save = Button(170, 700, 200, 50, "新建存檔", lambda: None)
+
+        # 翻頁按鈕區域
+        self.prev_rect = pygame.Rect(810, 40, 30, 30)
+        self.next_rect = pygame.Rect(980, 40, 30, 30)
 
-    # 如果是存檔模式，增加一個新建存檔按鈕
-    btn_new_save = None
-    if is_save_mode:
-        btn_new_save = Button(170, 700, 200, 50, "新建存檔", lambda: None)
+        # 預先讀取檔案資訊 (避免每幀讀取)
+        self.files_info = self.get_files_info()
 
-    # --- 預先讀取檔案資訊 (避免每幀讀取) ---
-    def get_files_info():
+    def get_files_info(self):
+        # 由存檔索引取得 (已按時間排序)，不必逐一開檔
         info_list = []
-        try:
-            f_names = [f for f in os.listdir(BASE_DIR) if f.endswith('.pkl')]
-            # 按時間排序
-            f_names.sort(key=lambda x: os.path.getmtime(os.path.join(BASE_DIR, x)), reverse=True)
-            
-            for fname in f_names:
-                fpath = os.path.join(BASE_DIR, fname)
-                mtime = time.strftime('%Y-%m-%d %H:%M', time.localtime(os.path.getmtime(fpath)))
-                day = "?"
-                money = "?"
-                try:
-                    with open(fpath, 'rb') as f:
-                        data = pickle.load(f)
-                        if isinstance(data, dict):
-                            day = data.get('day', '?')
-                            money = data.get('money', '?')
-                except:
-                    pass
-                info_list.append({
-                    'name': fname,
-                    'mtime': mtime,
-                    'day': day,
-                    'money': money
-                })
-        except Exception:
-            pass
+        for slot in save_format.slot_index(BASE_DIR).slots():
+            info_list.append({
+                'name': slot['name'],
+                'mtime': time.strftime('%Y-%m-%d %H:%M', time.localtime(slot['mtime'])),
+                'day': slot['day'] if slot['day'] is not None else "?",
+                'money': slot['money'] if slot['money'] is not None else "?",
+            })
         return info_list
 
-    files_info = get_files_info()
+    def _page_range(self):
+        total_pages = max(1, (len(self.files_info) - 1) // self.items_per_page + 1)
+        if self.page >= total_pages:
+            self.page = max(0, total_pages - 1)
+        start = self.page * self.items_per_page
+        return total_pages, start, min(start + self.items_per_page, len(self.files_info))
 
-    while running:
+    def draw(self, screen):
+        font = self.font
         screen.fill(BG_COLOR)
-        
-        title_text = "選擇存檔位置 (覆蓋)" if is_save_mode else "選擇讀取進度"
-        screen.blit(title_font.render(title_text, True, GOLD), (50, 30))
 
-        total_pages = max(1, (len(files_info) - 1) // items_per_page + 1)
-        if page >= total_pages: page = max(0, total_pages - 1)
+        title_text = "選擇存檔位置 (覆蓋)" if self.is_save_mode else "選擇讀取進度"
+        screen.blit(TEXT.render(self.title_font, title_text, GOLD), (50, 30))
 
         # 顯示列表
-        start = page * items_per_page
-        end = min(start + items_per_page, len(files_info))
-        
+        total_pages, start, end = self._page_range()
+        mouse_pos = pygame.mouse.get_pos()
         y = 100
         for i in range(start, end):
-            info = files_info[i]
+            info = self.files_info[i]
             fname = info['name']
-            
+
             display_name = fname
-            if fname == "autosave.pkl":
+            if os.path.splitext(fname)[0] == "autosave":
                 display_name = "自動存檔 (autosave)"
             if i == 0: # 最新的檔案
                 display_name += " [最新]"
-            
+
             # 繪製選項背景
             row_rect = pygame.Rect(50, y, 900, 50)
             bg_color = PANEL_COLOR
-            if row_rect.collidepoint(pygame.mouse.get_pos()):
+            if row_rect.collidepoint(mouse_pos):
                 bg_color = (70, 70, 70)
             pygame.draw.rect(screen, bg_color, row_rect, 1) # 改為線框
-            
-            screen.blit(font.render(display_name, True, WHITE), (70, y + 10))
-            
+
+            screen.blit(TEXT.render(font, display_name, WHITE), (70, y + 10))
+
             # 顯示天數與資金
             stats_text = f"第 {info['day']} 天 | ${info['money']}"
-            screen.blit(font.render(stats_text, True, GOLD), (400, y + 10))
-            
-            screen.blit(font.render(info['mtime'], True, (150, 150, 150)), (620, y + 10))
+            screen.blit(TEXT.render(font, stats_text, GOLD), (400, y + 10))
+
+            screen.blit(TEXT.render(font, info['mtime'], (150, 150, 150)), (620, y + 10))
 
             # 刪除按鈕
             del_rect = pygame.Rect(850, y + 10, 80, 30)
-            del_color = RED if del_rect.collidepoint(pygame.mouse.get_pos()) else (180, 50, 50)
+            del_color = RED if del_rect.collidepoint(mouse_pos) else (180, 50, 50)
             pygame.draw.rect(screen, del_color, del_rect)
-            screen.blit(font.render("刪除", True, WHITE), (865, y + 12))
-            
+            screen.blit(TEXT.render(font, "刪除", WHITE), (865, y + 12))
+
             y += 60
 
-        # 頁碼
-        page_str = f"頁數: {page+1}/{total_pages}"
-        screen.blit(font.render(page_str, True, WHITE), (850, 40))
-        
-        # 翻頁按鈕區域
-        prev_rect = pygame.Rect(810, 40, 30, 30)
-        next_rect = pygame.Rect(980, 40, 30, 30)
+        # 頁碼與翻頁箭頭
+        page_str = f"頁數: {self.page+1}/{total_pages}"
+        screen.blit(TEXT.render(font, page_str, WHITE), (850, 40))
         pygame.draw.polygon(screen, WHITE, [(830, 45), (830, 65), (810, 55)])
         pygame.draw.polygon(screen, WHITE, [(980, 45), (980, 65), (1000, 55)])
 
-        btn_back.draw(screen, font)
-        btn_open_folder.draw(screen, font)
-        if btn_new_save:
-            btn_new_save.draw(screen, font)
+        self.btn_back.draw(screen, font)
+        self.btn_open_folder.draw(screen, font)
+        if self.btn_new_save:
+            self.btn_new_save.draw(screen, font)
 
-        pygame.display.flip()
+    def handle_event(self, event):
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            return
+        game = self.game
+        if self.btn_back.rect.collidepoint(event.pos):
+            play_sound('click')
+            self.close()
+            return
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if btn_back.rect.collidepoint(event.pos):
-                    running = False
-                    play_sound('click')
-                
-                if btn_open_folder.rect.collidepoint(event.pos):
+        if self.btn_open_folder.rect.collidepoint(event.pos):
+            play_sound('click')
+            self.btn_open_folder.callback()
+
+        if self.btn_new_save and self.btn_new_save.rect.collidepoint(event.pos):
+            # 新建存檔
+            # 使用可讀性更高的時間格式 (YYYYMMDD_HHMMSS)，並防止檔名重複
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            base_name = f"save_{timestamp}"
+            new_name = f"{base_name}{SAVE_EXT}"
+
+            # 檢查檔案是否存在，若存在則加上流水號
+            counter = 1
+            while os.path.exists(os.path.join(BASE_DIR, new_name)):
+                new_name = f"{base_name}_{counter}{SAVE_EXT}"
+                counter += 1
+
+            game.save_game(new_name)
+            play_sound('success')
+            self.close()
+            return
+
+        # 翻頁
+        total_pages, start, end = self._page_range()
+        if self.prev_rect.collidepoint(event.pos) and self.page > 0: self.page -= 1; play_sound('click')
+        if self.next_rect.collidepoint(event.pos) and self.page < total_pages - 1: self.page += 1; play_sound('click')
+
+        # 點擊檔案
+        y_check = 100
+        for i in range(start, end):
+            # 檢查刪除按鈕
+            del_check_rect = pygame.Rect(850, y_check + 10, 80, 30)
+            if del_check_rect.collidepoint(event.pos):
+                try:
+                    os.remove(os.path.join(BASE_DIR, self.files_info[i]['name']))
                     play_sound('click')
-                    btn_open_folder.callback()
-                
-                if btn_new_save and btn_new_save.rect.collidepoint(event.pos):
-                    # 新建存檔
-                    # 使用可讀性更高的時間格式 (YYYYMMDD_HHMMSS)，並防止檔名重複
-                    timestamp = time.strftime('%Y%m%d_%H%M%S')
-                    base_name = f"save_{timestamp}"
-                    new_name = f"{base_name}.pkl"
-                    
-                    # 檢查檔案是否存在，若存在則加上流水號
-                    counter = 1
-                    while os.path.exists(os.path.join(BASE_DIR, new_name)):
-                        new_name = f"{base_name}_{counter}.pkl"
-                        counter += 1
-
-                    game.save_game(new_name)
-                    running = False
-                    play_sound('success')
-
-                # 翻頁
-                if prev_rect.collidepoint(event.pos) and page > 0: page -= 1; play_sound('click')
-                if next_rect.collidepoint(event.pos) and page < total_pages - 1: page += 1; play_sound('click')
-
-                # 點擊檔案
-                y_check = 100
-                for i in range(start, end):
-                    # 檢查刪除按鈕
-                    del_check_rect = pygame.Rect(850, y_check + 10, 80, 30)
-                    if del_check_rect.collidepoint(event.pos):
-                        try:
-                            os.remove(os.path.join(BASE_DIR, files_info[i]['name']))
-                            play_sound('click')
-                            # 重新讀取列表以刷新畫面
-                            files_info = get_files_info()
-                            total_pages = max(1, (len(files_info) - 1) // items_per_page + 1)
-                            if page >= total_pages: page = max(0, total_pages - 1)
-                            continue # 跳過後續點擊判斷
-                        except Exception as e:
-                            print(f"刪除失敗: {e}")
-
-                    if pygame.Rect(50, y_check, 900, 50).collidepoint(event.pos):
-                        fname = files_info[i]['name']
-                        if is_save_mode:
-                            if game: game.save_game(fname)
-                            play_sound('success')
-                        else:
-                            if game:
-                                game.load_game(fname)
-                            else:
-                                # 主選單讀取模式：建立臨時遊戲狀態來讀取
-                                temp_game = GameState("Standard")
-                                temp_game.load_game(fname)
-                                loaded_game_obj = temp_game
-                            play_sound('success')
-                        running = False
-                    y_check += 60
-        clock.tick(FPS)
-    return loaded_game_obj
-
-def settings_screen(game, font, title_font):
-    """設定頁面"""
-    clock = pygame.time.Clock()
-    running = True
-    
-    btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
+                    # 重新讀取列表以刷新畫面
+                    self.files_info = self.get_files_info()
+                    return # 跳過後續點擊判斷
+                except Exception as e:
+                    print(f"刪除失敗: {e}")
 
-    while running:
+            if pygame.Rect(50, y_check, 900, 50).collidepoint(event.pos):
+                fname = self.files_info[i]['name']
+                loaded_game = None
+                if self.is_save_mode:
+                    if game: game.save_game(fname)
+                elif game:
+                    game.load_game(fname)
+                else:
+                    # 主選單讀取模式：建立臨時遊戲狀態來讀取
+                    loaded_game = GameState("Standard")
+                    loaded_game.load_game(fname)
+                play_sound('success')
+                self.close(loaded_game)
+                return
+            y_check += 60
+
+class SettingsScene(Scene):
+    """設定頁面"""
+    def __init__(self, game, font, title_font):
+        super().__init__()
+        self.game = game
+        self.font = font
+        self.title_font = title_font
+        self.btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
+
+        def cycle(attr, options):
+            current = getattr(SETTINGS, attr)
+            index = options.index(current) if current in options else -1
+            setattr(SETTINGS, attr, options[(index + 1) % len(options)])
+
+        self.btn_ff_days = Button(250, 215, 200, 40, "", lambda: cycle('fast_forward_days', FAST_FORWARD_DAYS))
+        self.btn_ff_policy = Button(250, 275, 200, 40, "", lambda: cycle('fast_forward_policy', FAST_FORWARD_POLICIES))
+        self.btn_per_action = Button(250, 335, 200, 40, "", self.toggle_per_action)
+
+    def toggle_per_action(self):
+        SETTINGS.telemetry_per_action = not SETTINGS.telemetry_per_action
+        if self.game and self.game.telemetry:
+            self.game.telemetry.per_action = SETTINGS.telemetry_per_action
+
+    def draw(self, screen):
+        font = self.font
         screen.fill(BG_COLOR)
-        screen.blit(title_font.render("遊戲設定", True, GOLD), (50, 30))
+        screen.blit(TEXT.render(self.title_font, "遊戲設定", GOLD), (50, 30))
 
         # --- 音量控制 ---
-        screen.blit(font.render(f"音量: {int(SETTINGS.volume * 100)}%", True, WHITE), (100, 150))
+        screen.blit(TEXT.render_glyphs(font, f"音量: {int(SETTINGS.volume * 100)}%", WHITE), (100, 150))
         # 滑桿背景
         bar_rect = pygame.Rect(250, 160, 400, 10)
         pygame.draw.rect(screen, (0, 50, 0), bar_rect)
@@ -919,430 +1427,642 @@ def settings_screen(game, font, title_font):
         knob_x = 250 + fill_width
         pygame.draw.circle(screen, WHITE, (knob_x, 165), 12)
 
-        btn_back.draw(screen, font)
-        pygame.display.flip()
+        # --- 快轉設定 ---
+        screen.blit(TEXT.render(font, "快轉天數:", WHITE), (100, 225))
+        self.btn_ff_days.text = f"{SETTINGS.fast_forward_days} 天"
+        self.btn_ff_days.draw(screen, font)
+        screen.blit(TEXT.render(font, "快轉自動任務:", WHITE), (100, 285))
+        self.btn_ff_policy.text = SETTINGS.fast_forward_policy or "關閉"
+        self.btn_ff_policy.draw(screen, font)
+        screen.blit(TEXT.render(font, "逐動作遙測:", WHITE), (100, 345))
+        self.btn_per_action.text = "開啟" if SETTINGS.telemetry_per_action else "關閉 (每日)"
+        self.btn_per_action.draw(screen, font)
+
+        self.btn_back.draw(screen, font)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.btn_back.rect.collidepoint(event.pos):
+                play_sound('click')
+                self.close()
+                return
+            self.btn_ff_days.check_click(event)
+            self.btn_ff_policy.check_click(event)
+            self.btn_per_action.check_click(event)
+
+        # 滑鼠拖曳或點擊調整音量
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION) and pygame.mouse.get_pressed()[0]:
+            mx, my = pygame.mouse.get_pos()
+            if 230 <= mx <= 670 and 140 <= my <= 190:
+                ratio = (mx - 250) / 400
+                update_volume(ratio)
+
+# 圖表可選的指標：(欄位, 名稱, 顏色)
+CHART_METRICS = (
+    ('money', "資金", GOLD),
+    ('reputation', "聲望", GREEN),
+    ('bots', "帳號數", WHITE),
+    ('bans', "封鎖數", RED),
+    ('salary', "工資", (255, 150, 0)),
+    ('income', "收入", (100, 200, 255)),
+)
+CHART_RANGES = ((None, "全部"), (365, "最近一年"), (30, "最近 30 天"))
+
+class TelemetryScene(Scene):
+    """經濟數據圖表：從遙測檔取樣，只在切換指標或範圍時重新讀取
+
+    遙測檔無法開啟時建構子會拋出 OSError / TelemetryError。
+    """
+    plot = pygame.Rect(80, 150, 880, 470)
+    axis_color = (0, 90, 0)
+
+    def __init__(self, game, font, title_font):
+        super().__init__()
+        self.game = game
+        self.font = font
+        self.title_font = title_font
+        game.telemetry.flush()
+        self.reader = TelemetryReader(game.telemetry.path)
+
+        self.metric = 0
+        self.range = 0
+        self.metric_buttons = [Button(50 + i * 120, 90, 110, 40, name, lambda i=i: setattr(self, 'metric', i))
+                               for i, (_, name, _) in enumerate(CHART_METRICS)]
+        self.range_buttons = [Button(780 - i * 130, 700, 120, 50, name, lambda i=i: setattr(self, 'range', i))
+                              for i, (_, name) in enumerate(CHART_RANGES)]
+        self.btn_back = Button(50, 700, 100, 50, "返回", lambda: None)
+        self.buttons = self.metric_buttons + self.range_buttons
+        self.day_col = self.reader.column('day')
+        self.cache_key = None
+        self.rows = []
+
+    def on_exit(self):
+        self.reader.close()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if btn_back.rect.collidepoint(event.pos):
-                    running = False
-                    play_sound('click')
+    def update(self):
+        key = (self.metric, self.range)
+        if key != self.cache_key: # 只讀取取樣到的紀錄，與總天數無關
+            self.cache_key = key
+            days = CHART_RANGES[self.range][0]
+            start = self.reader.bisect_day(self.game.day - days) if days else 0
+            self.rows = self.reader.sample(self.plot.width // 2, start)
+
+    def draw(self, screen):
+        font, plot, rows = self.font, self.plot, self.rows
+        field, name, color = CHART_METRICS[self.metric]
+        col = self.reader.column(field)
+        screen.fill(BG_COLOR)
+        screen.blit(TEXT.render(self.title_font, "經營數據", GOLD), (50, 30))
+        pygame.draw.rect(screen, BLACK, plot)
+        pygame.draw.rect(screen, self.axis_color, plot, 1)
+        for i, btn in enumerate(self.metric_buttons):
+            btn.color = GOLD if i == self.metric else BUTTON_COLOR
+        for i, btn in enumerate(self.range_buttons):
+            btn.color = GOLD if i == self.range else BUTTON_COLOR
+        for btn in self.buttons:
+            btn.draw(screen, font)
+        self.btn_back.draw(screen, font)
+
+        if len(rows) < 2:
+            screen.blit(TEXT.render(font, "紀錄不足，至少需要兩天的資料", WHITE), (plot.x + 20, plot.y + 20))
+            return
+        values = [row[col] for row in rows]
+        lo, hi = min(values), max(values)
+        span = (hi - lo) or 1
+        step = plot.width / (len(values) - 1)
+        points = [(plot.x + i * step, plot.bottom - 1 - (v - lo) * (plot.height - 2) / span)
+                  for i, v in enumerate(values)]
+        if lo < 0 < hi: # 零軸
+            zero_y = plot.bottom - 1 - (0 - lo) * (plot.height - 2) / span
+            pygame.draw.line(screen, self.axis_color, (plot.x, zero_y), (plot.right, zero_y))
+        pygame.draw.lines(screen, color, False, points, 2)
+        screen.blit(TEXT.render_glyphs(font, f"{hi}", color), (plot.x + 5, plot.y + 5))
+        screen.blit(TEXT.render_glyphs(font, f"{lo}", color), (plot.x + 5, plot.bottom - 25))
+        screen.blit(TEXT.render_glyphs(font, f"第 {rows[0][self.day_col]} 天", WHITE), (plot.x, plot.bottom + 5))
+        last_day = TEXT.render_glyphs(font, f"第 {rows[-1][self.day_col]} 天", WHITE)
+        screen.blit(last_day, (plot.right - last_day.get_width(), plot.bottom + 5))
+        summary = f"{name}  目前 {values[-1]}  最高 {hi}  最低 {lo}  ({len(self.reader)} 筆紀錄)"
+        screen.blit(TEXT.render_glyphs(font, summary, WHITE), (plot.x + 200, plot.bottom + 5))
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.btn_back.rect.collidepoint(event.pos):
+                play_sound('click')
+                self.close()
+                return
+        for btn in self.buttons:
+            btn.check_click(event)
+
+def attach_telemetry(game):
+    """讓遊戲寫入遙測檔：新遊戲重新開始，讀檔進入時若是同一局則接續到存檔當天"""
+    writer = TelemetryWriter(os.path.join(BASE_DIR, TELEMETRY_NAME), SETTINGS.telemetry_per_action)
+    try:
+        if game.current_filename:
+            writer.rewind(game.day, game.seed)
+        else:
+            writer.start(game.seed)
+    except (OSError, TelemetryError) as e:
+        print(f"遙測檔無法接續，重新開始: {e}")
+        writer.start(game.seed)
+    game.telemetry = writer
+    game.sample_telemetry()
+
+def draw_title(title_font):
+    title_surf = TEXT.render(title_font, "網路水軍模擬器", GOLD)
+    screen.blit(title_surf, (WINDOW_WIDTH//2 - title_surf.get_width()//2, 150))
+
+def boot():
+    """快速啟動：只初始化顯示與字型模組並畫出第一幀，其餘資源交給 ASSETS 在背景載入"""
+    global screen
+    STARTUP.reset()
+    with STARTUP.phase("pygame"):
+        pygame.display.init()
+        pygame.font.init()
+    with STARTUP.phase("視窗"):
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("網路水軍模擬器 v0.2 (Pygame Edition)")
+    ASSETS.start()
+    with STARTUP.phase("字型"):
+        font, title_font = ASSETS.fonts()
+    screen.fill(BG_COLOR)
+    draw_title(title_font)
+    pygame.display.flip()
+    STARTUP.mark("首幀")
+    return font, title_font
+
+class TitleScene(Scene):
+    """難度選擇畫面；選好或讀入遊戲後呼叫 start_game(game)"""
+    def __init__(self, font, title_font, start_game):
+        super().__init__()
+        self.font = font
+        self.title_font = title_font
+        self.start_game = start_game
+
+        cx = WINDOW_WIDTH // 2 - 150
+        self.buttons = [
+            Button(cx, 300, 300, 50, "簡單 (資金$2000 / 風險低)", lambda: self.new_game("Easy")),
+            Button(cx, 370, 300, 50, "標準 (資金$1000 / 標準)", lambda: self.new_game("Standard")),
+            Button(cx, 440, 300, 50, "困難 (資金$500 / 風險高)", lambda: self.new_game("Hard")),
+            Button(cx, 510, 300, 50, "讀取存檔", self.open_load_menu),
+        ]
 
-            # 滑鼠拖曳或點擊調整音量
-            if pygame.mouse.get_pressed()[0]:
-                mx, my = pygame.mouse.get_pos()
-                if 230 <= mx <= 670 and 140 <= my <= 190:
-                    ratio = (mx - 250) / 400
-                    update_volume(ratio)
+        # 尋找最新的存檔 (繼續遊戲功能)
+        latest = save_format.slot_index(BASE_DIR).latest()
+        if latest:
+            mtime = time.strftime('%m/%d %H:%M', time.localtime(latest['mtime']))
+            self.buttons.insert(0, Button(cx, 230, 300, 50, f"繼續遊戲 ({mtime})", lambda: self.load_latest(latest['name'])))
 
-        clock.tick(FPS)
+    def new_game(self, difficulty):
+        play_sound('click')
+        self.start_game(GameState(difficulty))
 
-def main():
-    global screen
-    pygame.init()
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption("網路水軍模擬器 v0.2 (Pygame Edition)")
-    init_audio() # 初始化音效系統
-    clock = pygame.time.Clock()
-    
-    # 設定字型
-    font = get_chinese_font()
-    title_font = pygame.font.Font(pygame.font.match_font(["microsoftjhenghei", "simhei"]), 36)
-
-    # --- 難度選擇畫面 ---
-    game = None
-    
-    def start_new_game(d):
-        nonlocal game
-        game = GameState(d)
+    def load_latest(self, filename):
+        try:
+            game = GameState("Standard") # 建立臨時狀態
+            game.load_game(filename)     # 讀取存檔覆蓋
+        except Exception as e:
+            print(f"讀取失敗: {e}")
+            return
         play_sound('click')
+        self.start_game(game)
 
-    cx = WINDOW_WIDTH // 2 - 150
-    btn_easy = Button(cx, 300, 300, 50, "簡單 (資金$2000 / 風險低)", lambda: start_new_game("Easy"))
-    btn_standard = Button(cx, 370, 300, 50, "標準 (資金$1000 / 標準)", lambda: start_new_game("Standard"))
-    btn_hard = Button(cx, 440, 300, 50, "困難 (資金$500 / 風險高)", lambda: start_new_game("Hard"))
+    def open_load_menu(self):
+        self.manager.push(SaveLoadScene(None, self.font, self.title_font, False),
+                          on_close=lambda game: game and self.start_game(game))
 
-    def open_load_menu():
-        nonlocal game
-        loaded = save_load_screen(screen, None, font, title_font, False)
-        if loaded:
-            game = loaded
-
-    btn_load_save = Button(cx, 510, 300, 50, "讀取存檔", open_load_menu)
-
-    # 尋找最新的存檔 (繼續遊戲功能)
-    btn_continue = None
-    save_files = [f for f in os.listdir(BASE_DIR) if f.endswith('.pkl')]
-    if save_files:
-        latest_save = max(save_files, key=lambda x: os.path.getmtime(os.path.join(BASE_DIR, x)))
-        mtime = time.strftime('%m/%d %H:%M', time.localtime(os.path.getmtime(os.path.join(BASE_DIR, latest_save))))
-        
-        def load_latest():
-            nonlocal game
-            try:
-                g = GameState("Standard") # 建立臨時狀態
-                g.load_game(latest_save)  # 讀取存檔覆蓋
-                game = g
-                play_sound('click')
-            except Exception as e:
-                print(f"讀取失敗: {e}")
+    def animating(self):
+        return not ASSETS.fonts_ready.is_set() # 等待背景的字型搜尋
 
-        btn_continue = Button(cx, 230, 300, 50, f"繼續遊戲 ({mtime})", load_latest)
+    def update(self):
+        if self.font is not ASSETS.fonts()[0]: # 背景的字型搜尋完成，換上中文字型
+            self.font, self.title_font = ASSETS.fonts()
+            self.dirty = True
 
-    while game is None:
+    def draw(self, screen):
         screen.fill(BG_COLOR)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            
-            if btn_continue:
-                btn_continue.check_click(event)
-            btn_easy.check_click(event)
-            btn_standard.check_click(event)
-            btn_hard.check_click(event)
-            btn_load_save.check_click(event)
-        
-        title_surf = title_font.render("網路水軍模擬器", True, GOLD)
-        screen.blit(title_surf, (WINDOW_WIDTH//2 - title_surf.get_width()//2, 150))
-        
-        if btn_continue:
-            btn_continue.draw(screen, font)
-        btn_easy.draw(screen, font)
-        btn_standard.draw(screen, font)
-        btn_hard.draw(screen, font)
-        btn_load_save.draw(screen, font)
-        
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    # 建立按鈕
-    btn_buy_1 = Button(50, 680, 105, 50, "買1 ($100)", lambda: game.buy_bot(1))
-    btn_buy_5 = Button(165, 680, 105, 50, "買5 ($500)", lambda: game.buy_bot(5))
-    btn_next = Button(280, 680, 200, 50, "休息一天 (刷新)", game.next_day)
-    btn_load = Button(500, 680, 100, 50, "讀檔", lambda: save_load_screen(screen, game, font, title_font, False))
-    btn_manage = Button(620, 680, 150, 50, "帳號管理", lambda: account_management_screen(screen, game, font, title_font))
-    btn_settings = Button(790, 680, 100, 50, "設定", lambda: settings_screen(game, font, title_font))
-
-    # --- 策略選擇介面按鈕 ---
-    # 調整數量按鈕
-    def adjust_deploy(delta):
-        available = len([b for b in game.bots if b.is_available()])
+        draw_title(self.title_font)
+        for btn in self.buttons:
+            btn.draw(screen, self.font)
+
+    def handle_event(self, event):
+        for btn in self.buttons:
+            btn.check_click(event)
+            if self.manager.top is not self: # 已進入遊戲或讀檔畫面
+                return
+
+class MainScene(Scene):
+    """遊戲主畫面：以 DirtyRenderer 只重畫有變動的區域"""
+    line_height = 30
+    max_log_lines = 530 // line_height # 只顯示能放入框內的最後幾行
+
+    def __init__(self, game, font, title_font):
+        super().__init__()
+        self.game = game
+        self.font = font
+        self.title_font = title_font
+
+        # 前端訂閱遊戲事件 (音效、浮動文字、日誌斷行)
+        self.log_wrapper = LogWrapper(font, 280) # 300 - 20 padding
+        self.floating_texts = FloatingTextPool(font)
+        self.frontend = PygameFrontend(self.log_wrapper, self.floating_texts)
+        self.frontend.attach(game)
+        self.renderer = DirtyRenderer(screen, make_background(), SETTINGS.dirty_rendering)
+
+        # 建立按鈕
+        self.btn_buy_1 = Button(50, 680, 105, 50, "買1 ($100)", lambda: game.buy_bot(1))
+        self.btn_buy_5 = Button(165, 680, 105, 50, "買5 ($500)", lambda: game.buy_bot(5))
+        self.btn_next = Button(280, 680, 200, 50, "休息一天 (刷新)", lambda: game.next_day())
+        self.btn_load = Button(500, 680, 100, 50, "讀檔", lambda: self.open_scene(SaveLoadScene(game, font, title_font, False)))
+        self.btn_manage = Button(620, 680, 150, 50, "帳號管理", lambda: self.open_scene(AccountScene(game, font, title_font)))
+        self.btn_settings = Button(790, 680, 100, 50, "設定", lambda: self.open_scene(SettingsScene(game, font, title_font)))
+        self.btn_chart = Button(900, 30, 100, 40, "圖表", self.open_chart)
+        self.btn_fast = Button(900, 680, 110, 50, "", lambda: game.fast_forward(SETTINGS.fast_forward_days, SETTINGS.fast_forward_policy))
+
+        # --- 策略選擇介面按鈕 ---
+        # 調整數量按鈕
+        btn_dec = Button(700, 280, 50, 40, "-", lambda: self.adjust_deploy(-1))
+        btn_inc = Button(860, 280, 50, 40, "+", lambda: self.adjust_deploy(1))
+
+        # 調整策略按鈕位置 (往下移以容納數量選擇器)
+        # 每個策略按鈕下方留一行顯示預估結果
+        btn_strat_spam = Button(630, 330, 360, 40, "暴力洗版 (影響力+++ / 風險高)", lambda: self.run_strat("spam"))
+        btn_strat_norm = Button(630, 397, 360, 40, "一般帶風向 (標準)", lambda: self.run_strat("normal"))
+        btn_strat_troll = Button(630, 464, 360, 40, "反串釣魚 (影響力- / 風險低)", lambda: self.run_strat("troll"))
+        btn_cancel = Button(630, 545, 360, 50, "取消", lambda: setattr(game, 'selected_mission', None))
+        self.strategy_buttons = {"spam": btn_strat_spam, "normal": btn_strat_norm, "troll": btn_strat_troll}
+
+        self.log_scroll_offset = 0 # 日誌捲動位置 (0 = 最底部)
+        self.debug_overlay = False # F3 切換除錯資訊
+        self.main_buttons = [self.btn_buy_1, self.btn_buy_5, self.btn_next, self.btn_load, self.btn_manage,
+                             self.btn_settings, self.btn_fast]
+        self.dialog_buttons = [btn_dec, btn_inc, btn_strat_spam, btn_strat_norm, btn_strat_troll, btn_cancel]
+
+        self.bot_grid = BotGridView(50, 580) # 帳號方塊 (可捲動)
+
+        self.hovered_bot = None
+        self.hover_outline = pygame.Surface((self.bot_grid.box_size, self.bot_grid.box_size), pygame.SRCALPHA)
+        pygame.draw.rect(self.hover_outline, WHITE, self.hover_outline.get_rect(), 2)
+        self.wrapped_lines = []
+        self.dialog_available = 0
+        self.dialog_influence = 0
+        self.dialog_estimates = {}
+        self.dialog_summary = ()
+
+        # 區域依疊放順序加入 (後加入的蓋在上面)；signature 只取重畫需要的狀態
+        renderer = self.renderer
+        renderer.add((0, 0, WINDOW_WIDTH, 105), self.draw_header, lambda: (
+            game.day, game.money, game.pending_money, game.reputation, game.target_reputation,
+            len(game.bots), game.bankruptcy_days, game.autosaver.busy, self.btn_chart.poll_hover()))
+        renderer.add((40, 105, 570, 415), self.draw_missions, lambda: tuple(
+            (m.name, m.difficulty, m.reward, m.required_influence) for m in game.available_missions))
+        renderer.add((40, 515, 620, WINDOW_HEIGHT - 515), self.draw_bot_grid, lambda: (
+            id(game.bots), game.bots.version, self.bot_grid.scroll_row))
+        renderer.add((675, 75, 310, 590), self.draw_log, lambda: (id(self.wrapped_lines), self.log_scroll_offset))
+        renderer.add((45, 675, 970, 60), self.draw_buttons, lambda: tuple(btn.poll_hover() for btn in self.main_buttons))
+        renderer.mark_sprite_layer() # 浮動文字與懸停提示被以下的對話框、成就與結算畫面蓋住
+        renderer.add((620, 140, 380, 500), self.draw_dialog, lambda: (
+            id(game.selected_mission), game.deploy_count, self.dialog_available, self.dialog_influence, self.dialog_summary,
+            tuple(btn.poll_hover() for btn in self.dialog_buttons)) if game.selected_mission else None)
+        renderer.add((WINDOW_WIDTH // 2 - 250, 80, 500, 50), self.draw_achievement, lambda: (
+            game.current_achievement_msg if game.achievement_timer > 0 else None))
+        renderer.add((0, 0, WINDOW_WIDTH, WINDOW_HEIGHT), self.draw_game_over, lambda: (
+            (game.victory, game.bankruptcy_days, game.day, game.money) if game.game_over else None))
+
+    # --- 子畫面 ---
+
+    def open_scene(self, scene):
+        self.manager.push(scene)
+
+    def open_chart(self):
+        try:
+            self.open_scene(TelemetryScene(self.game, self.font, self.title_font))
+        except (OSError, TelemetryError) as e:
+            self.game.log(f"無法讀取遙測紀錄: {e}")
+
+    def on_enter(self):
+        # 子畫面會整個覆蓋螢幕，回來後需要整頁重畫
+        self.renderer.invalidate()
+
+    # --- 操作 ---
+
+    def adjust_deploy(self, delta):
+        game = self.game
+        available = game.bots.available_count()
         new_count = game.deploy_count + delta
         if 1 <= new_count <= available:
             game.deploy_count = new_count
             play_sound('click')
 
-    btn_dec = Button(700, 280, 50, 40, "-", lambda: adjust_deploy(-1))
-    btn_inc = Button(860, 280, 50, 40, "+", lambda: adjust_deploy(1))
-
-    def run_strat(s):
+    def run_strat(self, s):
+        game = self.game
         if game.selected_mission:
             game.execute_mission(game.selected_mission, s, game.deploy_count)
             game.selected_mission = None
 
-    # 調整策略按鈕位置 (往下移以容納數量選擇器)
-    btn_strat_spam = Button(630, 330, 360, 50, "暴力洗版 (影響力+++ / 風險高)", lambda: run_strat("spam"))
-    btn_strat_norm = Button(630, 390, 360, 50, "一般帶風向 (標準)", lambda: run_strat("normal"))
-    btn_strat_troll = Button(630, 450, 360, 50, "反串釣魚 (影響力- / 風險低)", lambda: run_strat("troll"))
-    btn_cancel = Button(630, 520, 360, 50, "取消", lambda: setattr(game, 'selected_mission', None))
-
-    log_scroll_offset = 0 # 日誌捲動位置 (0 = 最底部)
-    running = True
-    while running:
-        # 1. 事件處理
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            # 處理滑鼠滾輪 (日誌捲動)
-            if event.type == pygame.MOUSEWHEEL:
-                mx, my = pygame.mouse.get_pos()
-                if pygame.Rect(680, 110, 300, 550).collidepoint(mx, my):
-                    log_scroll_offset += event.y
-
-            # 如果遊戲結束或正在選擇策略，攔截一般操作
-            if game.game_over:
-                pass # 遊戲結束時不處理任何遊戲內操作
-            elif game.selected_mission:
-                btn_dec.check_click(event)
-                btn_inc.check_click(event)
-                btn_strat_spam.check_click(event)
-                btn_strat_norm.check_click(event)
-                btn_strat_troll.check_click(event)
-                btn_cancel.check_click(event)
-            else:
-                # 一般模式
-                btn_buy_1.check_click(event)
-                btn_buy_5.check_click(event)
-                btn_next.check_click(event)
-                btn_load.check_click(event)
-                btn_manage.check_click(event)
-                btn_settings.check_click(event)
-
-                # 處理任務列表的點擊
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mx, my = event.pos
-                    # 檢查是否點擊了任務區域
-                    for i, mission in enumerate(game.available_missions):
-                        mission_rect = pygame.Rect(50, 140 + i * 75, 550, 70)
-                        if mission_rect.collidepoint(mx, my):
-                            game.selected_mission = mission # 進入策略選擇模式
-                            
-                            # 智慧預設：計算剛好滿足需求的數量
-                            available_bots = [b for b in game.bots if b.is_available()]
-                            available_bots.sort(key=lambda b: b.level, reverse=True)
-                            
-                            needed_count = 0
-                            current_inf = 0
-                            for b in available_bots:
-                                if current_inf >= mission.required_influence:
-                                    break
-                                current_inf += b.influence
-                                needed_count += 1
-                            
-                            # 至少派 1 個，除非沒人
-                            game.deploy_count = max(1, needed_count) if available_bots else 0
-                            break
-                
-                # 處理帳號升級點擊 (點擊方塊)
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mx, my = event.pos
-                    start_x, start_y = 50, 580
-                    box_size, gap = 15, 5
-                    for idx, bot in enumerate(game.bots):
-                        bx = start_x + (idx % 30) * (box_size + gap)
-                        by = start_y + (idx // 30) * (box_size + gap)
-                        if pygame.Rect(bx, by, box_size, box_size).collidepoint(mx, my):
-                            play_sound('click')
-                            game.upgrade_bot(bot)
-
-        # 2.5 更新邏輯
-        # 更新浮動文字
-        for ft in game.floating_texts:
-            ft.update()
-        game.floating_texts = [ft for ft in game.floating_texts if ft.timer > 0]
+    def animating(self):
+        game = self.game
+        return bool(self.floating_texts or game.achievement_timer > 0 or game.achievement_queue
+                    or game.autosaver.busy or self.debug_overlay or PROFILER.enabled)
 
-        # 2. 畫面繪製
-        screen.fill(BG_COLOR)
-
-        # 繪製背景網格 (駭客風)
-        for x in range(0, WINDOW_WIDTH, 40):
-            pygame.draw.line(screen, (0, 30, 0), (x, 0), (x, WINDOW_HEIGHT), 1)
-        for y in range(0, WINDOW_HEIGHT, 40):
-            pygame.draw.line(screen, (0, 30, 0), (0, y), (WINDOW_WIDTH, y), 1)
+    # --- 各區域的繪製函式 ---
 
-        # --- 頂部資訊欄 ---
+    def draw_header(self, surface):
+        game, font, title_font = self.game, self.font, self.title_font
         header_text = f"第 {game.day} 天 | 資金: ${game.money} (+${game.pending_money}) | 聲望: {game.reputation}/{game.target_reputation} | 帳號: {len(game.bots)}"
-        header_surf = title_font.render(header_text, True, GOLD)
-        screen.blit(header_surf, (50, 30))
+        surface.blit(TEXT.render_glyphs(title_font, header_text, GOLD), (50, 30))
+        self.btn_chart.draw(surface, font)
 
         # 顯示破產倒數警告
         if game.bankruptcy_days > 0:
             warn_text = f"⚠ 破產倒數: {3 - game.bankruptcy_days} 天"
-            warn_surf = title_font.render(warn_text, True, RED)
-            screen.blit(warn_surf, (50, 70))
+            surface.blit(TEXT.render(title_font, warn_text, RED), (50, 70))
 
-        # --- 左側：任務列表 ---
-        screen.blit(font.render("可用任務 (點擊執行):", True, WHITE), (50, 110))
-        
-        for i, mission in enumerate(game.available_missions):
+        # 背景自動存檔進行中
+        if game.autosaver.busy:
+            saving_surf = TEXT.render(font, "儲存中…", TEXT_COLOR)
+            surface.blit(saving_surf, (WINDOW_WIDTH - saving_surf.get_width() - 20, 75))
+
+    def draw_missions(self, surface):
+        font = self.font
+        surface.blit(TEXT.render(font, "可用任務 (點擊執行):", WHITE), (50, 110))
+
+        for i, mission in enumerate(self.game.available_missions):
             rect = pygame.Rect(50, 140 + i * 75, 550, 70)
-            
-            # 任務滑鼠懸停效果
-            color = PANEL_COLOR
-            if rect.collidepoint(pygame.mouse.get_pos()):
-                color = (70, 70, 70)
-            
-            pygame.draw.rect(screen, BLACK, rect) # 黑底
-            pygame.draw.rect(screen, TEXT_COLOR, rect, 1) # 綠框
-            
+            pygame.draw.rect(surface, BLACK, rect) # 黑底
+            pygame.draw.rect(surface, TEXT_COLOR, rect, 1) # 綠框
+
             # 任務文字
             info_text = f"{mission.name}"
             detail_text = f"難度: {mission.difficulty} | 報酬: ${mission.reward} | 需求影響力: {mission.required_influence}"
-            
-            screen.blit(font.render(info_text, True, GREEN), (rect.x + 10, rect.y + 10))
-            screen.blit(font.render(detail_text, True, TEXT_COLOR), (rect.x + 10, rect.y + 35))
 
-        # --- 左側下方：帳號可視化 ---
+            surface.blit(TEXT.render(font, info_text, GREEN), (rect.x + 10, rect.y + 10))
+            surface.blit(TEXT.render(font, detail_text, TEXT_COLOR), (rect.x + 10, rect.y + 35))
+
+    def draw_bot_grid(self, surface):
+        game, font, bot_grid = self.game, self.font, self.bot_grid
         viz_y = 520
-        screen.blit(font.render("帳號部隊狀態:", True, WHITE), (50, viz_y))
-        
-        # 統計數據
-        active_bots = [b for b in game.bots if not b.is_banned]
-        total_inf = sum(b.influence for b in active_bots)
-        # 計算今日可用總次數
-        total_uses_left = sum(b.max_uses - b.used_today for b in active_bots)
-        
-        stats_text = f"總影響力: {total_inf}"
-        screen.blit(font.render(stats_text, True, GOLD), (200, viz_y))
-        screen.blit(font.render(f"剩餘行動力: {total_uses_left}", True, (100, 255, 255)), (200, viz_y + 25))
-        
-        # 繪製方塊
-        start_x, start_y = 50, viz_y + 60 # y=580
-        box_size, gap = 15, 5
-        cols = 30
-        
-        for idx, bot in enumerate(game.bots):
-            row = idx // cols
-            col = idx % cols
-            bx = start_x + col * (box_size + gap)
-            by = start_y + row * (box_size + gap)
-            
-            color = GREEN
-            if bot.is_banned: color = RED
-            elif bot.level > 1: color = (0, 255, 255)
-            # 如果今日次數用完，變暗
-            if not bot.is_banned and bot.used_today >= bot.max_uses:
-                color = (50, 100, 50)
-            
-            b_rect = pygame.Rect(bx, by, box_size, box_size)
-            pygame.draw.rect(screen, color, b_rect)
-            
-            if b_rect.collidepoint(pygame.mouse.get_pos()):
-                pygame.draw.rect(screen, WHITE, b_rect, 2)
-                cost = bot.get_upgrade_cost()
-                tip = f"Lv{bot.level} Inf:{bot.influence} 用量:{bot.used_today}/{bot.max_uses} [升級 ${cost}]" if not bot.is_banned else "已封鎖"
-                tip_surf = font.render(tip, True, WHITE)
-                screen.blit(tip_surf, (bx, by - 25))
-
-        # --- 右側：系統日誌 ---
+        surface.blit(TEXT.render(font, "帳號部隊狀態:", WHITE), (50, viz_y))
+
+        # 計算總影響力與今日可用總次數
+        total_inf, total_uses_left = game.bots.active_stats()
+        surface.blit(TEXT.render_glyphs(font, f"總影響力: {total_inf}", GOLD), (200, viz_y))
+        surface.blit(TEXT.render_glyphs(font, f"剩餘行動力: {total_uses_left}", (100, 255, 255)), (200, viz_y + 25))
+
+        # 帳號數超過一頁時顯示捲動位置
+        count = len(game.bots)
+        if count > bot_grid.capacity():
+            first = bot_grid.first_index()
+            last = min(count, first + bot_grid.capacity())
+            surface.blit(TEXT.render_glyphs(font, f"#{first + 1}-{last} / {count} (滾輪捲動)", (150, 150, 150)), (420, viz_y + 25))
+
+        # 繪製方塊 (快取的 Surface)
+        surface.blit(bot_grid.render(game.bots), bot_grid.rect)
+
+    def bot_tooltip(self):
+        bot = self.game.bots[self.hovered_bot]
+        b_rect = self.bot_grid.box_rect(self.hovered_bot)
+        cost = bot.get_upgrade_cost()
+        tip = f"Lv{bot.level} Inf:{bot.influence} 用量:{bot.used_today}/{bot.max_uses} [升級 ${cost}]" if not bot.is_banned else "已封鎖"
+        return TEXT.render(self.font, tip, WHITE), (b_rect.x, b_rect.y - 25)
+
+    def draw_log(self, surface):
         log_bg = pygame.Rect(680, 110, 300, 550)
-        pygame.draw.rect(screen, BLACK, log_bg)
-        pygame.draw.rect(screen, TEXT_COLOR, log_bg, 1) # 綠色邊框
-        
-        screen.blit(font.render("系統日誌:", True, WHITE), (680, 80))
-        
-        # 自動換行處理
-        wrapped_lines = []
-        max_width = 280 # 300 - 20 padding
-        
-        for log in game.logs:
-            current_line = ""
-            for char in log:
-                if font.size(current_line + char)[0] <= max_width:
-                    current_line += char
-                else:
-                    wrapped_lines.append(current_line)
-                    current_line = char
-            if current_line:
-                wrapped_lines.append(current_line)
-
-        # 只顯示能放入框內的最後幾行
-        line_height = 30
-        max_lines = 530 // line_height
-        
-        # 計算捲動限制
-        total_lines = len(wrapped_lines)
-        max_scroll = max(0, total_lines - max_lines)
-        
-        # 限制捲動範圍並計算切片
-        if log_scroll_offset < 0: log_scroll_offset = 0
-        if log_scroll_offset > max_scroll: log_scroll_offset = max_scroll
+        pygame.draw.rect(surface, BLACK, log_bg)
+        pygame.draw.rect(surface, TEXT_COLOR, log_bg, 1) # 綠色邊框
+
+        surface.blit(TEXT.render(self.font, "系統日誌:", WHITE), (680, 80))
 
-        if log_scroll_offset == 0:
-            lines_to_draw = wrapped_lines[-max_lines:]
+        wrapped_lines = self.wrapped_lines
+        total_lines = len(wrapped_lines)
+        if self.log_scroll_offset == 0:
+            lines_to_draw = wrapped_lines[-self.max_log_lines:]
         else:
-            end = total_lines - log_scroll_offset
-            start = max(0, end - max_lines)
+            end = total_lines - self.log_scroll_offset
+            start = max(0, end - self.max_log_lines)
             lines_to_draw = wrapped_lines[start:end]
 
         log_y = 120
         for line in lines_to_draw:
-            log_surf = font.render(line, True, (200, 200, 200))
-            screen.blit(log_surf, (690, log_y))
-            log_y += line_height
-
-        # --- 底部：按鈕 ---
-        btn_buy_1.draw(screen, font)
-        btn_buy_5.draw(screen, font)
-        btn_next.draw(screen, font)
-        btn_load.draw(screen, font)
-        btn_manage.draw(screen, font)
-        btn_settings.draw(screen, font)
-
-        # --- 繪製浮動文字 ---
-        for ft in game.floating_texts:
-            ft.draw(screen, font)
-
-        # --- 策略選擇彈出視窗 (Overlay) ---
+            surface.blit(TEXT.render(self.font, line, (200, 200, 200)), (690, log_y))
+            log_y += self.line_height
+
+    def draw_buttons(self, surface):
+        self.btn_fast.text = f"快轉{SETTINGS.fast_forward_days}天"
+        for btn in self.main_buttons:
+            btn.draw(surface, self.font)
+
+    def draw_dialog(self, surface):
+        game, font = self.game, self.font
+        # 對話框背景 (移至右側，不覆蓋任務列表)
+        dialog_rect = pygame.Rect(620, 140, 380, 500)
+        pygame.draw.rect(surface, BLACK, dialog_rect)
+        pygame.draw.rect(surface, TEXT_COLOR, dialog_rect, 2)
+
+        # 標題與說明
+        cx = dialog_rect.centerx
+        surface.blit(TEXT.render(self.title_font, "選擇言論操控手段", GOLD), (cx - 130, 160))
+        surface.blit(TEXT.render(font, f"目標: {game.selected_mission.name}", WHITE), (640, 210))
+        surface.blit(TEXT.render(font, "請選擇派出數量與策略：", (200, 200, 200)), (640, 240))
+
+        # --- 數量選擇控制 ---
+        surface.blit(TEXT.render_glyphs(font, f"{game.deploy_count}", WHITE), (770, 290))
+        surface.blit(TEXT.render_glyphs(font, f"/ {self.dialog_available}", (150, 150, 150)), (800, 290))
+        surface.blit(TEXT.render_glyphs(font, f"預計影響力: {self.dialog_influence}", GOLD), (760, 255))
+
+        # 各策略的預估：是否成功、任務後封鎖波的期望封鎖數 ± 標準差
+        for strategy, est in self.dialog_estimates.items():
+            rect = self.strategy_buttons[strategy].rect
+            text = (f"{'成功' if est.success else '失敗'}  影響力 {est.influence}  "
+                    f"預期封鎖 {est.expected_bans:.1f} ± {est.ban_std:.1f}")
+            surface.blit(TEXT.render_glyphs(font, text, GREEN if est.success else RED), (rect.x + 5, rect.bottom + 3))
+
+        # 數量與策略按鈕
+        for btn in self.dialog_buttons:
+            btn.draw(surface, font)
+
+    def draw_achievement(self, surface):
+        notif_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, 80, 500, 50)
+        pygame.draw.rect(surface, BLACK, notif_rect)
+        pygame.draw.rect(surface, GOLD, notif_rect, 2)
+
+        msg_surf = TEXT.render(self.font, self.game.current_achievement_msg, GOLD)
+        surface.blit(msg_surf, msg_surf.get_rect(center=notif_rect.center))
+
+    def draw_game_over(self, surface):
+        game, font, title_font = self.game, self.font, self.title_font
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(220)
+        overlay.fill(BLACK)
+        surface.blit(overlay, (0, 0))
+
+        if game.victory:
+            msg1 = "恭喜！你已成為輿論之王！"
+            msg2 = f"在第 {game.day} 天達成目標，最終資金: ${game.money}"
+            color = GOLD
+        elif game.bankruptcy_days >= 3:
+            msg1 = "遊戲結束：宣告破產"
+            msg2 = "連續 3 天資金為負，公司倒閉..."
+            color = RED
+        else:
+            msg1 = "遊戲結束：破產且無可用帳號"
+            msg2 = "你的水軍帝國已經瓦解..."
+            color = RED
+
+        surface.blit(TEXT.render(title_font, msg1, color), (WINDOW_WIDTH//2 - 200, 300))
+        surface.blit(TEXT.render(font, msg2, WHITE), (WINDOW_WIDTH//2 - 180, 360))
+        surface.blit(TEXT.render(font, "請關閉視窗重新開始", (150, 150, 150)), (WINDOW_WIDTH//2 - 100, 420))
+
+    # --- 事件與更新 ---
+
+    def handle_event(self, event):
+        game = self.game
+        if event.type == pygame.VIDEOEXPOSE:
+            self.renderer.invalidate()
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.debug_overlay = not self.debug_overlay
+            self.renderer.invalidate()
+
+        # F4 開關效能分析面板，F5 匯出 Chrome 追蹤檔
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            if PROFILER.enabled:
+                PROFILER.disable()
+            else:
+                PROFILER.reset()
+                PROFILER.enable()
+                PROFILER.instrument(game)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F5 and PROFILER.enabled:
+            trace_path = os.path.join(BASE_DIR, time.strftime('trace_%Y%m%d_%H%M%S.json'))
+            try:
+                count = PROFILER.export_chrome_trace(trace_path)
+                game.log(f"已匯出 {count} 筆效能紀錄: {os.path.basename(trace_path)}")
+            except OSError as e:
+                game.log(f"匯出效能紀錄失敗: {e}")
+
+        # 處理滑鼠滾輪 (日誌捲動)
+        if event.type == pygame.MOUSEWHEEL:
+            mx, my = pygame.mouse.get_pos()
+            if pygame.Rect(680, 110, 300, 550).collidepoint(mx, my):
+                self.log_scroll_offset += event.y
+            elif self.bot_grid.rect.collidepoint(mx, my):
+                self.bot_grid.scroll(-event.y, len(game.bots))
+
+        # 如果遊戲結束或正在選擇策略，攔截一般操作
+        if game.game_over:
+            return # 遊戲結束時不處理任何遊戲內操作
         if game.selected_mission:
-            # 對話框背景 (移至右側，不覆蓋任務列表)
-            dialog_rect = pygame.Rect(620, 140, 380, 500)
-            pygame.draw.rect(screen, BLACK, dialog_rect)
-            pygame.draw.rect(screen, TEXT_COLOR, dialog_rect, 2)
-            
-            # 標題與說明
-            cx = dialog_rect.centerx
-            screen.blit(title_font.render("選擇言論操控手段", True, GOLD), (cx - 130, 160))
-            screen.blit(font.render(f"目標: {game.selected_mission.name}", True, WHITE), (640, 210))
-            screen.blit(font.render("請選擇派出數量與策略：", True, (200, 200, 200)), (640, 240))
-            
-            # --- 數量選擇控制 ---
-            # 計算預計影響力
-            avail_bots = [b for b in game.bots if b.is_available()]
-            avail_bots.sort(key=lambda b: b.level, reverse=True)
-            selected_bots = avail_bots[:game.deploy_count]
-            current_inf = sum(b.influence for b in selected_bots)
-
-            screen.blit(font.render(f"{game.deploy_count}", True, WHITE), (770, 290))
-            screen.blit(font.render(f"/ {len(avail_bots)}", True, (150, 150, 150)), (800, 290))
-            screen.blit(font.render(f"預計影響力: {current_inf}", True, GOLD), (760, 255))
-            btn_dec.draw(screen, font)
-            btn_inc.draw(screen, font)
-
-            # 策略按鈕
-            btn_strat_spam.draw(screen, font)
-            btn_strat_norm.draw(screen, font)
-            btn_strat_troll.draw(screen, font)
-            btn_cancel.draw(screen, font)
-
-        # --- 成就通知彈出視窗 ---
+            for btn in self.dialog_buttons:
+                btn.check_click(event)
+            return
+
+        # 一般模式
+        for btn in self.main_buttons + [self.btn_chart]:
+            btn.check_click(event)
+            if self.manager.top is not self: # 已開啟子畫面
+                return
+
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            mx, my = event.pos
+            # 處理任務列表的點擊
+            for i, mission in enumerate(game.available_missions):
+                mission_rect = pygame.Rect(50, 140 + i * 75, 550, 70)
+                if mission_rect.collidepoint(mx, my):
+                    game.selected_mission = mission # 進入策略選擇模式
+
+                    # 智慧預設：計算剛好滿足需求的數量
+                    needed_count = game.suggest_deploy_count(mission.required_influence)
+
+                    # 至少派 1 個，除非沒人
+                    game.deploy_count = max(1, needed_count) if game.bots.available_count() else 0
+                    break
+
+            # 處理帳號升級點擊 (點擊方塊)
+            idx = self.bot_grid.index_at(event.pos, len(game.bots))
+            if idx is not None:
+                play_sound('click')
+                game.upgrade_bot(game.bots[idx])
+
+    def update(self):
+        game = self.game
+        # 更新浮動文字
+        self.floating_texts.update()
+
+        # 回報背景自動存檔結果
+        game.poll_autosave()
+
+        # 成就通知計時
         if game.achievement_timer > 0:
             game.achievement_timer -= 1
-            # 繪製通知框
-            notif_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, 80, 500, 50)
-            pygame.draw.rect(screen, BLACK, notif_rect)
-            pygame.draw.rect(screen, GOLD, notif_rect, 2)
-            
-            msg_surf = font.render(game.current_achievement_msg, True, GOLD)
-            msg_rect = msg_surf.get_rect(center=notif_rect.center)
-            screen.blit(msg_surf, msg_rect)
         elif game.achievement_queue:
             game.current_achievement_msg = game.achievement_queue.pop(0)
             game.achievement_timer = 180 # 顯示 3 秒 (60 FPS * 3)
 
-        # --- 遊戲結束畫面 (Game Over Screen) ---
-        if game.game_over:
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-            overlay.set_alpha(220)
-            overlay.fill(BLACK)
-            screen.blit(overlay, (0, 0))
-            
-            if game.victory:
-                msg1 = "恭喜！你已成為輿論之王！"
-                msg2 = f"在第 {game.day} 天達成目標，最終資金: ${game.money}"
-                color = GOLD
-            elif game.bankruptcy_days >= 3:
-                msg1 = "遊戲結束：宣告破產"
-                msg2 = "連續 3 天資金為負，公司倒閉..."
-                color = RED
-            else:
-                msg1 = "遊戲結束：破產且無可用帳號"
-                msg2 = "你的水軍帝國已經瓦解..."
-                color = RED
-            
-            screen.blit(title_font.render(msg1, True, color), (WINDOW_WIDTH//2 - 200, 300))
-            screen.blit(font.render(msg2, True, WHITE), (WINDOW_WIDTH//2 - 180, 360))
-            screen.blit(font.render("請關閉視窗重新開始", True, (150, 150, 150)), (WINDOW_WIDTH//2 - 100, 420))
-
-        # 3. 更新螢幕
-        pygame.display.flip()
-        clock.tick(FPS)
+        # 日誌斷行 (已快取) 與捲動範圍限制
+        self.wrapped_lines = self.log_wrapper.wrap_all(game.logs)
+        max_scroll = max(0, len(self.wrapped_lines) - self.max_log_lines)
+        self.log_scroll_offset = max(0, min(self.log_scroll_offset, max_scroll))
+
+        self.hovered_bot = self.bot_grid.index_at(pygame.mouse.get_pos(), len(game.bots))
 
+        # 策略視窗的預計影響力
+        if game.selected_mission:
+            self.dialog_available = game.bots.available_count()
+            self.dialog_influence = game.bots.top_influence(game.deploy_count)
+            self.dialog_estimates = game.estimate_strategies(game.selected_mission, game.deploy_count)
+            self.dialog_summary = tuple((e.influence, e.success, round(e.expected_bans, 1), round(e.ban_std, 1))
+                                        for e in self.dialog_estimates.values())
+
+    def render(self):
+        font = self.font
+        # 畫面繪製 (只重畫有變動的區域)
+        sprites = self.floating_texts.sprites()
+        if self.hovered_bot is not None: # 懸停框與提示畫在前景，不必重畫方塊格
+            sprites.append((self.hover_outline, self.bot_grid.box_rect(self.hovered_bot).topleft))
+            sprites.append(self.bot_tooltip())
+
+        # --- 除錯資訊 (F3) ---
+        overlays = []
+        if self.debug_overlay:
+            # 直接 render，不經過快取以免影響統計
+            lines = [f"FPS {self.manager.clock.get_fps():.0f}", self.manager.stats_text(), TEXT.stats_text(),
+                     self.renderer.stats_text(), self.floating_texts.stats_text(),
+                     MIXER.stats_text(), STARTUP.report()]
+            for i, line in enumerate(lines):
+                dbg_surf = font.render(line, True, WHITE, BLACK)
+                overlays.append((dbg_surf, (WINDOW_WIDTH - dbg_surf.get_width() - 5, WINDOW_HEIGHT - 30 * (len(lines) - i))))
+
+        if PROFILER.enabled:
+            panel = profiler_overlay(font)
+            overlays.append((panel, (WINDOW_WIDTH - panel.get_width() - 5, 110)))
+        PROFILER.lap("sprites")
+
+        self.renderer.render(sprites, overlays)
+
+def main():
+    font, title_font = boot()
+    manager = SceneManager()
+    game = None
+
+    def start_game(new_game):
+        nonlocal game
+        game = new_game
+        fonts = ASSETS.fonts(wait=True)
+        STARTUP.mark("進入遊戲") # 報告在 F3 除錯資訊中顯示
+        attach_telemetry(game)
+        manager.switch(MainScene(game, *fonts))
+
+    manager.push(TitleScene(font, title_font, start_game))
+    manager.run()
+
+    if game is not None:
+        game.autosaver.flush(2.0) # 等待最後一次自動存檔寫完
+        game.telemetry.close()
+        # 保留本局操作紀錄，方便重現問題 (Replay.load(...).run())
+        if game.replay:
+            try:
+                game.replay.save(os.path.join(BASE_DIR, "last_replay.json"))
+            except OSError as e:
+                print(f"重播紀錄儲存失敗: {e}")
     pygame.quit()
     sys.exit()
 
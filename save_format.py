@@ -0,0 +1,337 @@
+"""存檔格式
+
+第 2 版起為精簡的二進位格式 (副檔名 .sav)，第 1 版是舊的 pickle 存檔 (.pkl)。
+
+檔案結構 (little-endian)：
+    header   <8sHHIII  magic, 版本, 旗標, meta 長度, 帳號數, 帳號欄位區長度
+    meta     UTF-8 JSON：金錢、天數、任務、日誌等純量資料
+    columns  帳號欄位，依 BOT_COLUMNS 順序連續存放 (旗標含 FLAG_ZLIB 時整段以 zlib 壓縮)
+
+影響力與每日次數上限可由等級推算，不另外儲存。meta 放在壓縮區之前，
+存檔列表只需讀 header 與 meta，不必解開整個帳號陣列。
+
+讀取舊版存檔時依序套用 MIGRATIONS 中的轉換，每一步把資料從第 N 版升到第 N+1 版。
+
+SlotIndex 把各存檔的中繼資料快取在資料夾內，存檔列表與「繼續遊戲」不必開啟每個檔案。
+"""
+import json
+import os
+import pickle
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+SAVE_VERSION = 2
+SAVE_EXT = '.sav'
+LEGACY_EXT = '.pkl'
+SAVE_EXTENSIONS = (SAVE_EXT, LEGACY_EXT)
+
+MAGIC = b'BOTSAVE\x00'
+HEADER = struct.Struct('<8sHHIII')
+FLAG_ZLIB = 1
+
+# (欄位名稱, array 型別)
+BOT_COLUMNS = (
+    ('level', 'i'),
+    ('stealth', 'i'),
+    ('used_today', 'i'),
+    ('is_banned', 'B'),
+)
+
+
+class SaveFormatError(Exception):
+    """存檔損毀或格式不支援"""
+
+
+def encode(meta, columns, compress=True):
+    """把 meta (可 JSON 化的 dict) 與帳號欄位 (名稱 -> array) 編碼成 bytes"""
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    count = len(columns['level'])
+    parts = []
+    for name, typecode in BOT_COLUMNS:
+        col = columns[name]
+        if col.typecode != typecode:
+            col = array(typecode, col)
+        if len(col) != count:
+            raise SaveFormatError(f"欄位 {name} 長度不一致")
+        if sys.byteorder != 'little' and col.itemsize > 1:
+            col = array(typecode, col)
+            col.byteswap()
+        parts.append(col.tobytes())
+    body = b''.join(parts)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    header = HEADER.pack(MAGIC, SAVE_VERSION, flags, len(meta_bytes), count, len(body))
+    return b''.join((header, meta_bytes, body))
+
+
+def write_atomic(path, data):
+    """先寫到暫存檔並 fsync，再原子改名覆蓋目標，寫到一半當機也不會毀掉舊存檔"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    try: # 讓改名本身也落盤 (部分平台不支援開啟資料夾)
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def _read_header(f):
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size or not raw.startswith(MAGIC):
+        return None
+    return HEADER.unpack(raw)
+
+
+def decode(f):
+    """從檔案物件讀出 (meta, columns)，必要時套用版本遷移"""
+    header = _read_header(f)
+    if header is None:
+        f.seek(0)
+        return migrate(1, _load_legacy(f), None)
+
+    _, version, flags, meta_len, count, body_len = header
+    if version > SAVE_VERSION:
+        raise SaveFormatError(f"存檔版本 {version} 比遊戲新 ({SAVE_VERSION})")
+    meta = json.loads(f.read(meta_len).decode('utf-8'))
+    body = f.read(body_len)
+    if len(body) != body_len:
+        raise SaveFormatError("存檔不完整")
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    columns = {}
+    offset = 0
+    for name, typecode in BOT_COLUMNS:
+        col = array(typecode)
+        size = col.itemsize * count
+        col.frombytes(body[offset:offset + size])
+        if sys.byteorder != 'little' and col.itemsize > 1:
+            col.byteswap()
+        columns[name] = col
+        offset += size
+    return migrate(version, meta, columns)
+
+
+def read_meta(f):
+    """只讀 header 與 meta (舊版 pickle 存檔則需完整讀取)"""
+    header = _read_header(f)
+    if header is None:
+        f.seek(0)
+        meta, columns = decode(f)
+        meta['bot_count'] = len(columns['level'])
+        return meta
+    _, version, _, meta_len, count, _ = header
+    meta = json.loads(f.read(meta_len).decode('utf-8'))
+    meta['bot_count'] = count
+    return meta
+
+
+# --- 舊版 pickle 存檔 ---
+
+class _LegacyRecord:
+    """舊存檔中物件的替身，只保留屬性資料"""
+    def __setstate__(self, state):
+        if isinstance(state, tuple): # (__dict__, __slots__) 形式
+            state = {k: v for part in state if part for k, v in part.items()}
+        self.__dict__.update(state)
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """只允許已知的類別，其餘一律拒絕 (避免讀檔時執行任意程式碼)"""
+    RECORDS = {'Bot', 'Mission', 'BotRoster'}
+
+    def find_class(self, module, name):
+        if module in ('__main__', 'game_core') and name in self.RECORDS:
+            return _LegacyRecord
+        if module == 'array' and name in ('array', '_array_reconstructor'):
+            return super().find_class(module, name)
+        raise SaveFormatError(f"存檔包含不允許的物件: {module}.{name}")
+
+
+def _load_legacy(f):
+    data = _LegacyUnpickler(f).load()
+    if not isinstance(data, dict):
+        raise SaveFormatError("無法辨識的存檔內容")
+    return data
+
+
+# --- 版本遷移 ---
+
+def _migrate_1_to_2(meta, columns):
+    """pickle 存檔 -> 二進位格式：拆出帳號欄位並補上舊版缺少的欄位"""
+    bots = meta.pop('bots', [])
+    if isinstance(bots, list):
+        columns = {
+            'level': array('i', [getattr(b, 'level', 1) for b in bots]),
+            'stealth': array('i', [getattr(b, 'stealth', 100 - getattr(b, 'level', 1) * 5) for b in bots]),
+            'used_today': array('i', [getattr(b, 'used_today', 0) for b in bots]),
+            'is_banned': array('B', [1 if getattr(b, 'is_banned', False) else 0 for b in bots]),
+        }
+    else: # 以 BotRoster 儲存的 pickle
+        columns = {name: array(typecode, getattr(bots, name)) for name, typecode in BOT_COLUMNS}
+
+    meta['available_missions'] = [
+        [m.name, m.difficulty, m.reward, m.required_influence]
+        for m in meta.get('available_missions', [])
+    ]
+    meta.setdefault('pending_money', 0)
+    meta.setdefault('bankruptcy_days', 0)
+    meta.setdefault('unlocked_achievements', [])
+    if 'base_risk_modifier' not in meta and 'risk_modifier' in meta:
+        meta['base_risk_modifier'] = meta['risk_modifier']
+    meta.pop('risk_modifier', None)
+    return meta, columns
+
+
+MIGRATIONS = {
+    1: _migrate_1_to_2,
+}
+
+
+def migrate(version, meta, columns):
+    while version < SAVE_VERSION:
+        meta, columns = MIGRATIONS[version](meta, columns)
+        version += 1
+    return meta, columns
+
+
+# --- 存檔列表索引 ---
+
+INDEX_NAME = '.save_index.json'
+INDEX_VERSION = 1
+INDEX_FIELDS = ('day', 'money', 'difficulty', 'reputation')
+_RACY_NS = 2_000_000_000 # 資料夾 mtime 與檢查時間太接近時，不信任快速路徑 (時間戳解析度有限)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def slot_index(base_dir):
+    """取得資料夾共用的 SlotIndex (同一資料夾只有一個實例，確保跨執行緒的更新互斥)"""
+    key = os.path.abspath(base_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SlotIndex(key)
+        return index
+
+
+class SlotIndex:
+    """存檔欄位的中繼資料索引
+
+    每個存檔記錄 mtime、大小與 INDEX_FIELDS，存在資料夾內的 INDEX_NAME。
+    存檔一律以改名方式寫入，新增、覆蓋、刪除都會改變資料夾 mtime；
+    資料夾 mtime 與索引記錄相同時直接使用索引，否則逐檔比對 mtime/大小，
+    只重新讀取有變動的檔案。索引只是快取，損毀時重建即可。
+    """
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {'version': INDEX_VERSION, 'dir_mtime_ns': 0, 'checked_ns': 0, 'slots': {}}
+
+    def _store(self, data, validated=True):
+        # 直接覆寫而非改名，已存在的索引檔被更新時不會再改動資料夾 mtime
+        existed = os.path.exists(self.path)
+        if validated:
+            data['dir_mtime_ns'] = os.stat(self.base_dir).st_mtime_ns
+            data['checked_ns'] = time.time_ns()
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            if validated and not existed: # 第一次建立索引本身會改變資料夾 mtime
+                data['dir_mtime_ns'] = os.stat(self.base_dir).st_mtime_ns
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _entry(st, meta):
+        entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+        for field in INDEX_FIELDS:
+            entry[field] = meta.get(field)
+        return entry
+
+    def _rescan(self, data):
+        slots = {}
+        for de in os.scandir(self.base_dir):
+            if not de.name.endswith(SAVE_EXTENSIONS) or not de.is_file():
+                continue
+            st = de.stat()
+            old = data['slots'].get(de.name)
+            if old and old['mtime_ns'] == st.st_mtime_ns and old['size'] == st.st_size:
+                slots[de.name] = old
+                continue
+            try:
+                with open(de.path, 'rb') as f:
+                    meta = read_meta(f)
+            except Exception:
+                meta = {}
+            slots[de.name] = self._entry(st, meta)
+        data['slots'] = slots
+
+    def slots(self):
+        """回傳 [{'name', 'mtime', 'size', 'day', ...}]，依修改時間由新到舊排序"""
+        with self._lock:
+            data = self._load()
+            try:
+                dir_mtime = os.stat(self.base_dir).st_mtime_ns
+                fresh = (dir_mtime == data['dir_mtime_ns']
+                         and data['checked_ns'] - dir_mtime > _RACY_NS)
+                if not fresh:
+                    self._rescan(data)
+                    self._store(data)
+            except OSError:
+                return []
+        result = []
+        for name, entry in data['slots'].items():
+            item = dict(entry, name=name, mtime=entry['mtime_ns'] / 1e9)
+            result.append(item)
+        result.sort(key=lambda s: s['mtime_ns'], reverse=True)
+        return result
+
+    def latest(self):
+        """最近修改的存檔，沒有存檔時回傳 None"""
+        slots = self.slots()
+        return slots[0] if slots else None
+
+    def record(self, filename, meta):
+        """存檔寫入後更新索引，不必重新讀檔"""
+        with self._lock:
+            data = self._load()
+            try:
+                st = os.stat(os.path.join(self.base_dir, filename))
+            except OSError:
+                return
+            data['slots'][filename] = self._entry(st, meta)
+            # 不更新資料夾 mtime：下次列出時會逐檔比對一次 (此檔已是最新，不會重讀)，
+            # 同時發現其他程式造成的變動
+            self._store(data, validated=False)
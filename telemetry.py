@@ -0,0 +1,251 @@
+"""經濟數據遙測
+
+每天結束時 (可選擇每次任務、購買、升級後也記錄) 把資金、聲望、帳號數、封鎖數、工資等
+寫成一筆固定長度的紀錄，附加到遙測檔尾端。寫入先累積在有上限的緩衝區，滿了才寫檔，
+記憶體用量與遊戲天數無關。
+
+檔案結構 (little-endian)：
+    header   <8sHH  magic, 版本, 欄位數
+    game_id  <q     寫入此檔的遊戲 (GameState.seed)；版本 1 沒有此欄，視為 0
+    names    欄位名稱 (UTF-8 JSON 陣列，前置 <I 長度)
+    records  每筆為 欄位數 個 int64，依 FIELDS 順序
+
+固定長度的紀錄可以直接定位第 N 筆，圖表只讀取取樣到的那幾筆；檔尾寫到一半的紀錄會被忽略。
+
+    python telemetry.py telemetry.tlm --csv economy.csv   # 轉成 CSV 供試算表分析
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+
+MAGIC = b'BOTTLM\x00\x00'
+VERSION = 2
+HEADER = struct.Struct('<8sHH')
+GAME_ID = struct.Struct('<q')
+NAMES_LEN = struct.Struct('<I')
+
+FIELDS = (
+    'day', 'kind', 'money', 'pending_money', 'reputation', 'bots', 'max_level',
+    'income', 'salary', 'bans', 'missions',
+)
+# kind 欄位：0 為每日結算，其餘為單一動作之後
+KINDS = ('day', 'mission', 'buy', 'upgrade')
+
+
+class TelemetryError(Exception):
+    """遙測檔損毀或格式不支援"""
+
+
+def _read_header(f):
+    """回傳 (欄位名稱, 遊戲 id, 資料起點)"""
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise TelemetryError("遙測檔不完整")
+    magic, version, count = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise TelemetryError("不是遙測檔")
+    if version > VERSION:
+        raise TelemetryError(f"遙測檔版本 {version} 比遊戲新 ({VERSION})")
+    game_id = 0
+    if version >= 2:
+        (game_id,) = GAME_ID.unpack(f.read(GAME_ID.size))
+    (names_len,) = NAMES_LEN.unpack(f.read(NAMES_LEN.size))
+    names = tuple(json.loads(f.read(names_len).decode('utf-8')))
+    if len(names) != count:
+        raise TelemetryError("欄位數不一致")
+    return names, game_id, f.tell()
+
+
+class TelemetryWriter:
+    """附加寫入遙測紀錄
+
+    per_action 為 False 時只記錄每日結算。buffer_records 筆紀錄寫一次檔。
+    income / salary 是當天結算的金額 (動作紀錄為 0)，bans / missions 是與上一筆之間的增量。
+    整個檔案只屬於一局遊戲 (game_id)，讀入其他局的存檔時以 rewind() 重新開始。
+    """
+    def __init__(self, path, per_action=False, buffer_records=256):
+        self.path = path
+        self.per_action = per_action
+        self.buffer_records = buffer_records
+        self.record = struct.Struct('<' + 'q' * len(FIELDS))
+        self._buffer = bytearray()
+        self._prev_banned = None
+        self._prev_missions = None
+        self._file = None
+        self.game_id = 0
+        self.records = 0 # 檔案中 (含緩衝) 的紀錄數
+
+    def start(self, game_id=0):
+        """清空並重新開始 (新遊戲)"""
+        self.close()
+        names = json.dumps(FIELDS).encode('utf-8')
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(FIELDS)))
+            f.write(GAME_ID.pack(game_id))
+            f.write(NAMES_LEN.pack(len(names)))
+            f.write(names)
+        self._open()
+        self.records = 0
+        self._prev_banned = self._prev_missions = None
+
+    def _open(self):
+        self._file = open(self.path, 'r+b', buffering=0)
+        names, self.game_id, self._data_start = _read_header(self._file)
+        if names != FIELDS:
+            raise TelemetryError("遙測檔欄位與目前版本不同")
+        size = self._file.seek(0, os.SEEK_END)
+        # 捨棄寫到一半的紀錄
+        self.records = (size - self._data_start) // self.record.size
+        self._file.truncate(self._data_start + self.records * self.record.size)
+        self._file.seek(0, os.SEEK_END)
+
+    def sample(self, game, kind='day'):
+        """記錄 game 目前的狀態"""
+        if kind != 'day' and not self.per_action:
+            return
+        if self._file is None:
+            if os.path.exists(self.path):
+                self._open()
+            else:
+                self.start(game.seed)
+        banned, missions = game.ban_engine.total_banned, game.missions_run
+        if self._prev_banned is None:
+            self._prev_banned, self._prev_missions = banned, missions
+        if kind == 'day':
+            income, salary = game.last_income, game.last_salary
+        else:
+            income = salary = 0
+        self._buffer += self.record.pack(
+            game.day, KINDS.index(kind), game.money, game.pending_money, game.reputation,
+            len(game.bots), game.bots.max_level(), income, salary,
+            max(0, banned - self._prev_banned), max(0, missions - self._prev_missions))
+        self._prev_banned, self._prev_missions = banned, missions
+        self.records += 1
+        if len(self._buffer) >= self.buffer_records * self.record.size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer and self._file is not None:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+
+    def rewind(self, day, game_id):
+        """讀入存檔時接續紀錄：捨棄 day 當天及之後的紀錄
+
+        檔案屬於其他局 (game_id 不同，或舊版沒有 id)、或紀錄沒有涵蓋到 day 前一天 (會留下空白)
+        時改為 start() 重新開始。回傳是否接續了原有紀錄。
+        """
+        if self._file is None:
+            if not os.path.exists(self.path):
+                self.start(game_id)
+                return False
+            self._open()
+        self.flush()
+        with TelemetryReader(self.path) as reader:
+            lo = reader.bisect_day(day)
+            contiguous = day <= 1 or (lo > 0 and reader.read(lo - 1)[0] >= day - 1)
+        if self.game_id != game_id or not contiguous:
+            self.start(game_id)
+            return False
+        self._file.truncate(self._data_start + lo * self.record.size)
+        self._file.seek(0, os.SEEK_END)
+        self.records = lo
+        self._prev_banned = self._prev_missions = None
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+class TelemetryReader:
+    """依需要讀取遙測紀錄 (只讀 header 與要用到的紀錄，不載入整個檔案)"""
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self.fields, self.game_id, self._data_start = _read_header(self._file)
+        self.record = struct.Struct('<' + 'q' * len(self.fields))
+
+    def __len__(self):
+        size = os.fstat(self._file.fileno()).st_size
+        return max(0, (size - self._data_start) // self.record.size)
+
+    def read(self, index):
+        self._file.seek(self._data_start + index * self.record.size)
+        return self.record.unpack(self._file.read(self.record.size))
+
+    def column(self, name):
+        return self.fields.index(name)
+
+    def bisect_day(self, day):
+        """第一筆天數 >= day 的紀錄索引 (紀錄的天數遞增，以二分搜尋定位)"""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.read(mid)[0] < day:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def sample(self, points, start=0, end=None):
+        """在 [start, end) 之間平均取 points 筆紀錄 (紀錄較少時全部回傳)"""
+        end = len(self) if end is None else min(end, len(self))
+        count = end - start
+        if count <= 0:
+            return []
+        if count <= points:
+            self._file.seek(self._data_start + start * self.record.size)
+            return list(self.record.iter_unpack(self._file.read(count * self.record.size)))
+        step = (count - 1) / max(1, points - 1)
+        return [self.read(start + round(i * step)) for i in range(points)]
+
+    def __iter__(self):
+        """依序讀出所有紀錄 (分塊讀取)"""
+        self._file.seek(self._data_start)
+        chunk = self.record.size * 4096
+        while True:
+            data = self._file.read(chunk)
+            usable = len(data) - len(data) % self.record.size
+            if not usable:
+                return
+            yield from self.record.iter_unpack(data[:usable])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="遙測檔轉換")
+    parser.add_argument('path', help="遙測檔 (.tlm)")
+    parser.add_argument('--csv', default=None, help="輸出 CSV (預設寫到標準輸出)")
+    args = parser.parse_args(argv)
+
+    with TelemetryReader(args.path) as reader:
+        out = open(args.csv, 'w', newline='', encoding='utf-8') if args.csv else sys.stdout
+        try:
+            writer = csv.writer(out)
+            writer.writerow(reader.fields)
+            kind = reader.column('kind')
+            for row in reader:
+                row = list(row)
+                row[kind] = KINDS[row[kind]] if row[kind] < len(KINDS) else row[kind]
+                writer.writerow(row)
+        finally:
+            if args.csv:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
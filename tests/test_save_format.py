@@ -0,0 +1,105 @@
+"""存檔格式的回歸測試：新格式往返、舊版 pickle 遷移、拒絕不允許的物件"""
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_core
+import save_format
+from game_core import GameState
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+LEGACY_SAVE = 'autosave_v1.pkl' # 第 1 版 (pickle) 的自動存檔
+
+
+class SaveFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.old_base_dir = game_core.BASE_DIR
+        game_core.BASE_DIR = self.base_dir
+
+    def tearDown(self):
+        game_core.BASE_DIR = self.old_base_dir
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def play(self, seed=7, days=20):
+        game = GameState("Standard", seed=seed)
+        game.autosave = False
+        for _ in range(days):
+            game_core.POLICIES['normal'](game)
+            if game.game_over:
+                break
+            game.next_day()
+        return game
+
+    def test_round_trip_keeps_state_hash(self):
+        game = self.play()
+        for compress in (True, False):
+            meta, columns = game.to_save_data()
+            data = save_format.encode(meta, columns, compress=compress)
+            restored = GameState("Easy", seed=1)
+            restored.apply_save_data(*save_format.decode(io.BytesIO(data)))
+            self.assertEqual(restored.state_hash(), game.state_hash())
+
+    def test_save_and_load_game(self):
+        game = self.play(seed=11)
+        game.save_game("slot")
+        loaded = GameState("Easy", seed=1)
+        loaded.load_game("slot" + save_format.SAVE_EXT)
+        self.assertEqual(loaded.state_hash(), game.state_hash())
+
+    def test_read_meta_without_columns(self):
+        game = self.play(seed=3, days=5)
+        meta, columns = game.to_save_data()
+        meta = save_format.read_meta(io.BytesIO(save_format.encode(meta, columns)))
+        self.assertEqual(meta['day'], game.day)
+        self.assertEqual(meta['bot_count'], len(game.bots))
+
+    def test_migrate_legacy_pickle(self):
+        with open(os.path.join(DATA_DIR, LEGACY_SAVE), 'rb') as f:
+            meta, columns = save_format.decode(f)
+        self.assertEqual(meta['day'], 8)
+        self.assertEqual(meta['money'], 691)
+        self.assertEqual(meta['difficulty'], "Hard")
+        self.assertEqual(meta['base_risk_modifier'], 1.3)
+        self.assertNotIn('bots', meta)
+        self.assertEqual(len(meta['available_missions']), 4)
+        self.assertEqual(meta['available_missions'][0][1:], [2, 639, 106])
+        self.assertEqual(list(columns['level']), [2, 2, 2, 1, 1, 1])
+        self.assertEqual(list(columns['stealth']), [94, 94, 94, 95, 95, 95])
+        self.assertEqual(list(columns['is_banned']), [0] * 6)
+
+        # 透過 load_game 讀入，再存成新格式 (舊檔會被取代)
+        shutil.copy(os.path.join(DATA_DIR, LEGACY_SAVE), self.base_dir)
+        game = GameState("Standard", seed=1)
+        game.load_game(LEGACY_SAVE)
+        self.assertEqual((game.day, game.money, len(game.bots)), (8, 691, 6))
+        self.assertEqual(game.bots.max_level(), 2)
+        game.save_game(LEGACY_SAVE)
+        self.assertEqual(game.current_filename, "autosave_v1" + save_format.SAVE_EXT)
+        self.assertFalse(os.path.exists(os.path.join(self.base_dir, LEGACY_SAVE)))
+        again = GameState("Standard", seed=1)
+        again.load_game(game.current_filename)
+        self.assertEqual(again.state_hash(), game.state_hash())
+
+    def test_legacy_pickle_rejects_unknown_globals(self):
+        for payload in ({'money': 1, 'bots': [], 'hook': os.system}, {'money': 1, 'bots': GameState}):
+            data = pickle.dumps(payload)
+            with self.assertRaises(save_format.SaveFormatError):
+                save_format.decode(io.BytesIO(data))
+
+    def test_newer_version_is_rejected(self):
+        meta, columns = self.play(days=1).to_save_data()
+        data = bytearray(save_format.encode(meta, columns))
+        data[8:10] = (save_format.SAVE_VERSION + 1).to_bytes(2, 'little')
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.decode(io.BytesIO(bytes(data)))
+
+
+if __name__ == '__main__':
+    unittest.main()